@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Factorio Preview Toolkit.
+
+They run without a Factorio installation: a scriptable stand-in executable (fake_factorio.py)
+answers the few Factorio command lines the toolkit uses.
+"""
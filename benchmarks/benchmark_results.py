@@ -0,0 +1,216 @@
+"""
+Result files of the benchmarks: latency statistics, storage and comparison against a baseline.
+
+A result file is JSON with the benchmark name, the settings it ran with and one entry per metric:
+    {"benchmark": "e2e", "settings": {...}, "metrics": {"end_to_end": {"p50_ms": ..., ...}}}
+Metrics may also carry peak memory statistics (peak_traced_kb, peak_rss_kb).
+"""
+
+import json
+import math
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+# Statistics that are compared against the baseline, with their unit.
+# Memory statistics are only present in the results of some benchmarks.
+COMPARED_STATISTICS = {"p50_ms": "ms", "p95_ms": "ms", "peak_traced_kb": "KB", "peak_rss_kb": "KB"}
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Returns the given percentile (0.0-1.0) with linear interpolation between the closest samples.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize_latencies(samples_in_ms: list[float]) -> dict[str, Any]:
+    """
+    Returns p50, p95, min and max of the samples, together with the samples themselves.
+    """
+    return {
+        "p50_ms": round(percentile(samples_in_ms, 0.5), 3),
+        "p95_ms": round(percentile(samples_in_ms, 0.95), 3),
+        "min_ms": round(min(samples_in_ms), 3),
+        "max_ms": round(max(samples_in_ms), 3),
+        "samples_ms": [round(sample, 3) for sample in samples_in_ms],
+    }
+
+
+def get_git_commit() -> str | None:
+    """
+    Returns the commit hash of the checked out source, or None outside a git checkout.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def is_worktree_dirty() -> bool:
+    """
+    Returns True if tracked files have uncommitted changes, i.e. the source differs from the commit.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return bool(result.stdout.strip())
+
+
+def build_result(
+    benchmark: str, settings: dict[str, Any], metrics: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """
+    Bundles the metrics of a benchmark run with the settings and the commit it ran on.
+    """
+    return {
+        "benchmark": benchmark,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": get_git_commit(),
+        "settings": settings,
+        "metrics": metrics,
+    }
+
+
+def resolve_git_revision(revision: str) -> str | None:
+    """
+    Returns the commit hash of a git revision (e.g. 'main', 'HEAD~1'), or None if it is unknown.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def get_commit_result_path(benchmark: str, commit: str, dirty: bool = False) -> Path:
+    """
+    Returns the result path of a benchmark run on the given commit. Runs on a working tree with
+    uncommitted changes get their own file, so they never overwrite the result of the commit.
+    """
+    suffix = "-dirty" if dirty else ""
+    return RESULTS_DIR / f"{benchmark}-{commit[:12]}{suffix}.json"
+
+
+def get_default_result_path(benchmark: str) -> Path:
+    """
+    Returns a timestamped result path in the results folder.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return RESULTS_DIR / f"{benchmark}-{timestamp}.json"
+
+
+def save_result(result: dict[str, Any], path: Path) -> None:
+    """
+    Writes a result file, creating its folder if needed.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"📄 Results written to: {path}")
+
+
+def load_result(path: Path) -> dict[str, Any]:
+    """
+    Reads a result file.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        result: dict[str, Any] = json.load(f)
+    return result
+
+
+def compare_results(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+    min_delta_in_ms: float,
+    min_delta_in_kb: float = 1024,
+) -> tuple[list[str], list[str]]:
+    """
+    Prints every statistic both results share next to its baseline value and returns the
+    regressions and the improvements.
+    A statistic changed if it differs by more than `tolerance` (e.g. 0.2 = 20%) and by more than
+    the minimum delta of its unit from the baseline. The absolute thresholds keep short, noisy
+    metrics from being flagged.
+    """
+    if current.get("settings") != baseline.get("settings"):
+        print("⚠️ The results were recorded with different settings. Comparing anyway.")
+
+    min_deltas = {"ms": min_delta_in_ms, "KB": min_delta_in_kb}
+    regressions: list[str] = []
+    improvements: list[str] = []
+    for name, metric in current["metrics"].items():
+        baseline_metric = baseline["metrics"].get(name)
+        if baseline_metric is None:
+            continue
+        for statistic, unit in COMPARED_STATISTICS.items():
+            if statistic not in metric or statistic not in baseline_metric:
+                continue
+            value = metric[statistic]
+            baseline_value = baseline_metric[statistic]
+            change = (value - baseline_value) / baseline_value if baseline_value else 0.0
+            significant = abs(change) > tolerance and abs(value - baseline_value) > min_deltas[unit]
+            marker = ""
+            if significant and value > baseline_value:
+                marker = "❌ regression"
+                regressions.append(f"{name} {statistic}")
+            elif significant:
+                marker = "🚀 improvement"
+                improvements.append(f"{name} {statistic}")
+            print(
+                f"  {name:<60} {statistic:<14} {baseline_value:>10.1f} → {value:>10.1f} {unit:<2} "
+                f"({change:+.1%}) {marker}"
+            )
+    return regressions, improvements
+
+
+def report_comparison(
+    current: dict[str, Any],
+    baseline_path: Path,
+    tolerance: float,
+    min_delta_in_ms: float,
+    min_delta_in_kb: float = 1024,
+) -> int:
+    """
+    Compares a result against the baseline file and returns the process exit code:
+    0 if nothing regressed, 1 otherwise.
+    """
+    print(f"📊 Comparing against baseline: {baseline_path}")
+    regressions, improvements = compare_results(
+        current, load_result(baseline_path), tolerance, min_delta_in_ms, min_delta_in_kb
+    )
+    if improvements:
+        print(f"🚀 {len(improvements)} improvement(s): {', '.join(improvements)}")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions.")
+    return 0
@@ -0,0 +1,362 @@
+"""
+End-to-end latency benchmark of the toolkit, from a new map exchange string to the final
+remote_viewer_config.txt.
+
+Runs the real toolkit (`python -m src.FactorioPreviewToolkit`) with a generated config that
+points it to the stand-in Factorio (fake_factorio.py), watches a map string file and uploads with
+local_sync into a temporary folder. Everything else comes from the project's config.ini, except
+the preview cache and skipping unchanged uploads, which are disabled so every job does the full work.
+Every job writes a new map string to the watched file and waits until the job trace is exported.
+
+Reported latencies (p50/p95 over all measured jobs):
+- end_to_end  time from writing the map string until the viewer config was last written
+- detection   time until the toolkit noticed the new map string
+- stage: ...  duration of every traced stage (controller stages, generator and uploader phases)
+
+Usage (from the project root):
+    python -m benchmarks.e2e_benchmark run [--runs 10] [--baseline benchmarks/baselines/e2e.json]
+    python -m benchmarks.e2e_benchmark compare <result.json> <baseline.json>
+
+The toolkit uses the project's temp_files/, previews/ and logs/ folders as in a normal session.
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from configparser import ConfigParser
+from pathlib import Path
+from typing import Any
+
+from benchmarks.benchmark_results import (
+    PROJECT_ROOT,
+    build_result,
+    get_default_result_path,
+    load_result,
+    report_comparison,
+    save_result,
+    summarize_latencies,
+)
+from benchmarks.fake_factorio import DEFAULT_PLANETS, make_map_exchange_string
+from src.FactorioPreviewToolkit.controller.process_cleanup import (
+    get_process_group_kwargs,
+    terminate_process_tree,
+)
+from src.FactorioPreviewToolkit.shared.shared_constants import CONFIG_FILE_ENV, constants
+
+FAKE_FACTORIO_SCRIPT = Path(__file__).with_name("fake_factorio.py")
+FAKE_FACTORIO_VERSION = (2, 0, 47, 0)
+
+# Config keys that point into the temporary workspace. They differ on every run,
+# so they are left out of the recorded settings.
+_WORKSPACE_PATH_KEYS = {
+    "fixed_path_factorio_executable",
+    "file_monitor_filepath",
+    "local_sync_target_dir",
+}
+
+
+def _create_fake_factorio_install(workspace: Path) -> Path:
+    """
+    Creates a Factorio-like install folder whose executable launches fake_factorio.py.
+    """
+    install_dir = workspace / "factorio"
+    (install_dir / "data" / "base").mkdir(parents=True)
+    bin_dir = install_dir / "bin" / "x64"
+    bin_dir.mkdir(parents=True)
+    if sys.platform == "win32":
+        launcher = bin_dir / "factorio.cmd"
+        launcher.write_text(f'@"{sys.executable}" "{FAKE_FACTORIO_SCRIPT}" %*\r\n')
+    else:
+        launcher = bin_dir / "factorio"
+        launcher.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_FACTORIO_SCRIPT}" "$@"\n')
+        launcher.chmod(0o755)
+    return launcher
+
+
+def _write_config(
+    workspace: Path, factorio_path: Path, map_string_file: Path, args: argparse.Namespace
+) -> tuple[Path, dict[str, str]]:
+    """
+    Writes the benchmark config: the project's config.ini with the benchmark overrides.
+    Returns its path and the effective values without the workspace paths.
+    """
+    sync_dir = workspace / "sync"
+    sync_dir.mkdir()
+    overrides = {
+        "settings": {
+            "factorio_locator_method": "fixed_path",
+            "fixed_path_factorio_executable": str(factorio_path),
+            "map_preview_size": str(args.preview_size),
+            "draft_preview_size": str(args.draft_preview_size),
+            "preview_cache_size_limit_in_mb": "0",
+            "use_warm_worker_processes": str(not args.cold_workers).lower(),
+            "record_job_traces": "true",
+        },
+        "map_exchange_input": {
+            "map_exchange_input_method": "file_monitor",
+            "file_monitor_filepath": str(map_string_file),
+        },
+        "upload": {
+            "upload_method": "local_sync",
+            "local_sync_target_dir": str(sync_dir),
+            "skip_unchanged_uploads": "false",
+            "tile_base_url": "",
+        },
+    }
+
+    parser = ConfigParser(interpolation=None)
+    parser.read(constants.PREVIEW_TOOLKIT_CONFIG_FILEPATH, encoding="utf-8")
+    for section, values in overrides.items():
+        for key, value in values.items():
+            parser[section][key] = value
+
+    config_path = workspace / "config.ini"
+    with config_path.open("w", encoding="utf-8") as f:
+        parser.write(f)
+
+    effective_values = {
+        key: value
+        for section in parser.sections()
+        for key, value in parser[section].items()
+        if key not in _WORKSPACE_PATH_KEYS
+    }
+    return config_path, effective_values
+
+
+def _get_fake_factorio_env(args: argparse.Namespace) -> dict[str, str]:
+    """
+    Returns the environment variables that configure fake_factorio.py.
+    """
+    major, minor, patch, _ = FAKE_FACTORIO_VERSION
+    return {
+        "FAKE_FACTORIO_VERSION": f"{major}.{minor}.{patch}",
+        "FAKE_FACTORIO_PLANETS": args.planets,
+        "FAKE_FACTORIO_STARTUP_DELAY": str(args.startup_delay),
+        "FAKE_FACTORIO_CREATE_DELAY": str(args.create_delay),
+        "FAKE_FACTORIO_BENCHMARK_DELAY": str(args.benchmark_delay),
+        "FAKE_FACTORIO_PREVIEW_DELAY": str(args.preview_delay),
+    }
+
+
+def _write_map_string(map_string_file: Path, map_string: str) -> float:
+    """
+    Replaces the watched file in one step, so the toolkit never reads half a string.
+    Returns the time.time() of the write.
+    """
+    temp_path = map_string_file.with_name(f"{map_string_file.name}.tmp")
+    temp_path.write_text(map_string, encoding="utf-8")
+    written_at = time.time()
+    os.replace(temp_path, map_string_file)
+    return written_at
+
+
+def _wait_for_new_job_trace(
+    known_traces: set[Path], toolkit: subprocess.Popen[bytes], timeout_in_sec: float
+) -> Path:
+    """
+    Waits until the toolkit exported the trace of a new job and returns its path.
+    """
+    deadline = time.monotonic() + timeout_in_sec
+    while time.monotonic() < deadline:
+        new_traces = set(constants.JOB_TRACES_DIR.glob("job-*.json")) - known_traces
+        if new_traces:
+            return max(new_traces)
+        if toolkit.poll() is not None:
+            raise RuntimeError(f"❌ The toolkit exited with code {toolkit.returncode}.")
+        time.sleep(0.05)
+    raise TimeoutError(f"❌ No job finished within {timeout_in_sec}s.")
+
+
+def _get_viewer_config_written_at(planets: list[str], written_after: float) -> float:
+    """
+    Returns when the viewer config was last written. Raises if the job did not finish
+    with links to all planets, i.e. it failed.
+    """
+    viewer_config = constants.PREVIEW_LINKS_FILEPATH
+    if not viewer_config.exists() or viewer_config.stat().st_mtime < written_after:
+        raise RuntimeError("❌ The job did not write a viewer config. Check the logs/ folder.")
+    content = viewer_config.read_text(encoding="utf-8")
+    missing = [planet for planet in planets if f'    {planet}: "' not in content]
+    if missing:
+        raise RuntimeError(f"❌ The viewer config has no links for: {', '.join(missing)}.")
+    return viewer_config.stat().st_mtime
+
+
+def _read_job_latencies(trace_path: Path, written_at: float) -> dict[str, float]:
+    """
+    Reads the detection latency and the duration of every stage (in ms) from a job trace.
+    Stages that ran more than once in the job are summed up.
+    """
+    with trace_path.open("r", encoding="utf-8") as f:
+        events: list[dict[str, Any]] = json.load(f)["traceEvents"]
+
+    latencies: dict[str, float] = defaultdict(float)
+    for event in events:
+        if event.get("ph") == "i" and "Map string detected" in event["name"]:
+            latencies["detection"] = event["ts"] / 1000 - written_at * 1000
+        elif event.get("ph") == "X" and event.get("cat") == "stage":
+            latencies[f"stage: {event['name']}"] += event["dur"] / 1000
+    return latencies
+
+
+def _stop_toolkit(toolkit: subprocess.Popen[bytes]) -> None:
+    """
+    Lets the toolkit shut down like after Ctrl+C, and tears it down if that does not work.
+    """
+    if toolkit.poll() is None and sys.platform != "win32":
+        toolkit.send_signal(signal.SIGINT)
+        try:
+            toolkit.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            pass
+    terminate_process_tree(toolkit.pid)
+    toolkit.wait()
+
+
+def _run_jobs(
+    toolkit: subprocess.Popen[bytes], map_string_file: Path, args: argparse.Namespace
+) -> dict[str, list[float]]:
+    """
+    Runs the warm-up and measured jobs one after another and collects their latencies.
+    The first warm-up job also waits for the toolkit to start.
+    """
+    planets = args.planets.split(",")
+    samples: dict[str, list[float]] = defaultdict(list)
+    known_traces = set(constants.JOB_TRACES_DIR.glob("job-*.json"))
+    total_jobs = args.warmup_runs + args.runs
+
+    for index in range(total_jobs):
+        is_warmup = index < args.warmup_runs
+        # Every map string is unique, so every job does the full work.
+        map_string = make_map_exchange_string(FAKE_FACTORIO_VERSION)
+        written_at = _write_map_string(map_string_file, map_string)
+        trace_path = _wait_for_new_job_trace(known_traces, toolkit, args.timeout)
+        known_traces.add(trace_path)
+
+        end_to_end = (_get_viewer_config_written_at(planets, written_at) - written_at) * 1000
+        label = "warm-up" if is_warmup else "measured"
+        print(f"⏱️ Job {index + 1}/{total_jobs} ({label}): {end_to_end:.0f} ms")
+        if not is_warmup:
+            samples["end_to_end"].append(end_to_end)
+            for name, latency in _read_job_latencies(trace_path, written_at).items():
+                samples[name].append(latency)
+        time.sleep(args.pause)
+    return samples
+
+
+def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Starts the toolkit against the fake Factorio, runs all jobs and returns the result.
+    """
+    with tempfile.TemporaryDirectory(prefix="factorio-preview-e2e-") as temp_dir:
+        workspace = Path(temp_dir)
+        factorio_path = _create_fake_factorio_install(workspace)
+        map_string_file = workspace / "map_string.txt"
+        map_string_file.touch()
+        config_path, config_values = _write_config(workspace, factorio_path, map_string_file, args)
+
+        fake_factorio_env = _get_fake_factorio_env(args)
+        env = {**os.environ, **fake_factorio_env, CONFIG_FILE_ENV: str(config_path)}
+        env.setdefault("SDL_AUDIODRIVER", "dummy")
+
+        print(f"🚀 Starting the toolkit with config: {config_path}")
+        toolkit = subprocess.Popen(
+            [sys.executable, "-m", "src.FactorioPreviewToolkit"],
+            cwd=PROJECT_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            **get_process_group_kwargs(),
+        )
+        try:
+            samples = _run_jobs(toolkit, map_string_file, args)
+        finally:
+            _stop_toolkit(toolkit)
+
+    settings = {"fake_factorio": fake_factorio_env, "config": config_values}
+    metrics = {name: summarize_latencies(values) for name, values in samples.items()}
+    return build_result("e2e", settings, metrics)
+
+
+def _print_summary(result: dict[str, Any]) -> None:
+    """
+    Prints p50 and p95 of every metric.
+    """
+    print(f"📊 {'Metric':<60} {'p50':>10} {'p95':>10}")
+    for name, metric in result["metrics"].items():
+        print(f"   {name:<60} {metric['p50_ms']:>7.0f} ms {metric['p95_ms']:>7.0f} ms")
+
+
+def _parse_args() -> argparse.Namespace:
+    """
+    Parses the command line of the run and compare commands.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark.")
+    run.add_argument("--runs", type=int, default=10, help="Measured jobs.")
+    run.add_argument(
+        "--warmup-runs",
+        type=int,
+        default=1,
+        help="Unmeasured jobs first (at least 1, the first also covers toolkit startup).",
+    )
+    run.add_argument("--pause", type=float, default=1.0, help="Seconds between jobs.")
+    run.add_argument("--timeout", type=float, default=300, help="Seconds a job may take.")
+    run.add_argument("--preview-size", type=int, default=1024)
+    run.add_argument("--draft-preview-size", type=int, default=0)
+    run.add_argument(
+        "--cold-workers", action="store_true", help="Disable the warm worker processes."
+    )
+    run.add_argument("--planets", default=DEFAULT_PLANETS, help="Comma-separated planets.")
+    run.add_argument("--startup-delay", type=float, default=0.5, help="Seconds per launch.")
+    run.add_argument("--create-delay", type=float, default=1.0, help="Seconds for --create.")
+    run.add_argument("--benchmark-delay", type=float, default=1.0, help="Seconds for --benchmark.")
+    run.add_argument("--preview-delay", type=float, default=2.0, help="Seconds per preview.")
+    run.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/).")
+    run.add_argument("--baseline", type=Path, help="Result file to compare against.")
+
+    compare = commands.add_parser("compare", help="Compare a result against a baseline.")
+    compare.add_argument("result", type=Path)
+    compare.add_argument("baseline", type=Path)
+
+    for command in (run, compare):
+        command.add_argument(
+            "--tolerance", type=float, default=0.2, help="Allowed slowdown (0.2 = 20%%)."
+        )
+        command.add_argument(
+            "--min-delta-ms", type=float, default=50, help="Ignore smaller slowdowns."
+        )
+
+    args = parser.parse_args()
+    if args.command == "run" and (args.runs < 1 or args.warmup_runs < 1):
+        parser.error("--runs and --warmup-runs must be at least 1.")
+    return args
+
+
+def main() -> int:
+    """
+    Runs the benchmark or compares two result files. Returns 1 if a regression was found.
+    """
+    args = _parse_args()
+    if args.command == "compare":
+        return report_comparison(
+            load_result(args.result), args.baseline, args.tolerance, args.min_delta_ms
+        )
+
+    result = run_benchmark(args)
+    _print_summary(result)
+    save_result(result, args.output or get_default_result_path("e2e"))
+    if args.baseline is not None:
+        return report_comparison(result, args.baseline, args.tolerance, args.min_delta_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Stand-in for the Factorio executable, used by the benchmarks.
+
+Implements the command lines the toolkit runs:
+- `--version`                                prints a Factorio version line
+- `--create <save.zip>`                      writes a minimal save
+- `--benchmark <save dir> -ticks 1`          runs the injected control.lua: writes the combined
+                                             map-gen-settings and the planet names to script-output
+- `--generate-map-preview=<png> ...`         renders a synthetic preview image
+
+Like Factorio, it honors `--config` (for the write-data folder) and holds the .lock file there
+while it runs. Delays and output are configured through environment variables, which the
+toolkit passes on to Factorio unchanged:
+
+- FAKE_FACTORIO_VERSION            version to report (default 2.0.47)
+- FAKE_FACTORIO_PLANETS            comma-separated planet names (default: the Space Age planets)
+- FAKE_FACTORIO_STARTUP_DELAY      seconds every launch takes before doing anything (default 0.5)
+- FAKE_FACTORIO_CREATE_DELAY       extra seconds for `--create` (default 1.0)
+- FAKE_FACTORIO_BENCHMARK_DELAY    extra seconds for `--benchmark` (default 1.0)
+- FAKE_FACTORIO_PREVIEW_DELAY      extra seconds per rendered preview (default 2.0)
+
+Only depends on the standard library and Pillow, so it can run under any Python interpreter
+that has the toolkit's dependencies installed.
+"""
+
+import base64
+import json
+import os
+import random
+import re
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+DEFAULT_PLANETS = "nauvis,vulcanus,gleba,fulgora,aquilo"
+
+# Terrain colors per planet (low, high), so previews of different planets look and compress differently.
+_PLANET_COLORS = {
+    "nauvis": ("#3b3a1c", "#8f8a4a"),
+    "vulcanus": ("#1c1412", "#b0491c"),
+    "gleba": ("#1d2b1c", "#8aa35a"),
+    "fulgora": ("#2a1f1a", "#a0806a"),
+    "aquilo": ("#2a3a4a", "#d8e4ee"),
+}
+
+
+def _pack_string(value: str) -> bytes:
+    """
+    Serializes a string with a one-byte length, like Factorio does for short strings.
+    """
+    encoded = value.encode("utf-8")
+    return struct.pack("<B", len(encoded)) + encoded
+
+
+def _pack_map_gen_settings(seed: int) -> bytes:
+    """
+    Serializes default map-gen-settings with the given seed in the Factorio 2.0 layout.
+    """
+    controls = ["iron-ore", "copper-ore", "stone", "coal", "crude-oil", "water", "trees"]
+    data = struct.pack("<BB", 0, len(controls))
+    for name in controls:
+        data += _pack_string(name) + struct.pack("<3f", 1.0, 1.0, 1.0)
+    data += struct.pack("<B", 0)  # autoplace_settings
+    data += struct.pack("<?3I", True, seed, 0, 0)
+    data += struct.pack("<2h", 0, 0) + struct.pack("<2h", 0, 0)  # area_to_generate_at_start
+    data += struct.pack("<f??", 1.0, False, False)
+    data += struct.pack("<B2h", 1, 0, 0)  # starting_points
+    data += struct.pack("<B", 0)  # property_expression_names
+    data += _pack_string("cliff") + _pack_string("nauvis_cliff")
+    data += struct.pack("<4f", 10.0, 40.0, 0.0, 1.0)
+    return data
+
+
+def make_map_exchange_string(version: tuple[int, int, int, int], payload_size: int = 256) -> str:
+    """
+    Returns a new map exchange string with a valid container (version header, map-gen-settings
+    with a random seed, random map settings payload, checksum), which the toolkit accepts.
+    """
+    raw = struct.pack("<4H", *version) + _pack_map_gen_settings(random.randrange(2**32))
+    raw += random.randbytes(payload_size)
+    raw += struct.pack("<I", zlib.crc32(raw))
+    return ">>>" + base64.b64encode(zlib.compress(raw, 9)).decode("ascii") + "<<<"
+
+
+def _get_delay(name: str, default: float) -> float:
+    """
+    Reads a delay in seconds from the environment.
+    """
+    return float(os.environ.get(f"FAKE_FACTORIO_{name}_DELAY", default))
+
+
+def _get_option(args: list[str], name: str) -> str | None:
+    """
+    Returns the value of `--name=value` or `--name value`, or None if the option is missing.
+    """
+    for index, arg in enumerate(args):
+        if arg.startswith(f"{name}="):
+            return arg.split("=", 1)[1]
+        if arg == name and index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+
+def _read_write_data_dir(config_path: Path) -> Path:
+    """
+    Reads the write-data folder from a Factorio config.ini.
+    """
+    match = re.search(r"^write-data=(.*)$", config_path.read_text(encoding="utf-8"), re.MULTILINE)
+    if match is None:
+        raise SystemExit(f"No write-data entry in {config_path}")
+    return Path(match.group(1).strip())
+
+
+def _create_save(save_zip: Path) -> None:
+    """
+    Writes a minimal save archive with the folder layout of a real one.
+    """
+    time.sleep(_get_delay("CREATE", 1.0))
+    name = save_zip.stem
+    with zipfile.ZipFile(save_zip, "w") as archive:
+        archive.writestr(f"{name}/control.lua", "-- Created by fake_factorio.py\n")
+        archive.writestr(f"{name}/info.json", json.dumps({"name": name}))
+        archive.writestr(f"{name}/level.dat0", os.urandom(64 * 1024))
+        archive.writestr(f"{name}/level-init.dat", os.urandom(16 * 1024))
+
+
+def _run_setup_save(save_dir: Path, write_data_dir: Path) -> None:
+    """
+    Emulates the injected control.lua: decodes nothing, but derives a stable seed from the
+    exchange string and writes the same files the real script writes.
+    """
+    time.sleep(_get_delay("BENCHMARK", 1.0))
+    control_lua = (save_dir / "control.lua").read_text(encoding="utf-8")
+
+    def lua_string(variable: str) -> str:
+        match = re.search(rf'local {variable} = "(.*)"', control_lua)
+        if match is None:
+            raise SystemExit(f"'{variable}' not found in {save_dir / 'control.lua'}")
+        return match.group(1)
+
+    exchange_string = lua_string("exchange_string")
+    seed = random.Random(exchange_string).randrange(2**32)
+    planets = os.environ.get("FAKE_FACTORIO_PLANETS", DEFAULT_PLANETS).split(",")
+
+    script_output = write_data_dir / "script-output"
+    script_output.mkdir(parents=True, exist_ok=True)
+    combined = {"map_gen_settings": {"seed": seed, "width": 0, "height": 0}, "map_settings": {}}
+    (script_output / lua_string("combined_map_gen_settings_filename")).write_text(
+        json.dumps(combined), encoding="utf-8"
+    )
+    (script_output / lua_string("supported_planets_filename")).write_text(
+        json.dumps(planets), encoding="utf-8"
+    )
+
+
+def render_terrain(seed: int, planet: str, size: int) -> Image.Image:
+    """
+    Renders smooth random terrain for the seed: low-resolution noise scaled up and colorized.
+    """
+    rng = random.Random(f"{seed}-{planet}")
+    noise_size = max(2, size // 48)
+    noise = Image.frombytes("L", (noise_size, noise_size), rng.randbytes(noise_size * noise_size))
+    terrain = noise.resize((size, size), Image.Resampling.BICUBIC)
+    low, high = _PLANET_COLORS.get(planet, ("#202020", "#c0c0c0"))
+    return ImageOps.colorize(terrain, low, high)
+
+
+def _render_preview(output: Path, settings_path: Path, size: int, planet: str) -> None:
+    """
+    Renders the synthetic preview of a planet with the seed from the map-gen-settings.
+    """
+    time.sleep(_get_delay("PREVIEW", 2.0))
+    seed = json.loads(settings_path.read_text(encoding="utf-8"))["seed"]
+    render_terrain(seed, planet, size).save(output)
+
+
+def main(args: list[str]) -> int:
+    """
+    Dispatches the command line like Factorio would.
+    """
+    if "--version" in args:
+        version = os.environ.get("FAKE_FACTORIO_VERSION", "2.0.47")
+        print(f"Version: {version} (build 1, fake, headless)")
+        return 0
+
+    time.sleep(_get_delay("STARTUP", 0.5))
+    config = _get_option(args, "--config")
+    write_data_dir = _read_write_data_dir(Path(config)) if config else Path.cwd()
+    write_data_dir.mkdir(parents=True, exist_ok=True)
+    lock_file = write_data_dir / ".lock"
+    lock_file.touch()
+    try:
+        if (save_zip := _get_option(args, "--create")) is not None:
+            _create_save(Path(save_zip))
+        elif (save_dir := _get_option(args, "--benchmark")) is not None:
+            _run_setup_save(Path(save_dir), write_data_dir)
+        elif (preview := _get_option(args, "--generate-map-preview")) is not None:
+            _render_preview(
+                Path(preview),
+                Path(_get_option(args, "--map-gen-settings") or ""),
+                int(_get_option(args, "--map-preview-size") or 1024),
+                _get_option(args, "--map-preview-planet") or "nauvis",
+            )
+        else:
+            print(f"fake_factorio.py: unsupported command line: {args}", file=sys.stderr)
+            return 1
+    finally:
+        lock_file.unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,126 @@
+"""
+Checks the native map-gen-settings reader against Factorio.
+
+For every map exchange string of the input, the map-gen-settings are read natively in Python and
+by the dummy save run with a real Factorio installation. Both results are compared value by value.
+Every difference is listed, including settings only one side has, so a misread or unread field of
+the binary layout shows up before 'decode_map_gen_settings_natively' is enabled.
+
+Needs a real Factorio 2.0 installation. Uses the toolkit's working folders like a normal run.
+
+Usage (from the project root):
+    python -m benchmarks.map_gen_settings_check path/to/factorio [map_strings.txt]
+"""
+
+import argparse
+import json
+import math
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from src.FactorioPreviewToolkit.batch.batch_renderer import read_map_strings
+from src.FactorioPreviewToolkit.preview_generator.preview_generation_setup import (
+    run_factorio_preview_setup,
+)
+from src.FactorioPreviewToolkit.shared.map_exchange_string import (
+    MapExchangeStringError,
+    decode_map_exchange_string,
+    extract_map_gen_settings,
+)
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+
+# Floats are stored as 32 bit values, Factorio writes them with more digits
+_FLOAT_TOLERANCE = 1e-6
+
+
+def _values_equal(expected: Any, actual: Any) -> bool:
+    """
+    Compares two JSON leaf values, with a tolerance for floats.
+    """
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return expected is actual
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return math.isclose(expected, actual, rel_tol=_FLOAT_TOLERANCE, abs_tol=_FLOAT_TOLERANCE)
+    return bool(expected == actual)
+
+
+def find_differences(expected: Any, actual: Any, path: str = "") -> Iterator[str]:
+    """
+    Yields a line for every value that differs between Factorio's result and the native one.
+    Factorio writes empty tables as lists or objects alike, so those count as equal.
+    """
+    if expected in ({}, []) and actual in ({}, []):
+        return
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(expected.keys() | actual.keys()):
+            key_path = f"{path}.{key}" if path else key
+            if key not in actual:
+                yield f"{key_path}: not read natively (Factorio: {json.dumps(expected[key])})"
+            elif key not in expected:
+                yield f"{key_path}: only read natively ({json.dumps(actual[key])})"
+            else:
+                yield from find_differences(expected[key], actual[key], key_path)
+    elif isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for index, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            yield from find_differences(expected_item, actual_item, f"{path}[{index}]")
+    elif not _values_equal(expected, actual):
+        yield f"{path}: Factorio {json.dumps(expected)}, native {json.dumps(actual)}"
+
+
+def check_map_string(factorio_path: Path, map_string: str) -> list[str]:
+    """
+    Returns the differences between Factorio's and the native map-gen-settings of a map string.
+    """
+    try:
+        native = extract_map_gen_settings(decode_map_exchange_string(map_string))
+    except MapExchangeStringError as e:
+        return [f"cannot be decoded: {e}"]
+    if native is None:
+        return ["the native reader gave up on this string"]
+
+    run_factorio_preview_setup(factorio_path, map_string)
+    with constants.MAP_GEN_SETTINGS_FILEPATH.open("r", encoding="utf-8") as f:
+        expected = json.load(f)
+    return list(find_differences(expected, native))
+
+
+def main() -> None:
+    """
+    Checks every map string of the input and exits with 1 if any of them differs.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("factorio_path", type=Path, help="Path to the Factorio executable.")
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="File with map exchange strings, or '-' to read them from stdin (default).",
+    )
+    args = parser.parse_args()
+
+    if args.input == "-":
+        map_strings = list(read_map_strings(sys.stdin))
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            map_strings = list(read_map_strings(f))
+    if not map_strings:
+        parser.error("No map exchange strings found in the input.")
+
+    failed_count = 0
+    for index, map_string in enumerate(map_strings, start=1):
+        differences = check_map_string(args.factorio_path, map_string)
+        print(f"{'❌' if differences else '✅'} Map string {index}/{len(map_strings)}")
+        for difference in differences:
+            print(f"      {difference}")
+        failed_count += bool(differences)
+
+    if failed_count:
+        print(f"❌ {failed_count} of {len(map_strings)} map string(s) differ.")
+        sys.exit(1)
+    print(f"✅ All {len(map_strings)} map string(s) match.")
+
+
+if __name__ == "__main__":
+    main()
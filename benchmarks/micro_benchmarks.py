@@ -0,0 +1,503 @@
+"""
+Microbenchmarks of the CPU-bound functions every job calls.
+
+Cases:
+- png: postprocess_preview_png (decode, quantize, PNG encode and upload timestamp in one pass)
+  and its steps quantize_image, encode_preview_image and splice_png_text_chunk (the timestamp),
+  on synthetic previews of 1024, 3072 and 8192 px
+- map string: is_valid_map_string and sanitize_map_string on realistic exchange strings and on
+  hostile clipboard payloads (multi-MB text, unterminated strings, corrupted data, zlib bombs)
+- viewer files: _write_viewer_config_js and write_planet_names_list_to_output
+
+Every case is called once to warm up, then repeated until it ran --max-repeats times or used up
+its time budget (but at least --min-repeats times). Calls that take less than 10 ms are timed in
+batches. Reported per case: p50/p95/min/max time per call, the peak of Python allocations during
+one call (tracemalloc) and the peak growth of the process memory during the warm-up call, which
+also covers Pillow's image buffers.
+
+Results are stored per commit in benchmarks/results/micro-<commit>.json (micro-<commit>-dirty.json
+if tracked files have uncommitted changes). To prove that a change is a win, run the benchmarks
+on the commit before it and on the change, and compare:
+    python -m benchmarks.micro_benchmarks run                      # on main
+    python -m benchmarks.micro_benchmarks run --baseline main      # on the change
+
+Usage (from the project root):
+    python -m benchmarks.micro_benchmarks run [--filter png] [--sizes 1024,3072] [--baseline REV]
+    python -m benchmarks.micro_benchmarks compare <result or revision> <baseline or revision>
+"""
+
+import argparse
+import base64
+import gc
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+import PIL
+import psutil
+from PIL import Image
+
+from benchmarks.benchmark_results import (
+    build_result,
+    get_commit_result_path,
+    get_git_commit,
+    get_default_result_path,
+    is_worktree_dirty,
+    load_result,
+    report_comparison,
+    resolve_git_revision,
+    save_result,
+    summarize_latencies,
+)
+from benchmarks.fake_factorio import DEFAULT_PLANETS, make_map_exchange_string, render_terrain
+from src.FactorioPreviewToolkit.preview_generator.preview_generation import (
+    write_planet_names_list_to_output,
+)
+from src.FactorioPreviewToolkit.shared.image_encoders import (
+    UPLOAD_TIME_KEYWORD,
+    encode_preview_image,
+    quantize_image,
+    splice_png_text_chunk,
+)
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.utils import is_valid_map_string, sanitize_map_string
+from src.FactorioPreviewToolkit.uploader.base_uploader import _write_viewer_config_js
+from src.FactorioPreviewToolkit.uploader.png_postprocessing import (
+    PostprocessingOptions,
+    postprocess_preview_png,
+)
+
+DEFAULT_IMAGE_SIZES = (1024, 3072, 8192)
+_MIN_BATCH_DURATION_IN_SEC = 0.01
+_UPLOAD_TIME = "2026-01-01T12:00:00+00:00"
+_HOSTILE_PAYLOAD_SIZE = 5 * 1024 * 1024
+
+
+class MicroBenchmark:
+    """
+    A benchmark case. prepare() returns the call to measure, so per-call setup (like copying the
+    input file) is not timed. Reusable calls can be repeated without preparing them again.
+    """
+
+    def __init__(self, name: str, prepare: Callable[[], Callable[[], object]], reusable: bool):
+        self.name = name
+        self.prepare = prepare
+        self.reusable = reusable
+
+
+class _PeakRssSampler:
+    """
+    Samples the resident memory of this process on a background thread and records by how much
+    it grew at most while the block ran.
+    """
+
+    def __init__(self) -> None:
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="RssSampler", daemon=True)
+        self._start_rss = 0
+        self._peak_rss = 0
+
+    @property
+    def peak_growth_in_kb(self) -> float:
+        return round(max(0, self._peak_rss - self._start_rss) / 1024, 1)
+
+    def __enter__(self) -> "_PeakRssSampler":
+        self._start_rss = self._peak_rss = self._process.memory_info().rss
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _sample(self) -> None:
+        self._peak_rss = max(self._peak_rss, self._process.memory_info().rss)
+
+    def _run(self) -> None:
+        while not self._stop.wait(0.001):
+            self._sample()
+
+
+def _time_sample(benchmark: MicroBenchmark, batch_size: int) -> float:
+    """
+    Times one sample and returns the duration per call in seconds.
+    """
+    call = benchmark.prepare()
+    gc.collect()
+    started_at = time.perf_counter()
+    for _ in range(batch_size):
+        call()
+    return (time.perf_counter() - started_at) / batch_size
+
+
+def _get_batch_size(benchmark: MicroBenchmark, warmup_duration: float) -> int:
+    """
+    Returns how many calls one sample has to batch to take at least 10 ms.
+    """
+    if not benchmark.reusable or warmup_duration >= _MIN_BATCH_DURATION_IN_SEC:
+        return 1
+    return min(100_000, int(_MIN_BATCH_DURATION_IN_SEC / max(warmup_duration, 1e-7)) + 1)
+
+
+def _measure_traced_peak_in_kb(benchmark: MicroBenchmark) -> float:
+    """
+    Returns the peak of Python allocations during one call.
+    """
+    call = benchmark.prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def measure(
+    benchmark: MicroBenchmark, min_repeats: int, max_repeats: int, time_budget_in_sec: float
+) -> dict[str, Any]:
+    """
+    Runs a case and returns its time statistics (per call) and peak memory.
+    """
+    call = benchmark.prepare()
+    gc.collect()
+    with _PeakRssSampler() as rss_sampler:
+        started_at = time.perf_counter()
+        call()
+        warmup_duration = time.perf_counter() - started_at
+
+    batch_size = _get_batch_size(benchmark, warmup_duration)
+    durations_in_ms: list[float] = []
+    deadline = time.perf_counter() + time_budget_in_sec
+    while len(durations_in_ms) < max_repeats and (
+        len(durations_in_ms) < min_repeats or time.perf_counter() < deadline
+    ):
+        durations_in_ms.append(_time_sample(benchmark, batch_size) * 1000)
+
+    return {
+        **summarize_latencies(durations_in_ms),
+        "calls_per_sample": batch_size,
+        "peak_traced_kb": _measure_traced_peak_in_kb(benchmark),
+        "peak_rss_kb": rss_sampler.peak_growth_in_kb,
+    }
+
+
+@lru_cache(maxsize=None)
+def _get_preview_image(size: int) -> Image.Image:
+    """
+    Returns a decoded synthetic preview of the given size, like the one Factorio renders.
+    """
+    return render_terrain(seed=12345, planet="nauvis", size=size)
+
+
+@lru_cache(maxsize=None)
+def _get_encoded_png(size: int) -> bytes:
+    """
+    Returns the encoded (quantized) PNG of the preview of the given size.
+    """
+    return encode_preview_image(_get_preview_image(size), "png", quality=80)
+
+
+def _get_png_benchmarks(sizes: list[int], work_dir: Path) -> list[MicroBenchmark]:
+    """
+    Returns the image cases for every preview size.
+    """
+    benchmarks: list[MicroBenchmark] = []
+    for size in sizes:
+        source_png = work_dir / f"preview-{size}.png"
+
+        def prepare_postprocessing(
+            size: int = size, source_png: Path = source_png
+        ) -> Callable[[], object]:
+            if not source_png.exists():
+                _get_preview_image(size).save(source_png)
+            target = work_dir / f"postprocess-{size}.png"
+            shutil.copyfile(source_png, target)
+            return lambda: postprocess_preview_png(target, PostprocessingOptions())
+
+        def prepare_quantize(size: int = size) -> Callable[[], object]:
+            image = _get_preview_image(size)
+            return lambda: quantize_image(image)
+
+        def prepare_encode(size: int = size) -> Callable[[], object]:
+            image = quantize_image(_get_preview_image(size))
+            return lambda: encode_preview_image(image, "png", quality=80)
+
+        def prepare_splice(size: int = size) -> Callable[[], object]:
+            png_bytes = _get_encoded_png(size)
+            return lambda: splice_png_text_chunk(png_bytes, UPLOAD_TIME_KEYWORD, _UPLOAD_TIME)
+
+        benchmarks += [
+            MicroBenchmark(f"png {size}px: postprocess_preview_png", prepare_postprocessing, False),
+            MicroBenchmark(f"png {size}px: quantize_image", prepare_quantize, True),
+            MicroBenchmark(f"png {size}px: encode_preview_image", prepare_encode, True),
+            MicroBenchmark(f"png {size}px: splice_png_text_chunk", prepare_splice, True),
+        ]
+    return benchmarks
+
+
+def _get_clipboard_payloads() -> dict[str, str]:
+    """
+    Returns realistic map exchange strings and hostile clipboard contents.
+    """
+    map_string = make_map_exchange_string((2, 0, 47, 0), payload_size=1200)
+    wrapped_lines = [map_string[i : i + 76] for i in range(0, len(map_string), 76)]
+    prose_line = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. >>> <<< "
+    base64_noise = make_map_exchange_string((2, 0, 47, 0), payload_size=_HOSTILE_PAYLOAD_SIZE)
+    zlib_bomb = zlib.compress(bytes(64 * 1024 * 1024), 9)
+    return {
+        "realistic": map_string,
+        "realistic, line-wrapped": "\n  " + "\r\n".join(wrapped_lines) + "\n",
+        "hostile 5 MB prose": prose_line * (_HOSTILE_PAYLOAD_SIZE // len(prose_line)),
+        "hostile 5 MB unterminated": base64_noise[:-3],
+        "hostile 5 MB valid container": base64_noise,
+        "hostile zlib bomb": ">>>" + base64.b64encode(zlib_bomb).decode("ascii") + "<<<",
+    }
+
+
+def _get_map_string_benchmarks() -> list[MicroBenchmark]:
+    """
+    Returns the map string validation cases for every clipboard payload.
+    """
+    benchmarks: list[MicroBenchmark] = []
+    for payload_name, payload in _get_clipboard_payloads().items():
+        for function in (is_valid_map_string, sanitize_map_string):
+
+            def prepare(
+                function: Callable[[str], object] = function, payload: str = payload
+            ) -> Callable[[], object]:
+                return lambda: function(payload)
+
+            benchmarks.append(
+                MicroBenchmark(f"map string {payload_name}: {function.__name__}", prepare, True)
+            )
+    return benchmarks
+
+
+def _get_viewer_file_benchmarks() -> list[MicroBenchmark]:
+    """
+    Returns the cases that write the viewer files, for the vanilla planets and a large mod pack.
+    """
+    benchmarks: list[MicroBenchmark] = []
+    for planet_count in (5, 500):
+        planets = DEFAULT_PLANETS.split(",")
+        planets = (planets * (planet_count // len(planets) + 1))[:planet_count]
+        planets = [f"{planet}-{index}" for index, planet in enumerate(planets)]
+        links = {planet: f"https://example.com/s/{planet}.png?dl=1" for planet in planets}
+        tile_sources = {
+            planet: {
+                "url": f"https://example.com/previews/{planet}_tiles/{{z}}/{{x}}/{{y}}.png",
+                "width": 3072,
+                "height": 3072,
+                "tileSize": 256,
+                "maxZoom": 4,
+            }
+            for planet in planets
+        }
+
+        def prepare_viewer_config(
+            links: dict[str, str] = links, tile_sources: dict[str, dict[str, Any]] = tile_sources
+        ) -> Callable[[], object]:
+            return lambda: _write_viewer_config_js(
+                links, "https://example.com/s/remote_planet_names.json?dl=1", tile_sources
+            )
+
+        def prepare_planet_names(planets: list[str] = planets) -> Callable[[], object]:
+            return lambda: write_planet_names_list_to_output(planets)
+
+        benchmarks += [
+            MicroBenchmark(
+                f"viewer {planet_count} planets: _write_viewer_config_js",
+                prepare_viewer_config,
+                True,
+            ),
+            MicroBenchmark(
+                f"viewer {planet_count} planets: write_planet_names_list_to_output",
+                prepare_planet_names,
+                True,
+            ),
+        ]
+    return benchmarks
+
+
+@contextmanager
+def _redirect_viewer_files(work_dir: Path) -> Iterator[None]:
+    """
+    Points the viewer files into the work folder, so the benchmarks never touch previews/.
+    """
+    redirected = {
+        "PREVIEW_LINKS_FILEPATH": work_dir / constants.PREVIEW_LINKS_FILEPATH.name,
+        "PLANET_NAMES_REMOTE_VIEWER_FILEPATH": work_dir
+        / constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH.name,
+        "PLANET_NAMES_LOCAL_VIEWER_FILEPATH": work_dir
+        / constants.PLANET_NAMES_LOCAL_VIEWER_FILEPATH.name,
+    }
+    for name, path in redirected.items():
+        setattr(constants, name, path)
+    try:
+        yield
+    finally:
+        for name in redirected:
+            delattr(constants, name)
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Runs all cases that match the filters and returns the result.
+    """
+    metrics: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="factorio-preview-micro-") as temp_dir:
+        work_dir = Path(temp_dir)
+        benchmarks = [
+            *_get_png_benchmarks(args.sizes, work_dir),
+            *_get_map_string_benchmarks(),
+            *_get_viewer_file_benchmarks(),
+        ]
+        selected = [
+            benchmark
+            for benchmark in benchmarks
+            if not args.filter or any(text in benchmark.name for text in args.filter)
+        ]
+
+        # The functions log every call. That would dominate the short cases.
+        logging.disable(logging.CRITICAL)
+        try:
+            with _redirect_viewer_files(work_dir):
+                for index, benchmark in enumerate(selected, start=1):
+                    metric = measure(
+                        benchmark, args.min_repeats, args.max_repeats, args.time_budget
+                    )
+                    metrics[benchmark.name] = metric
+                    print(
+                        f"⏱️ [{index}/{len(selected)}] {benchmark.name:<60} "
+                        f"p50 {metric['p50_ms']:>10.3f} ms  p95 {metric['p95_ms']:>10.3f} ms  "
+                        f"traced {metric['peak_traced_kb']:>9.0f} KB  "
+                        f"rss {metric['peak_rss_kb']:>9.0f} KB"
+                    )
+        finally:
+            logging.disable(logging.NOTSET)
+
+    settings = {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    return build_result("micro", settings, metrics)
+
+
+def _resolve_result_path(result: str) -> Path:
+    """
+    Accepts a result file or a git revision whose stored result should be used.
+    """
+    path = Path(result)
+    if path.exists():
+        return path
+    commit = resolve_git_revision(result)
+    if commit is None:
+        raise SystemExit(f"❌ '{result}' is neither a result file nor a git revision.")
+    path = get_commit_result_path("micro", commit)
+    if not path.exists():
+        raise SystemExit(f"❌ No stored result for {result} ({commit[:12]}) at {path}.")
+    return path
+
+
+def _get_result_path() -> Path:
+    """
+    Returns the per-commit result path of the checked out source.
+    """
+    commit = get_git_commit()
+    if commit is None:
+        return get_default_result_path("micro")
+    return get_commit_result_path("micro", commit, dirty=is_worktree_dirty())
+
+
+def _parse_args() -> argparse.Namespace:
+    """
+    Parses the command line of the run and compare commands.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the microbenchmarks.")
+    run.add_argument(
+        "--filter", action="append", help="Only run cases whose name contains this text."
+    )
+    run.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=list(DEFAULT_IMAGE_SIZES),
+        help="Comma-separated preview sizes in px.",
+    )
+    run.add_argument("--min-repeats", type=int, default=3)
+    run.add_argument("--max-repeats", type=int, default=20)
+    run.add_argument("--time-budget", type=float, default=10, help="Seconds per case.")
+    run.add_argument("--output", type=Path, help="Result file (default: stored per commit).")
+    run.add_argument("--baseline", help="Result file or git revision to compare against.")
+
+    compare = commands.add_parser("compare", help="Compare a result against a baseline.")
+    compare.add_argument("result", help="Result file or git revision.")
+    compare.add_argument("baseline", help="Result file or git revision.")
+
+    for command in (run, compare):
+        command.add_argument(
+            "--tolerance", type=float, default=0.1, help="Allowed change (0.1 = 10%%)."
+        )
+        command.add_argument(
+            "--min-delta-ms", type=float, default=0.01, help="Ignore smaller time changes."
+        )
+        command.add_argument(
+            "--min-delta-kb", type=float, default=64, help="Ignore smaller memory changes."
+        )
+
+    args = parser.parse_args()
+    if args.command == "run" and not 1 <= args.min_repeats <= args.max_repeats:
+        parser.error("--min-repeats must be at least 1 and at most --max-repeats.")
+    return args
+
+
+def main() -> int:
+    """
+    Runs the microbenchmarks or compares two results. Returns 1 if a regression was found.
+    """
+    args = _parse_args()
+    if args.command == "compare":
+        current = load_result(_resolve_result_path(args.result))
+    else:
+        # Resolve the baseline first, so a typo fails before the benchmarks ran.
+        if args.baseline is not None:
+            _resolve_result_path(args.baseline)
+        current = run_benchmarks(args)
+        save_result(current, args.output or _get_result_path())
+        if args.baseline is None:
+            return 0
+
+    baseline_path = _resolve_result_path(args.baseline)
+    return report_comparison(
+        current, baseline_path, args.tolerance, args.min_delta_ms, args.min_delta_kb
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Offline check of the rclone daemon uploader against rclone's local backend.
+
+Starts `rclone rcd` with a temporary rclone config whose only remote ("offline") is an alias of a
+local folder in a temporary workspace, and drives RcloneDaemonUploader against it:
+- the daemon is started on first use, and restarted after it was killed
+- an upload lands on the remote with the same content (operations/copyfile)
+- a file without a cached share link asks the daemon for one (operations/publiclink). The local
+  backend cannot create public links, so the check expects exactly that error from rclone.
+- a file with a cached share link gets the cached link back without asking for a new one
+- a file that was deleted on the remote drops its cached link when it is uploaded again
+- a failed upload drops the cached link of its file
+- a tile sync mirrors the tile folder and removes stale tiles (sync/sync)
+
+Needs no network access or cloud account. The project's temp_files/ and previews/ folders and
+the user's rclone config are not touched.
+
+Usage (from the project root):
+    python -m benchmarks.rclone_offline_check [--rclone path/to/rclone]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections.abc import Callable
+from configparser import ConfigParser
+from pathlib import Path
+
+import psutil
+
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.rclone_daemon import RcloneDaemon, RcloneDaemonError
+from src.FactorioPreviewToolkit.shared.shared_constants import (
+    CONFIG_FILE_ENV,
+    PREVIEWS_DIR_ENV,
+    TEMP_DIR_ENV,
+    constants,
+)
+from src.FactorioPreviewToolkit.uploader.rclone_daemon_uploader import RcloneDaemonUploader
+from src.FactorioPreviewToolkit.uploader.rclone_link_cache import (
+    get_cached_link,
+    get_link_cache_key,
+    store_link,
+)
+
+REMOTE_NAME = "offline"
+REMOTE_UPLOAD_DIR = "remote"
+CACHED_LINK = "https://example.invalid/cached-link"
+
+
+def _write_configs(workspace: Path, rclone_path: Path) -> dict[str, str]:
+    """
+    Writes an rclone config with the offline remote (a local folder of the workspace) and a
+    toolkit config that uploads to it.
+    Returns the environment variables that point rclone and the toolkit to them.
+    """
+    rclone_config = workspace / "rclone.conf"
+    rclone_config.write_text(
+        f"[{REMOTE_NAME}]\ntype = alias\nremote = {workspace.as_posix()}\n", encoding="utf-8"
+    )
+
+    parser = ConfigParser(interpolation=None)
+    parser.read(constants.PREVIEW_TOOLKIT_CONFIG_FILEPATH, encoding="utf-8")
+    overrides = {
+        "upload_method": "rclone",
+        "rclone_executable": str(rclone_path),
+        "rclone_remote_service": REMOTE_NAME,
+        "rclone_remote_upload_dir": REMOTE_UPLOAD_DIR,
+        "rclone_use_daemon": "true",
+        "rclone_link_cache_ttl_in_hours": "0",
+        "skip_unchanged_uploads": "false",
+        "tile_base_url": "",
+    }
+    for key, value in overrides.items():
+        parser["upload"][key] = value
+    toolkit_config = workspace / "config.ini"
+    with toolkit_config.open("w", encoding="utf-8") as f:
+        parser.write(f)
+
+    return {
+        "RCLONE_CONFIG": str(rclone_config),
+        CONFIG_FILE_ENV: str(toolkit_config),
+        TEMP_DIR_ENV: str(workspace / "temp_files"),
+        PREVIEWS_DIR_ENV: str(workspace / "previews"),
+    }
+
+
+def _kill_rclone_daemons() -> int:
+    """
+    Kills the rclone daemons this process started, like a crash would. Returns how many were killed.
+    """
+    daemons = [p for p in psutil.Process().children() if p.name().startswith("rclone")]
+    for daemon in daemons:
+        daemon.kill()
+    psutil.wait_procs(daemons, timeout=5)
+    return len(daemons)
+
+
+def _list_files(directory: Path) -> dict[str, bytes]:
+    """
+    Returns the content of every file below the directory by relative path.
+    """
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+def run_checks(workspace: Path) -> list[str]:
+    """
+    Runs all checks and returns the names of the failed ones.
+    Must run in a process started with the environment of _write_configs.
+    """
+    local_dir = workspace / "local"
+    local_dir.mkdir()
+    remote_dir = workspace / REMOTE_UPLOAD_DIR
+    remote_dir.mkdir()
+    preview = local_dir / "nauvis.png"
+    link_cache_key = get_link_cache_key(REMOTE_NAME, f"{REMOTE_UPLOAD_DIR}/nauvis.png")
+
+    daemon = RcloneDaemon(Config.get().rclone_executable)
+    failures: list[str] = []
+
+    def check(name: str, condition: Callable[[], bool]) -> None:
+        try:
+            passed = condition()
+        except Exception as e:
+            print(f"      {type(e).__name__}: {e}")
+            passed = False
+        print(f"{'✅' if passed else '❌'} {name}")
+        if not passed:
+            failures.append(name)
+
+    def start_lazily() -> bool:
+        daemon.ensure_running()
+        os.environ.update(daemon.get_client_env())
+        return daemon.is_healthy()
+
+    def upload_new_file() -> bool:
+        preview.write_bytes(os.urandom(4096))
+        try:
+            RcloneDaemonUploader().upload_single(preview, "nauvis.png")
+            return False
+        except RcloneDaemonError as e:
+            asked_for_link = "publiclink" in str(e) and "public links" in str(e)
+        return asked_for_link and (remote_dir / "nauvis.png").read_bytes() == preview.read_bytes()
+
+    def upload_with_cached_link() -> bool:
+        store_link(link_cache_key, CACHED_LINK)
+        preview.write_bytes(os.urandom(4096))
+        link = RcloneDaemonUploader().upload_single(preview, "nauvis.png")
+        return (
+            link == CACHED_LINK and (remote_dir / "nauvis.png").read_bytes() == preview.read_bytes()
+        )
+
+    def recreated_file_drops_link() -> bool:
+        store_link(link_cache_key, CACHED_LINK)
+        (remote_dir / "nauvis.png").unlink()
+        preview.write_bytes(os.urandom(4096))
+        try:
+            RcloneDaemonUploader().upload_single(preview, "nauvis.png")
+            return False
+        except RcloneDaemonError as e:
+            asked_for_link = "publiclink" in str(e)
+        return asked_for_link and (remote_dir / "nauvis.png").read_bytes() == preview.read_bytes()
+
+    def failed_upload_drops_link() -> bool:
+        store_link(link_cache_key, CACHED_LINK)
+        try:
+            RcloneDaemonUploader().upload_single(local_dir / "missing.png", "nauvis.png")
+            return False
+        except RcloneDaemonError:
+            return get_cached_link(link_cache_key) is None
+
+    def sync_tiles() -> bool:
+        tile_dir = local_dir / "nauvis_tiles"
+        for relative_path in ("manifest.json", "0/0_0.png", "1/0_0.png", "1/1_0.png"):
+            (tile_dir / relative_path).parent.mkdir(parents=True, exist_ok=True)
+            (tile_dir / relative_path).write_bytes(os.urandom(512))
+        stale_tile = remote_dir / "nauvis_tiles" / "2" / "3_3.png"
+        stale_tile.parent.mkdir(parents=True)
+        stale_tile.write_bytes(b"stale")
+        RcloneDaemonUploader().upload_tile_set(tile_dir, tile_dir.name)
+        return _list_files(remote_dir / "nauvis_tiles") == _list_files(tile_dir)
+
+    def restart_after_crash() -> bool:
+        if _kill_rclone_daemons() != 1 or daemon.is_healthy():
+            return False
+        daemon.ensure_running()
+        os.environ.update(daemon.get_client_env())
+        return daemon.is_healthy()
+
+    try:
+        check("Daemon starts on first use", start_lazily)
+        check("New file is uploaded and a share link is requested", upload_new_file)
+        check("Cached share link is reused", upload_with_cached_link)
+        check("Recreated file drops the cached share link", recreated_file_drops_link)
+        check("Failed upload drops the cached share link", failed_upload_drops_link)
+        check("Tile folder is mirrored and stale tiles are removed", sync_tiles)
+        check("Killed daemon is restarted", restart_after_crash)
+    finally:
+        daemon.stop()
+    return failures
+
+
+def main() -> None:
+    """
+    Runs the offline check in a temporary workspace. The toolkit resolves its folders and config
+    when it is imported, so the checks run in a subprocess started with the workspace environment.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--rclone",
+        type=Path,
+        default=shutil.which("rclone"),
+        help="Path to the rclone executable (default: rclone on the PATH).",
+    )
+    parser.add_argument("--workspace", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.workspace is not None:
+        failures = run_checks(args.workspace)
+        if failures:
+            print(f"❌ {len(failures)} check(s) failed.")
+            sys.exit(1)
+        print("✅ All checks passed.")
+        return
+
+    if args.rclone is None or not Path(args.rclone).is_file():
+        parser.error("rclone not found. Pass its path with --rclone.")
+    with tempfile.TemporaryDirectory(prefix="rclone-offline-check-") as workspace_name:
+        workspace = Path(workspace_name)
+        env = {**os.environ, **_write_configs(workspace, Path(args.rclone).resolve())}
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.rclone_offline_check",
+                "--workspace",
+                str(workspace),
+            ],
+            env=env,
+        )
+    sys.exit(result.returncode)
+
+
+if __name__ == "__main__":
+    main()
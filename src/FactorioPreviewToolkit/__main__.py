@@ -5,11 +5,12 @@ preview images for all configured planets using the Factorio CLI, and optionally
 uploads them to a remote service like Dropbox.
 """
 
+import multiprocessing
 import sys
 
 from src.FactorioPreviewToolkit.shared.error_popup import show_error_popup
 from src.FactorioPreviewToolkit.shared.shared_constants import constants
-from src.FactorioPreviewToolkit.shared.tee_logger import enable_tee_logging
+from src.FactorioPreviewToolkit.shared.tee_logger import enable_tee_logging, flush_tee_logging
 
 # Check CLI flags for subprocess modes early.
 # This is crucial in PyInstaller one-file builds:
@@ -18,6 +19,8 @@ from src.FactorioPreviewToolkit.shared.tee_logger import enable_tee_logging
 # the full controller + monitor again (causing infinite loops).
 # By checking for mode flags like --preview-generator-mode or --uploader-mode
 # and exiting early, we only start the desired module.
+# freeze_support() does the same for the worker processes of multiprocessing pools.
+multiprocessing.freeze_support()
 if "--preview-generator-mode" in sys.argv:
     from src.FactorioPreviewToolkit.preview_generator.__main__ import main as generator_main
 
@@ -28,6 +31,28 @@ if "--uploader-mode" in sys.argv:
 
     uploader_main()
     sys.exit()
+if "--image-format-benchmark" in sys.argv:
+    from src.FactorioPreviewToolkit.uploader.image_format_benchmark import (
+        main as image_format_benchmark_main,
+    )
+
+    image_format_benchmark_main()
+    sys.exit()
+if "--batch-mode" in sys.argv:
+    from src.FactorioPreviewToolkit.batch.__main__ import main as batch_main
+
+    batch_main()
+    sys.exit()
+if "--run-history" in sys.argv:
+    from src.FactorioPreviewToolkit.run_history.__main__ import main as run_history_main
+
+    run_history_main()
+    sys.exit()
+if "--warm-worker-mode" in sys.argv:
+    from src.FactorioPreviewToolkit.warm_worker.__main__ import main as warm_worker_main
+
+    warm_worker_main()
+    sys.exit()
 
 
 enable_tee_logging(constants.LOGS_DIR, keep_last_n=20)
@@ -51,3 +76,4 @@ if __name__ == "__main__":
         if controller is not None:
             controller.stop()
         log.info("👋 Factorio preview Toolkit exited.")
+        flush_tee_logging()
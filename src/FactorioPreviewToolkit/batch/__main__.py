@@ -0,0 +1,104 @@
+"""
+Headless batch mode: renders the previews of many map exchange strings, e.g. seed candidates.
+
+Reads map exchange strings from a file or from stdin (one per line, or wrapped over several
+lines), renders them on parallel preview generator processes and writes the previews of each
+into its own folder of the output folder, next to a results log (results.jsonl).
+Running the same batch again resumes it: map strings that already succeeded are skipped.
+No popups are shown; failures are logged to generator.log in the folder of the map string.
+
+Run with: python -m src.FactorioPreviewToolkit.batch <factorio_path> [input] [options]
+"""
+
+import argparse
+import os
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+from src.FactorioPreviewToolkit.batch.batch_renderer import (
+    BatchRenderer,
+    read_map_strings,
+    write_batch_config,
+)
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+
+def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command-line arguments.
+    """
+    raw_args = argv if argv is not None else sys.argv[1:]
+
+    if "--batch-mode" in raw_args:
+        batch_index = raw_args.index("--batch-mode")
+        raw_args = raw_args[batch_index + 1 :]
+
+    parser = argparse.ArgumentParser(description="Render the previews of many map strings")
+    parser.add_argument("factorio_path", type=Path, help="Path to the Factorio executable.")
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="File with map exchange strings, or '-' to read them from stdin (default).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("batch_output"),
+        help="Output folder. Running a batch again with the same folder resumes it.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) // 4),
+        help="Number of map strings rendered at the same time (default: one per 4 CPU cores).",
+    )
+    parser.add_argument(
+        "--planet-workers",
+        type=int,
+        default=1,
+        help="Number of planets each worker renders at the same time.",
+    )
+    parser.add_argument(
+        "--preview-size",
+        type=int,
+        help="Size (in pixels) of the previews. Defaults to map_preview_size from config.ini.",
+    )
+    arguments = parser.parse_args(raw_args)
+    if arguments.workers <= 0 or arguments.planet_workers <= 0:
+        parser.error("--workers and --planet-workers must be positive.")
+    if arguments.preview_size is not None and arguments.preview_size <= 0:
+        parser.error("--preview-size must be positive.")
+    return arguments
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Runs a batch from CLI arguments.
+    """
+    arguments = parse_arguments(argv)
+    factorio_path = arguments.factorio_path.resolve()
+    if not factorio_path.is_file():
+        log.error(f"❌ Factorio executable not found: {factorio_path}")
+        sys.exit(1)
+
+    output_dir = arguments.output.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    config_path = write_batch_config(
+        output_dir, factorio_path, arguments.preview_size, arguments.planet_workers
+    )
+    renderer = BatchRenderer(factorio_path, output_dir, arguments.workers, config_path)
+    try:
+        if arguments.input == "-":
+            renderer.run(read_map_strings(sys.stdin))
+        else:
+            with open(arguments.input, "r", encoding="utf-8") as f:
+                renderer.run(read_map_strings(f))
+    except KeyboardInterrupt:
+        log.info("⚠️ Batch interrupted. Run it again with the same output folder to resume.")
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Headless batch rendering of many map exchange strings.
+
+Every map string is rendered by its own preview generator subprocess, with up to N of them
+running at the same time. Each worker slot has a private working folder (temp files, Factorio
+write-data, caches), so the Factorio instances never share files or lock files. Only the mods
+folder of the toolkit is shared, so modded map strings render with their mods. The previews of a
+map string go to their own output folder, named after the hash of the map string.
+
+Every finished map string is appended to a JSON lines results log. Restarting a batch with the
+same output folder skips the map strings that already succeeded (or were invalid), so an
+interrupted batch resumes where it stopped.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from configparser import ConfigParser
+from datetime import datetime
+from pathlib import Path
+from queue import Queue
+from threading import BoundedSemaphore, Lock
+from typing import Literal
+
+from pydantic import BaseModel
+
+from src.FactorioPreviewToolkit.controller.process_cleanup import (
+    get_process_group_kwargs,
+    terminate_process_tree,
+)
+from src.FactorioPreviewToolkit.shared.error_popup import HEADLESS_ENV
+from src.FactorioPreviewToolkit.shared.shared_constants import (
+    CONFIG_FILE_ENV,
+    MODS_DIR_ENV,
+    PREVIEWS_DIR_ENV,
+    TEMP_DIR_ENV,
+    constants,
+)
+from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.shared.utils import is_valid_map_string
+
+RESULTS_LOG_FILENAME = "results.jsonl"
+_BATCH_CONFIG_FILENAME = "batch_config.ini"
+_WORKERS_DIRNAME = ".workers"
+_MAP_STRING_FILENAME = "map_string.txt"
+_GENERATOR_LOG_FILENAME = "generator.log"
+
+# Map strings that are not rendered again when a batch resumes
+_FINISHED_STATUSES = ("succeeded", "invalid")
+
+BatchStatus = Literal["succeeded", "failed", "invalid"]
+
+
+class BatchResult(BaseModel):
+    """
+    One line of the results log: the outcome of rendering one map string.
+    """
+
+    map_string_hash: str
+    status: BatchStatus
+    # Folder of the previews inside the output folder, empty if nothing was rendered
+    output_dir: str
+    planets: list[str] = []
+    seed: int | None = None
+    duration_in_sec: float = 0.0
+    finished_at: str
+
+
+def read_map_strings(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yields every map exchange string (>>>...<<<) in the input, with all whitespace removed.
+    A string may be wrapped over several lines. Everything outside of the strings is ignored.
+    """
+    pending = ""
+    for line in lines:
+        pending += line
+        while True:
+            start = pending.find(">>>")
+            if start < 0:
+                pending = ""
+                break
+            end = pending.find("<<<", start + 3)
+            if end < 0:
+                pending = pending[start:]
+                break
+            yield re.sub(r"\s+", "", pending[start : end + 3])
+            pending = pending[end + 3 :]
+
+
+def get_map_string_hash(map_string: str) -> str:
+    """
+    Returns the SHA-256 hash of a map string, which identifies it in the results log.
+    """
+    return hashlib.sha256(map_string.encode("utf-8")).hexdigest()
+
+
+def load_finished_map_string_hashes(results_log: Path) -> set[str]:
+    """
+    Returns the hashes of the map strings the results log records as finished.
+    A line cut off by an interrupted batch is skipped.
+    """
+    finished: set[str] = set()
+    if not results_log.exists():
+        return finished
+    with results_log.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get("status") in _FINISHED_STATUSES:
+                finished.add(result["map_string_hash"])
+    return finished
+
+
+def write_batch_config(
+    output_dir: Path, factorio_path: Path, preview_size: int | None, planet_workers: int
+) -> Path:
+    """
+    Writes the config the batch workers run with: the toolkit's config.ini without drafts,
+    preview cache and uploads, with the given Factorio executable and render settings.
+    """
+    parser = ConfigParser(interpolation=None)
+    parser.read(constants.PREVIEW_TOOLKIT_CONFIG_FILEPATH, encoding="utf-8")
+    overrides = {
+        "factorio_locator_method": "fixed_path",
+        "fixed_path_factorio_executable": str(factorio_path),
+        "map_exchange_input_method": "clipboard_monitor",
+        "draft_preview_size": "0",
+        "parallel_preview_workers": str(planet_workers),
+        "preview_cache_size_limit_in_mb": "0",
+        "upload_method": "skip",
+    }
+    if preview_size is not None:
+        overrides["map_preview_size"] = str(preview_size)
+    for key, value in overrides.items():
+        section = next((s for s in parser.sections() if parser.has_option(s, key)), "settings")
+        parser[section][key] = value
+
+    config_path = output_dir / _BATCH_CONFIG_FILENAME
+    with config_path.open("w", encoding="utf-8") as f:
+        parser.write(f)
+    return config_path
+
+
+def _get_generator_command(factorio_path: Path, map_string: str) -> list[str]:
+    """
+    Returns the command line of a preview generator subprocess.
+    """
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "--preview-generator-mode", str(factorio_path), map_string]
+    return [
+        sys.executable,
+        "-u",
+        "-m",
+        "src.FactorioPreviewToolkit.preview_generator",
+        str(factorio_path),
+        map_string,
+    ]
+
+
+class _Progress:
+    """
+    Counts the finished map strings and rendered previews and reports the throughput.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._started_at = time.perf_counter()
+        self.skipped_count = 0
+        self.counts: dict[BatchStatus, int] = {"succeeded": 0, "failed": 0, "invalid": 0}
+        self.preview_count = 0
+
+    def add(self, result: BatchResult) -> None:
+        """
+        Counts a finished map string and logs the progress.
+        """
+        with self._lock:
+            self.counts[result.status] += 1
+            self.preview_count += len(result.planets)
+            log.info(
+                f"{self._get_status_icon(result.status)} {result.map_string_hash[:16]}: {self.format()}"
+            )
+
+    @staticmethod
+    def _get_status_icon(status: BatchStatus) -> str:
+        """
+        Returns the log icon of a result status.
+        """
+        return {"succeeded": "✅", "failed": "❌", "invalid": "⚠️"}[status]
+
+    def format(self) -> str:
+        """
+        Returns the counts and the throughput so far.
+        """
+        minutes = (time.perf_counter() - self._started_at) / 60
+        done_count = sum(self.counts.values())
+        return (
+            f"{done_count} done ({self.counts['succeeded']} succeeded, "
+            f"{self.counts['failed']} failed, {self.counts['invalid']} invalid), "
+            f"{self.skipped_count} skipped · {self.preview_count / minutes:.1f} previews/min, "
+            f"{self.counts['succeeded'] / minutes:.1f} map strings/min"
+        )
+
+
+class BatchRenderer:
+    """
+    Renders the previews of many map strings on a pool of parallel preview generator processes.
+    """
+
+    def __init__(self, factorio_path: Path, output_dir: Path, worker_count: int, config_path: Path):
+        """
+        Sets up the renderer. The output folder holds the results log, one folder per map string
+        and the private working folders of the workers.
+        """
+        self._factorio_path = factorio_path
+        self._output_dir = output_dir
+        self._worker_count = worker_count
+        self._config_path = config_path
+        self._results_log = output_dir / RESULTS_LOG_FILENAME
+        self._results_lock = Lock()
+        self._free_workers: Queue[int] = Queue()
+        for index in range(worker_count):
+            self._free_workers.put(index)
+        self._running_processes: set[subprocess.Popen[bytes]] = set()
+        self._processes_lock = Lock()
+        self._stopping = False
+
+    def run(self, map_strings: Iterable[str]) -> _Progress:
+        """
+        Renders every map string that has not finished in an earlier run and returns the progress.
+        Map strings are read lazily, so the input can be a stream. Interrupting the batch
+        (Ctrl+C) stops all workers; the map strings they were rendering are retried on resume.
+        """
+        finished = load_finished_map_string_hashes(self._results_log)
+        progress = _Progress()
+        self._remove_stale_lock_files()
+
+        # Only read as many map strings ahead as the workers can take on
+        submit_slots = BoundedSemaphore(self._worker_count * 2)
+        with log_section(
+            f"🏭 Rendering map strings with {self._worker_count} workers into {self._output_dir}..."
+        ):
+            pool = ThreadPoolExecutor(max_workers=self._worker_count, thread_name_prefix="Batch")
+            try:
+                for map_string in map_strings:
+                    map_string_hash = get_map_string_hash(map_string)
+                    if map_string_hash in finished:
+                        progress.skipped_count += 1
+                        continue
+                    finished.add(map_string_hash)
+                    submit_slots.acquire()
+                    future = pool.submit(self._render, map_string, map_string_hash, progress)
+                    future.add_done_callback(lambda _: submit_slots.release())
+                    future.add_done_callback(self._log_unexpected_error)
+                pool.shutdown(wait=True)
+            except BaseException:
+                self._stop()
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+            finally:
+                log.info(f"📊 {progress.format()}")
+        return progress
+
+    def _render(self, map_string: str, map_string_hash: str, progress: _Progress) -> None:
+        """
+        Renders one map string on a free worker and records the result, unless the batch stops.
+        """
+        entry_dir = self._output_dir / map_string_hash[:16]
+        result: BatchResult | None
+        if not is_valid_map_string(map_string):
+            result = BatchResult(
+                map_string_hash=map_string_hash,
+                status="invalid",
+                output_dir="",
+                finished_at=datetime.now().isoformat(timespec="seconds"),
+            )
+        else:
+            worker_index = self._free_workers.get()
+            try:
+                result = self._run_generator(map_string, map_string_hash, entry_dir, worker_index)
+            finally:
+                self._free_workers.put(worker_index)
+        if result is not None:
+            self._record(result)
+            progress.add(result)
+
+    def _run_generator(
+        self, map_string: str, map_string_hash: str, entry_dir: Path, worker_index: int
+    ) -> BatchResult | None:
+        """
+        Runs the preview generator for one map string in the private folders of a worker.
+        Returns None if the batch was stopped while it ran.
+        """
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        entry_dir.mkdir(parents=True)
+        (entry_dir / _MAP_STRING_FILENAME).write_text(map_string, encoding="utf-8")
+        worker_temp_dir = self._get_worker_temp_dir(worker_index)
+        env = {
+            **os.environ,
+            CONFIG_FILE_ENV: str(self._config_path),
+            TEMP_DIR_ENV: str(worker_temp_dir),
+            # The private working folder has no mods, so every worker uses the toolkit's mods
+            MODS_DIR_ENV: str(constants.FACTORIO_MODS_DIR.resolve()),
+            PREVIEWS_DIR_ENV: str(entry_dir),
+            HEADLESS_ENV: "1",
+            "PYTHONIOENCODING": "utf-8",
+        }
+
+        started_at = time.perf_counter()
+        with (entry_dir / _GENERATOR_LOG_FILENAME).open("wb") as generator_log:
+            with self._processes_lock:
+                if self._stopping:
+                    return None
+                process = subprocess.Popen(
+                    _get_generator_command(self._factorio_path, map_string),
+                    stdout=generator_log,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    **get_process_group_kwargs(),
+                )
+                self._running_processes.add(process)
+            exit_code = process.wait()
+            with self._processes_lock:
+                self._running_processes.discard(process)
+                if self._stopping:
+                    return None
+        duration_in_sec = time.perf_counter() - started_at
+
+        status: BatchStatus = "succeeded" if exit_code == 0 else "failed"
+        return BatchResult(
+            map_string_hash=map_string_hash,
+            status=status,
+            output_dir=entry_dir.name,
+            finished_at=datetime.now().isoformat(timespec="seconds"),
+            planets=sorted(path.stem for path in entry_dir.glob("*.png")),
+            seed=self._read_seed(worker_temp_dir) if status == "succeeded" else None,
+            duration_in_sec=round(duration_in_sec, 3),
+        )
+
+    def _get_worker_temp_dir(self, worker_index: int) -> Path:
+        """
+        Returns the private working folder of a worker.
+        """
+        return self._output_dir / _WORKERS_DIRNAME / f"worker-{worker_index}"
+
+    @staticmethod
+    def _read_seed(worker_temp_dir: Path) -> int | None:
+        """
+        Reads the seed from the map-gen-settings the generator wrote into the worker's folder.
+        """
+        settings_path = worker_temp_dir / constants.MAP_GEN_SETTINGS_FILEPATH.relative_to(
+            constants.BASE_TEMP_DIR
+        )
+        try:
+            seed = json.loads(settings_path.read_text(encoding="utf-8"))["seed"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return seed if isinstance(seed, int) else None
+
+    def _record(self, result: BatchResult) -> None:
+        """
+        Appends a result to the results log. Each line is flushed right away, so an interrupted
+        batch loses at most the line being written.
+        """
+        with self._results_lock, self._results_log.open("a", encoding="utf-8") as f:
+            f.write(result.model_dump_json() + "\n")
+            f.flush()
+
+    def _remove_stale_lock_files(self) -> None:
+        """
+        Deletes the .lock files the Factorio instances of an interrupted batch left behind.
+        """
+        for lock_file in (self._output_dir / _WORKERS_DIRNAME).glob("**/.lock"):
+            lock_file.unlink(missing_ok=True)
+
+    def _stop(self) -> None:
+        """
+        Stops all running generators together with their Factorio instances.
+        """
+        with self._processes_lock:
+            self._stopping = True
+            processes = list(self._running_processes)
+        if processes:
+            log.info(f"🛑 Stopping {len(processes)} running workers...")
+        for process in processes:
+            terminate_process_tree(process.pid)
+
+    @staticmethod
+    def _log_unexpected_error(future: Future[None]) -> None:
+        """
+        Logs an error that escaped a render task, e.g. an unwritable output folder.
+        """
+        error = future.exception() if not future.cancelled() else None
+        if error is not None:
+            log.error(f"❌ Batch task failed: {error!r}")
@@ -1,15 +1,19 @@
 import queue
+import time
 from pathlib import Path
 from queue import Queue
 
 from src.FactorioPreviewToolkit.controller.map_processing_pipeline import MapProcessingPipeline
+from src.FactorioPreviewToolkit.controller.process_cleanup import remove_stale_factorio_lock_files
 from src.FactorioPreviewToolkit.factorio_path_provider.base import FactorioPathProvider
 from src.FactorioPreviewToolkit.factorio_path_provider.factory import get_factorio_path_provider
 from src.FactorioPreviewToolkit.map_string_provider.base import MapStringProvider
 from src.FactorioPreviewToolkit.map_string_provider.factory import get_map_string_provider
-from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.metrics import EVENT_QUEUE_DEPTH, MetricsServer
 from src.FactorioPreviewToolkit.shared.structured_logger import log
 from src.FactorioPreviewToolkit.shared.structured_logger import log_section
+from src.FactorioPreviewToolkit.shared.structured_logger import set_trace_process_name
 from src.FactorioPreviewToolkit.shared.utils import sanitize_map_string
 
 
@@ -32,10 +36,12 @@ class PreviewController:
 
         self._latest_factorio_path: Path | None = None
         self._latest_map_string: str | None = None
+        self._latest_map_string_detected_at: float | None = None
         self._map_string_analysed: bool = False
 
-        self._event_queue: Queue[tuple[str, str | Path]] = Queue()
+        self._event_queue: Queue[tuple[str, str | Path, float]] = Queue()
         self._map_processing_pipeline = MapProcessingPipeline()
+        self._metrics_server: MetricsServer | None = None
 
     def _process_events(self) -> None:
         """
@@ -45,7 +51,7 @@ class PreviewController:
         with log_section("💤 Waiting for events..."):
             while self._running:
                 try:
-                    event_type, data = self._event_queue.get(timeout=0.5)
+                    event_type, data, received_at = self._event_queue.get(timeout=0.5)
                 except queue.Empty:
                     continue
 
@@ -53,6 +59,7 @@ class PreviewController:
                     case "map_string":
                         assert isinstance(data, str)
                         self._latest_map_string = sanitize_map_string(data)
+                        self._latest_map_string_detected_at = received_at
                         self._map_string_analysed = False
                         log.info(f"✅ Updated map exchange string: {self._latest_map_string}")
 
@@ -80,7 +87,11 @@ class PreviewController:
         assert self._latest_map_string is not None
         assert self._latest_factorio_path is not None
 
-        self._map_processing_pipeline.run_async(self._latest_factorio_path, self._latest_map_string)
+        self._map_processing_pipeline.run_async(
+            self._latest_factorio_path,
+            self._latest_map_string,
+            detected_at=self._latest_map_string_detected_at,
+        )
 
     def stop(self) -> None:
         """
@@ -90,6 +101,10 @@ class PreviewController:
             self._map_string_provider.stop()
         if self._factorio_path_provider is not None:
             self._factorio_path_provider.stop()
+        self._map_processing_pipeline.shutdown()
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
+            self._metrics_server = None
         log.info("✅ Controller stopped successfully.")
         self._running = False
 
@@ -98,18 +113,18 @@ class PreviewController:
         Starts the PreviewController to process map strings and Factorio paths asynchronously.
         """
 
-        lock_file = constants.FACTORIO_LOCK_FILEPATH
-        try:
-            lock_file.unlink(missing_ok=True)
-        except Exception as e:
-            log.info(f"Could not delete lock file {lock_file}: {e}")
-            raise
+        remove_stale_factorio_lock_files()
+        set_trace_process_name("Controller")
+        EVENT_QUEUE_DEPTH.set_function(self._event_queue.qsize)
+        if Config.get().metrics_port:
+            self._metrics_server = MetricsServer(Config.get().metrics_port)
+            self._metrics_server.start()
 
         def on_new_map_string(map_string: str) -> None:
-            self._event_queue.put(("map_string", map_string))
+            self._event_queue.put(("map_string", map_string, time.time()))
 
         def on_new_factorio_path(factorio_path: Path) -> None:
-            self._event_queue.put(("factorio_path", factorio_path))
+            self._event_queue.put(("factorio_path", factorio_path, time.time()))
 
         self._map_string_provider = get_map_string_provider(on_new_map_string)
         self._factorio_path_provider = get_factorio_path_provider(on_new_factorio_path)
@@ -0,0 +1,85 @@
+"""
+Per-job tracing.
+
+While a job runs, the controller and its subprocesses append their spans to one JSON lines file.
+The subprocesses find it through an environment variable. When the job ends, the events are
+exported as a Chrome trace-event JSON file (logs/traces/job-*.json), which can be opened in
+chrome://tracing or https://ui.perfetto.dev to see where the time went.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import (
+    TRACE_FILE_ENV,
+    log,
+    set_trace_file,
+)
+from src.FactorioPreviewToolkit.shared.utils import write_file_atomically
+
+_MAX_KEPT_JOB_TRACES = 20
+
+
+def start_job_trace() -> Path:
+    """
+    Creates the trace file of a new job and starts recording the spans of this process to it.
+    """
+    constants.JOB_TRACES_DIR.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    trace_file = constants.JOB_TRACES_DIR / f"job-{timestamp}.jsonl"
+    trace_file.touch()
+    set_trace_file(trace_file)
+    return trace_file
+
+
+def get_trace_env(trace_file: Path) -> dict[str, str]:
+    """
+    Returns the environment variables that make subprocesses record to the trace file.
+    """
+    return {TRACE_FILE_ENV: str(trace_file)}
+
+
+def _read_trace_events(trace_file: Path) -> list[dict[str, Any]]:
+    """
+    Reads the recorded events. Lines cut off by a killed process are skipped.
+    """
+    events: list[dict[str, Any]] = []
+    with trace_file.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def _remove_old_job_traces() -> None:
+    """
+    Keeps only the most recent exported traces.
+    """
+    exported_traces = sorted(constants.JOB_TRACES_DIR.glob("job-*.json"))
+    for old_trace in exported_traces[:-_MAX_KEPT_JOB_TRACES]:
+        old_trace.unlink(missing_ok=True)
+
+
+def finish_job_trace(trace_file: Path) -> Path | None:
+    """
+    Stops recording and exports the job's events as a Chrome trace-event JSON file.
+    Returns the path of the exported file, or None if the export failed.
+    """
+    set_trace_file(None)
+    output_path = trace_file.with_suffix(".json")
+    try:
+        trace = {"traceEvents": _read_trace_events(trace_file), "displayTimeUnit": "ms"}
+        write_file_atomically(output_path, json.dumps(trace, ensure_ascii=False).encode("utf-8"))
+        os.remove(trace_file)
+        _remove_old_job_traces()
+    except OSError as e:
+        log.warning(f"⚠️ Failed to export job trace: {e}")
+        return None
+    log.info(f"🧭 Job trace written to: {output_path}")
+    return output_path
@@ -1,26 +1,79 @@
+import subprocess
 import sys
+import time
 from pathlib import Path
-from threading import Lock, Thread
+from threading import Lock, Thread, current_thread
 
+from src.FactorioPreviewToolkit.controller.job_trace import (
+    finish_job_trace,
+    get_trace_env,
+    start_job_trace,
+)
+from src.FactorioPreviewToolkit.controller.process_cleanup import remove_stale_factorio_lock_files
+from src.FactorioPreviewToolkit.controller.process_tree_monitor import ProcessTreeUsage
 from src.FactorioPreviewToolkit.controller.single_process_executor import (
     SubprocessStatus,
     SingleProcessExecutor,
 )
+from src.FactorioPreviewToolkit.controller.warm_process_pool import WarmProcessPool
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.metrics import (
+    FACTORIO_CPU_TIME,
+    FACTORIO_PEAK_RSS,
+    JOB_DURATION,
+    JOBS_FINISHED,
+    JOBS_STARTED,
+    STAGE_DURATION,
+)
+from src.FactorioPreviewToolkit.shared.rclone_daemon import RcloneDaemon
+from src.FactorioPreviewToolkit.shared.run_history import finish_job, get_job_env, start_job
 from src.FactorioPreviewToolkit.shared.sound import (
     play_failure_sound,
     play_success_sound,
     play_start_sound,
 )
-from src.FactorioPreviewToolkit.shared.structured_logger import log
+from src.FactorioPreviewToolkit.shared.pipeline_events import (
+    REPORT_STAGE_DURATIONS_ENV,
+    parse_planet_ready,
+    parse_stage_duration,
+)
+from src.FactorioPreviewToolkit.shared.structured_logger import log, trace_instant, trace_span
 from src.FactorioPreviewToolkit.shared.utils import get_script_base
 
 
+def _record_stage_duration(line: str) -> None:
+    """
+    Records a stage duration reported in a subprocess output line in the metrics.
+    """
+    stage_duration = parse_stage_duration(line)
+    if stage_duration is not None:
+        stage, duration_in_sec, planet = stage_duration
+        STAGE_DURATION.observe(duration_in_sec, stage=stage, planet=planet)
+
+
+def _record_factorio_usage(usage: ProcessTreeUsage) -> None:
+    """
+    Records the CPU time and peak memory of the Factorio instances of a job in the metrics.
+    """
+    FACTORIO_CPU_TIME.inc(usage.cpu_seconds)
+    if usage.peak_rss_in_bytes:
+        FACTORIO_PEAK_RSS.observe(usage.peak_rss_in_bytes)
+
+
 class MapProcessingPipeline:
     """
     Runs the map generation and upload subprocesses for a given map string.
 
+    Both subprocesses run at the same time: every planet the generator finishes is forwarded
+    to the uploader right away, so uploads overlap with rendering.
     Ensures only one job is active at a time. If a new job is triggered while another is running,
     the current one is canceled before starting the new one.
+    If enabled, jobs run in pre-warmed worker processes instead of freshly spawned ones,
+    and all uploads of the session go through one long-running rclone daemon.
+    If enabled, every job is traced across all processes and exported as a Chrome trace,
+    and recorded in the run history.
+    Every job is counted in the session metrics, together with the duration of its stages and the
+    CPU time and memory of the Factorio instances it ran.
     """
 
     def __init__(self) -> None:
@@ -29,60 +82,152 @@ class MapProcessingPipeline:
         self._lock = Lock()
         self._worker_thread: Thread | None = None
         self._worker_ID = 0
+        self._warm_process_pool: WarmProcessPool | None = None
+        self._trace_file: Path | None = None
+        self._run_history_job_id: str | None = None
+        if Config.get().use_warm_worker_processes:
+            self._warm_process_pool = WarmProcessPool(["generator", "uploader"])
+            self._warm_process_pool.start()
+        # Started with the first job that uploads, so sessions without uploads never start it
+        self._rclone_daemon: RcloneDaemon | None = None
+        if Config.get().upload_method == "rclone" and Config.get().rclone_use_daemon:
+            self._rclone_daemon = RcloneDaemon(Config.get().rclone_executable)
 
-    def run_async(self, factorio_path: Path, map_string: str) -> None:
+    def shutdown(self) -> None:
         """
-        Starts the pipeline in a background thread after stopping any existing job.
+        Stops the running job, the warm worker processes and the rclone daemon.
         """
         self._shutdown_existing_worker()
+        if self._warm_process_pool is not None:
+            self._warm_process_pool.stop()
+            self._warm_process_pool = None
+        if self._rclone_daemon is not None:
+            self._rclone_daemon.stop()
+            self._rclone_daemon = None
+
+    def run_async(
+        self, factorio_path: Path, map_string: str, detected_at: float | None = None
+    ) -> None:
+        """
+        Starts the pipeline in a background thread after stopping any existing job.
+        detected_at is the time.time() the map string was detected; the job trace starts there.
+        """
+        cancel_started_at = time.perf_counter()
+        cancelled = self._shutdown_existing_worker()
         with self._lock:
+            if Config.get().record_job_traces:
+                self._trace_file = start_job_trace()
+                trace_instant("📋 Map string detected", timestamp=detected_at)
+            if Config.get().record_run_history:
+                self._run_history_job_id = start_job(
+                    map_string,
+                    Config.get().map_preview_size,
+                    detected_at if detected_at is not None else time.time(),
+                )
             self._prepare_executors(factorio_path, map_string)
-            self._start_worker_thread()
+            JOBS_STARTED.inc()
+            self._start_worker_thread(
+                cancel_started_at if cancelled else None,
+                detected_at if detected_at is not None else time.time(),
+            )
 
-    def _shutdown_existing_worker(self) -> None:
+    def _shutdown_existing_worker(self) -> bool:
         """
         Stops any existing background job and ensures thread shutdown.
+        Returns True if a running job was cancelled.
         """
-        self._stop()
+        cancelled = self._stop()
         if self._worker_thread is not None:
             self._worker_thread.join(timeout=1)
             if self._worker_thread.is_alive():
                 log.error("❌ Worker thread did not terminate in time. Raising exception.")
                 raise TimeoutError("Worker thread did not terminate within the expected time.")
+        return cancelled
 
     def _prepare_executors(self, factorio_path: Path, map_string: str) -> None:
         """
         Sets up the generator and uploader subprocess executors.
+        The uploader runs in streaming mode and receives ready planets through its stdin.
         """
         script_base = get_script_base()
+        generator_env: dict[str, str] = {}
+        if self._trace_file is not None:
+            generator_env = get_trace_env(self._trace_file)
+        if Config.get().metrics_port:
+            generator_env[REPORT_STAGE_DURATIONS_ENV] = "1"
+        if self._run_history_job_id is not None:
+            generator_env.update(get_job_env(self._run_history_job_id))
+        uploader_env = dict(generator_env)
+        if self._rclone_daemon is not None:
+            self._rclone_daemon.ensure_running()
+            uploader_env.update(self._rclone_daemon.get_client_env())
 
         if getattr(sys, "frozen", False):
             # Frozen: use same EXE but route via flags
-            self.generator_executor = SingleProcessExecutor(
-                "Preview Generator",
-                [sys.executable, "--preview-generator-mode", str(factorio_path), map_string],
-            )
-            self.uploader_executor = SingleProcessExecutor(
-                "Uploader",
-                [sys.executable, "--uploader-mode", str(factorio_path)],
-            )
+            generator_args = [
+                sys.executable,
+                "--preview-generator-mode",
+                str(factorio_path),
+                map_string,
+            ]
+            uploader_args = [sys.executable, "--uploader-mode", str(factorio_path), "--streaming"]
         else:
             # Dev: use `-m` style to run modules
-            self.generator_executor = SingleProcessExecutor(
-                "Preview Generator",
-                [
-                    "-m",
-                    "src.FactorioPreviewToolkit.preview_generator",
-                    str(factorio_path),
-                    map_string,
-                ],
-            )
-            self.uploader_executor = SingleProcessExecutor(
-                "Uploader",
-                ["-m", "src.FactorioPreviewToolkit.uploader", str(factorio_path)],
-            )
+            generator_args = [
+                "-m",
+                "src.FactorioPreviewToolkit.preview_generator",
+                str(factorio_path),
+                map_string,
+            ]
+            uploader_args = [
+                "-m",
+                "src.FactorioPreviewToolkit.uploader",
+                str(factorio_path),
+                "--streaming",
+            ]
+
+        generator_launcher = None
+        uploader_launcher = None
+        warm_process_pool = self._warm_process_pool
+        if warm_process_pool is not None:
+            generator_job_args = [str(factorio_path), map_string]
+            uploader_job_args = [str(factorio_path), "--streaming"]
+
+            def generator_launcher() -> subprocess.Popen[str]:
+                return warm_process_pool.launch("generator", generator_job_args, env=generator_env)
+
+            def uploader_launcher() -> subprocess.Popen[str]:
+                return warm_process_pool.launch(
+                    "uploader", uploader_job_args, env=uploader_env, keep_input_open=True
+                )
+
+        uploader_executor = SingleProcessExecutor(
+            "Uploader",
+            uploader_args,
+            pipe_input=True,
+            on_output_line=_record_stage_duration,
+            launcher=uploader_launcher,
+            env=uploader_env,
+        )
+        self.uploader_executor = uploader_executor
+
+        def handle_generator_output(line: str) -> None:
+            planet = parse_planet_ready(line)
+            if planet is not None:
+                uploader_executor.write_input_line(planet)
+            else:
+                _record_stage_duration(line)
+
+        self.generator_executor = SingleProcessExecutor(
+            "Preview Generator",
+            generator_args,
+            on_output_line=handle_generator_output,
+            launcher=generator_launcher,
+            env=generator_env,
+            on_process_tree_usage=_record_factorio_usage if Config.get().metrics_port else None,
+        )
 
-    def _start_worker_thread(self) -> None:
+    def _start_worker_thread(self, cancel_started_at: float | None, job_started_at: float) -> None:
         """
         Starts the worker thread to execute the pipeline.
         """
@@ -90,46 +235,104 @@ class MapProcessingPipeline:
         self._worker_ID += 1
         self._worker_thread = Thread(
             target=self._execute_pipeline,
+            args=(cancel_started_at, job_started_at),
             name=thread_name,
             daemon=True,
         )
         self._worker_thread.start()
 
-    def _execute_pipeline(self) -> None:
+    def _execute_pipeline(self, cancel_started_at: float | None, job_started_at: float) -> None:
         """
-        Executes the preview generator and uploader sequentially.
+        Runs the job as one traced stage and exports the job trace afterwards, if enabled.
+        Records the outcome and duration of the job in the metrics.
+        """
+        outcome = "failed"
+        try:
+            with trace_span("Job", category="stage", started_at=job_started_at):
+                outcome = self._run_stages(cancel_started_at)
+        finally:
+            JOBS_FINISHED.inc(outcome=outcome)
+            JOB_DURATION.observe(time.time() - job_started_at, outcome=outcome)
+            if self._run_history_job_id is not None:
+                finish_job(self._run_history_job_id, outcome)
+                self._run_history_job_id = None
+            if self._trace_file is not None:
+                finish_job_trace(self._trace_file)
+                self._trace_file = None
+
+    def _run_stages(self, cancel_started_at: float | None) -> str:
+        """
+        Executes the preview generator and the streaming uploader side by side.
         Aborts on failure or if stopped mid-execution.
+        If the job replaces a cancelled one, logs how long the switch took.
+        Returns the outcome of the job: succeeded, failed or cancelled.
         """
         with self._lock:
+            if cancel_started_at is not None:
+                log.info(
+                    f"⏱️ Next job started {time.perf_counter() - cancel_started_at:.2f}s "
+                    f"after cancelling the previous one."
+                )
             play_start_sound()
 
             assert self.generator_executor is not None
-            generator_status = self.generator_executor.run_subprocess()
+            assert self.uploader_executor is not None
+            uploader_executor = self.uploader_executor
+            upload_statuses: list[SubprocessStatus] = []
+
+            def run_uploader() -> None:
+                with trace_span("Uploader", category="stage"):
+                    upload_statuses.append(uploader_executor.run_subprocess())
+
+            uploader_thread = Thread(
+                target=run_uploader,
+                name=f"{current_thread().name}-Uploader",
+                daemon=True,
+            )
+            uploader_thread.start()
+
+            with trace_span("Preview Generator", category="stage"):
+                generator_status = self.generator_executor.run_subprocess()
+            # A killed generator is replenished by _stop once its process tree is gone
+            warm_process_pool = self._warm_process_pool
+            if warm_process_pool is not None and generator_status != SubprocessStatus.KILLED:
+                warm_process_pool.replenish()
             if generator_status == SubprocessStatus.KILLED:
-                return
+                uploader_executor.stop()
+                uploader_thread.join()
+                return "cancelled"
             if generator_status != SubprocessStatus.SUCCESS:
+                uploader_executor.stop()
+                uploader_thread.join()
                 play_failure_sound()
-                return
+                return "failed"
 
-            assert self.uploader_executor is not None
-            upload_status = self.uploader_executor.run_subprocess()
+            uploader_executor.close_input()
+            uploader_thread.join()
+            upload_status = upload_statuses[0] if upload_statuses else SubprocessStatus.FAILED
             if upload_status == SubprocessStatus.KILLED:
-                return
+                return "cancelled"
             if upload_status != SubprocessStatus.SUCCESS:
                 play_failure_sound()
-                return
+                return "failed"
 
             play_success_sound()
+            return "succeeded"
 
-    def _stop(self) -> None:
+    def _stop(self) -> bool:
         """
-        Stops any currently running subprocesses and waits for the worker thread to finish.
+        Stops any currently running subprocesses together with the Factorio instances they started.
+        Removes the lock files the killed Factorio instances left behind and replaces the warm
+        workers the stopped job used.
+        Returns True if a running job was stopped.
         """
+        job_running = self._worker_thread is not None and self._worker_thread.is_alive()
+        generator_stopped = False
         if self.generator_executor and self.generator_executor.get_status() in [
             SubprocessStatus.RUNNING,
             SubprocessStatus.NOT_RUN,
         ]:
-            self.generator_executor.stop()
+            generator_stopped = self.generator_executor.stop()
 
         if self.uploader_executor and self.uploader_executor.get_status() in [
             SubprocessStatus.RUNNING,
@@ -137,5 +340,12 @@ class MapProcessingPipeline:
         ]:
             self.uploader_executor.stop()
 
-        if self._worker_thread and self._worker_thread.is_alive():
+        if generator_stopped:
+            remove_stale_factorio_lock_files()
+            # The killed processes have exited, so the next job can get warm workers again
+            if self._warm_process_pool is not None:
+                self._warm_process_pool.replenish()
+
+        if job_running:
             log.info("⚠️ Pipeline Aborted.")
+        return job_running
@@ -0,0 +1,144 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import psutil
+
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+
+def get_process_group_kwargs() -> dict[str, Any]:
+    """
+    Returns Popen keyword arguments that start the subprocess in its own process group,
+    so it can be torn down together with everything it started.
+    """
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def terminate_process_tree(pid: int, grace_period_in_sec: float = 3.0) -> None:
+    """
+    Terminates a process and all its descendants (e.g. Factorio started by the generator).
+    Sends SIGTERM first and SIGKILL to whatever is still alive after the grace period.
+    Returns once every process of the tree has exited.
+    """
+    try:
+        root = psutil.Process(pid)
+        processes = [root, *root.children(recursive=True)]
+    except psutil.NoSuchProcess:
+        return
+
+    _signal_process_tree(pid, processes, force=False)
+    alive = _wait_for_exit(processes, grace_period_in_sec)
+    if alive:
+        log.warning(f"⚠️ {len(alive)} process(es) did not exit after SIGTERM. Killing them.")
+        _signal_process_tree(pid, alive, force=True)
+        alive = _wait_for_exit(alive, grace_period_in_sec)
+    for process in alive:
+        log.error(f"❌ Process {process.pid} is still alive after being killed.")
+
+
+def _signal_process_tree(pid: int, processes: list[psutil.Process], force: bool) -> None:
+    """
+    Sends SIGTERM (or SIGKILL if forced) to the given processes. On POSIX the process group
+    is signalled as well, which also reaches descendants whose parent already exited.
+    """
+    if sys.platform != "win32":
+        try:
+            if os.getpgid(pid) == pid:
+                os.killpg(pid, signal.SIGKILL if force else signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    for process in processes:
+        try:
+            if force:
+                process.kill()
+            else:
+                process.terminate()
+        except psutil.NoSuchProcess:
+            pass
+
+
+def _wait_for_exit(processes: list[psutil.Process], timeout_in_sec: float) -> list[psutil.Process]:
+    """
+    Waits until the processes exited and returns the ones still alive after the timeout.
+    Zombies count as exited: they hold no files anymore, and orphaned ones are only
+    reaped by init whenever it gets to it.
+    """
+    deadline = time.monotonic() + timeout_in_sec
+    alive = processes
+    while True:
+        alive = [process for process in alive if _is_alive(process)]
+        if not alive or time.monotonic() >= deadline:
+            return alive
+        time.sleep(0.02)
+
+
+def _is_alive(process: psutil.Process) -> bool:
+    """
+    Returns True if the process is running and not a zombie.
+    """
+    try:
+        return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+def _is_lock_file_held(lock_file: Path) -> bool:
+    """
+    Returns True if a process still holds an flock on the lock file (POSIX only).
+    On Windows an open lock file cannot be deleted, which is detected when deleting it instead.
+    """
+    if sys.platform == "win32":
+        return False
+    import fcntl
+
+    try:
+        with lock_file.open("rb") as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+def remove_stale_factorio_lock_files(timeout_in_sec: float = 5.0) -> bool:
+    """
+    Deletes the .lock files left behind in the toolkit's own Factorio write-data folders.
+    Factorio can take a moment to release its lock after being terminated, so each file is retried
+    until it is free and deleted, or until the timeout. A lock file that is still held is logged
+    and left alone, in which case the next Factorio launch may fail.
+    Returns True if all lock files were removed.
+    Must only be called once no toolkit Factorio instance should be running anymore.
+    """
+    pending = [
+        constants.FACTORIO_LOCK_FILEPATH,
+        *constants.FACTORIO_SANDBOXES_DIR.glob("*/data/.lock"),
+    ]
+    deadline = time.monotonic() + timeout_in_sec
+    while True:
+        still_held: list[Path] = []
+        for lock_file in pending:
+            try:
+                if _is_lock_file_held(lock_file):
+                    still_held.append(lock_file)
+                else:
+                    lock_file.unlink(missing_ok=True)
+            except OSError:
+                still_held.append(lock_file)
+        if not still_held:
+            return True
+        if time.monotonic() >= deadline:
+            for lock_file in still_held:
+                log.warning(f"⚠️ Factorio did not release the lock file {lock_file}.")
+            return False
+        pending = still_held
+        time.sleep(0.1)
@@ -0,0 +1,75 @@
+import threading
+
+import psutil
+
+
+class ProcessTreeUsage:
+    """
+    CPU time and memory of the processes a subprocess started.
+    """
+
+    def __init__(self, cpu_seconds: float, peak_rss_in_bytes: int):
+        self.cpu_seconds = cpu_seconds
+        self.peak_rss_in_bytes = peak_rss_in_bytes
+
+
+class ProcessTreeMonitor:
+    """
+    Samples the CPU time and memory of all descendants of a process (e.g. the Factorio instances
+    of the preview generator) in a background thread, until stopped.
+
+    Every descendant counts with the CPU time of its last sample, so the last moments of a process
+    and processes shorter than the sampling interval can be missed.
+    """
+
+    def __init__(self, pid: int, interval_in_sec: float = 0.25):
+        self._pid = pid
+        self._interval_in_sec = interval_in_sec
+        # Last sampled CPU time per process, keyed by (pid, creation time) to survive pid reuse
+        self._cpu_seconds: dict[tuple[int, float], float] = {}
+        self._peak_rss_in_bytes = 0
+        self._stop_flag = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ProcessTreeMonitor", daemon=True)
+
+    def start(self) -> None:
+        """
+        Starts sampling.
+        """
+        self._thread.start()
+
+    def stop(self) -> ProcessTreeUsage:
+        """
+        Takes a last sample, stops sampling and returns the usage of all sampled descendants.
+        """
+        self._stop_flag.set()
+        self._thread.join()
+        return ProcessTreeUsage(sum(self._cpu_seconds.values()), self._peak_rss_in_bytes)
+
+    def _run(self) -> None:
+        """
+        Samples until stopped, and once more when stopped.
+        """
+        while True:
+            stopping = self._stop_flag.wait(self._interval_in_sec)
+            self._sample()
+            if stopping:
+                return
+
+    def _sample(self) -> None:
+        """
+        Records the CPU time and memory of every descendant that is currently alive.
+        """
+        try:
+            descendants = psutil.Process(self._pid).children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+        for process in descendants:
+            try:
+                with process.oneshot():
+                    cpu_times = process.cpu_times()
+                    rss_in_bytes = process.memory_info().rss
+                    key = (process.pid, process.create_time())
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            self._cpu_seconds[key] = cpu_times.user + cpu_times.system
+            self._peak_rss_in_bytes = max(self._peak_rss_in_bytes, rss_in_bytes)
@@ -1,9 +1,18 @@
 import os
 import subprocess
 import sys
+from collections.abc import Callable
 from enum import Enum, auto
 from threading import Lock
 
+from src.FactorioPreviewToolkit.controller.process_cleanup import (
+    get_process_group_kwargs,
+    terminate_process_tree,
+)
+from src.FactorioPreviewToolkit.controller.process_tree_monitor import (
+    ProcessTreeMonitor,
+    ProcessTreeUsage,
+)
 from src.FactorioPreviewToolkit.shared.structured_logger import log
 
 
@@ -27,12 +36,34 @@ class SingleProcessExecutor:
     status reporting, and synchronized execution.
     """
 
-    def __init__(self, process_name: str, args: list[str]):
+    def __init__(
+        self,
+        process_name: str,
+        args: list[str],
+        on_output_line: Callable[[str], None] | None = None,
+        pipe_input: bool = False,
+        launcher: Callable[[], subprocess.Popen[str]] | None = None,
+        env: dict[str, str] | None = None,
+        on_process_tree_usage: Callable[[ProcessTreeUsage], None] | None = None,
+    ):
         """
         Initializes the executor with a name and subprocess arguments.
+        Optionally calls a callback for every output line and opens a pipe to the subprocess stdin.
+        A launcher, if given, provides the process instead of spawning one from the arguments
+        (e.g. a pre-warmed worker); it must pipe stdout, and stdin too if pipe_input is set.
+        Extra environment variables in env are passed to a spawned subprocess.
+        If on_process_tree_usage is given, the processes the subprocess starts are sampled while
+        it runs, and their CPU time and peak memory are passed to it once the subprocess ended.
         """
         self._process_name = process_name
         self._args = args
+        self._on_output_line = on_output_line
+        self._pipe_input = pipe_input
+        self._launcher = launcher
+        self._env = env or {}
+        self._on_process_tree_usage = on_process_tree_usage
+        self._pending_input_lines: list[str] = []
+        self._input_close_requested = False
         self._active_process: subprocess.Popen[str] | None = None
         self._status = SubprocessStatus.NOT_RUN
         self._lock = Lock()
@@ -44,8 +75,17 @@ class SingleProcessExecutor:
         """
         if not self._prepare_subprocess():
             return self._status
-        self._stream_output()
-        return self._finalize_status()
+        assert self._active_process is not None
+        monitor: ProcessTreeMonitor | None = None
+        if self._on_process_tree_usage is not None:
+            monitor = ProcessTreeMonitor(self._active_process.pid)
+            monitor.start()
+        try:
+            self._stream_output()
+            return self._finalize_status()
+        finally:
+            if monitor is not None and self._on_process_tree_usage is not None:
+                self._on_process_tree_usage(monitor.stop())
 
     def _prepare_subprocess(self) -> bool:
         """
@@ -56,16 +96,26 @@ class SingleProcessExecutor:
                 return False
 
             log.info(f"🟢 Launching {self._process_name} subprocess with args: {self._args}...")
-            self._active_process = subprocess.Popen(
-                [sys.executable, "-u"] + self._args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                env={**os.environ, "PYTHONIOENCODING": "utf-8"},
-            )
+            if self._launcher is not None:
+                self._active_process = self._launcher()
+            else:
+                self._active_process = subprocess.Popen(
+                    [sys.executable, "-u"] + self._args,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    env={**os.environ, **self._env, "PYTHONIOENCODING": "utf-8"},
+                    stdin=subprocess.PIPE if self._pipe_input else None,
+                    **get_process_group_kwargs(),
+                )
             self._status = SubprocessStatus.RUNNING
+            for line in self._pending_input_lines:
+                self._write_input_line_locked(line)
+            self._pending_input_lines.clear()
+            if self._input_close_requested:
+                self._close_input_locked()
             return True
 
     def _stream_output(self) -> None:
@@ -77,6 +127,8 @@ class SingleProcessExecutor:
             if self._active_process.stdout:
                 for line in self._active_process.stdout:
                     print(line, end="")
+                    if self._on_output_line is not None:
+                        self._on_output_line(line)
         except Exception:
             self._status = SubprocessStatus.FAILED
             log.error(f"❌ Failed to read {self._process_name} output.")
@@ -99,11 +151,63 @@ class SingleProcessExecutor:
 
             return self._status
 
+    def write_input_line(self, line: str) -> None:
+        """
+        Sends a line to the subprocess stdin. Lines sent before launch are buffered.
+        """
+        with self._lock:
+            if self._status == SubprocessStatus.NOT_RUN:
+                self._pending_input_lines.append(line)
+            elif self._status == SubprocessStatus.RUNNING:
+                self._write_input_line_locked(line)
+
+    def close_input(self) -> None:
+        """
+        Closes the subprocess stdin, signalling that no more input will follow.
+        """
+        with self._lock:
+            if self._status == SubprocessStatus.NOT_RUN:
+                self._input_close_requested = True
+            elif self._status == SubprocessStatus.RUNNING:
+                self._close_input_locked()
+
+    def _write_input_line_locked(self, line: str) -> None:
+        """
+        Writes a line to the stdin pipe. Must be called with the lock held.
+        """
+        assert self._active_process is not None
+        if self._active_process.stdin is None or self._active_process.stdin.closed:
+            return
+        try:
+            self._active_process.stdin.write(line + "\n")
+            self._active_process.stdin.flush()
+        except OSError as e:
+            log.warning(f"⚠️ Could not send input to {self._process_name}: {e}")
+
+    def _close_input_locked(self) -> None:
+        """
+        Closes the stdin pipe. Must be called with the lock held.
+        """
+        assert self._active_process is not None
+        if self._active_process.stdin is None or self._active_process.stdin.closed:
+            return
+        try:
+            self._active_process.stdin.close()
+        except OSError as e:
+            log.warning(f"⚠️ Could not close input of {self._process_name}: {e}")
+
     def stop(self) -> bool:
         """
-        Terminates the subprocess if running. Returns True if a process was stopped.
+        Terminates the subprocess and every process it started (e.g. Factorio) if running.
+        Returns True if a process was stopped, once the whole process tree has exited.
         """
         with self._lock:
+            if self._status == SubprocessStatus.NOT_RUN:
+                # Not launched yet: make sure it never starts
+                self._status = SubprocessStatus.KILLED
+                log.info(f"🛑 {self._process_name} subprocess cancelled before launch.")
+                return True
+
             if self._active_process is None or self._status not in [
                 SubprocessStatus.RUNNING,
                 SubprocessStatus.NOT_RUN,
@@ -112,10 +216,12 @@ class SingleProcessExecutor:
                 return False
 
             log.info(f"🛑 Stopping {self._process_name} subprocess...")
-            self._active_process.kill()
             self._status = SubprocessStatus.KILLED
-            log.info(f"✅ {self._process_name} subprocess killed.")
-            return True
+            process = self._active_process
+
+        terminate_process_tree(process.pid)
+        log.info(f"✅ {self._process_name} subprocess tree killed.")
+        return True
 
     def get_status(self) -> SubprocessStatus:
         """
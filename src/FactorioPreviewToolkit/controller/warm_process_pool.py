@@ -0,0 +1,140 @@
+import json
+import os
+import subprocess
+import sys
+from threading import Lock, Thread
+
+from src.FactorioPreviewToolkit.controller.process_cleanup import get_process_group_kwargs
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+
+class WarmProcessPool:
+    """
+    Keeps one pre-started standby process per role (generator, uploader).
+
+    A standby process has already imported all modules and validated the config, and reloads the
+    config when it gets a job if the file changed in the meantime. Launching a job hands it to the
+    standby over its stdin, so job start latency is close to zero. Replacements are started by
+    replenish() once the job no longer needs the CPU, or once a cancelled job's processes are gone.
+    A job launched while the replacement of its role is still starting waits for it. Without a
+    standby (e.g. a standby that died), the job gets a freshly spawned process.
+    """
+
+    def __init__(self, roles: list[str]):
+        """
+        Initializes the pool for the given roles. No processes are started yet.
+        """
+        self._roles = roles
+        self._standby: dict[str, subprocess.Popen[str]] = {}
+        self._replacements: dict[str, Thread] = {}
+        self._lock = Lock()
+        self._running = False
+
+    def start(self) -> None:
+        """
+        Starts a standby process for every role.
+        """
+        with self._lock:
+            self._running = True
+            for role in self._roles:
+                self._standby[role] = self._spawn(role)
+        log.info(f"🔥 Warm worker processes started for: {', '.join(self._roles)}")
+
+    def stop(self) -> None:
+        """
+        Terminates all standby processes, after waiting for replacements that are still starting.
+        """
+        with self._lock:
+            self._running = False
+            replacements = list(self._replacements.values())
+        for replacement in replacements:
+            replacement.join()
+        with self._lock:
+            standby_processes = list(self._standby.values())
+            self._standby.clear()
+        for process in standby_processes:
+            process.kill()
+            process.wait()
+        log.info("✅ Warm worker processes stopped.")
+
+    def launch(
+        self,
+        role: str,
+        argv: list[str],
+        env: dict[str, str] | None = None,
+        keep_input_open: bool = False,
+    ) -> subprocess.Popen[str]:
+        """
+        Hands a job to the standby process of the role and returns that process.
+        Keeps stdin open if the job reads further input, otherwise closes it.
+        """
+        with self._lock:
+            replacement = self._replacements.get(role)
+        if replacement is not None:
+            replacement.join()
+        with self._lock:
+            process = self._standby.pop(role, None)
+        if process is None or process.poll() is not None:
+            if process is not None:
+                log.warning(f"⚠️ Warm {role} worker died (exit code {process.returncode}).")
+            process = self._spawn(role)
+
+        assert process.stdin is not None
+        process.stdin.write(json.dumps({"argv": argv, "env": env or {}}) + "\n")
+        process.stdin.flush()
+        if not keep_input_open:
+            process.stdin.close()
+        return process
+
+    def replenish(self) -> None:
+        """
+        Starts a replacement standby process in the background for every role that has none.
+        Meant to be called once the job's generator has finished or was killed, so the
+        replacements do not compete with Factorio for the CPU.
+        """
+        with self._lock:
+            if not self._running:
+                return
+            for role in self._roles:
+                if role in self._standby or role in self._replacements:
+                    continue
+                replacement = Thread(target=self._replace_standby, args=(role,), daemon=True)
+                self._replacements[role] = replacement
+                replacement.start()
+
+    def _replace_standby(self, role: str) -> None:
+        """
+        Starts a new standby process for the role, unless the pool was stopped.
+        """
+        process = self._spawn(role)
+        with self._lock:
+            del self._replacements[role]
+            if self._running and role not in self._standby:
+                self._standby[role] = process
+                return
+        process.kill()
+        process.wait()
+
+    @staticmethod
+    def _spawn(role: str) -> subprocess.Popen[str]:
+        """
+        Starts a new warm worker process for the role.
+        """
+        if getattr(sys, "frozen", False):
+            # Frozen: use same EXE but route via flags
+            args = [sys.executable, "--warm-worker-mode", role]
+        else:
+            # Dev: use `-m` style to run modules
+            args = [sys.executable, "-u", "-m", "src.FactorioPreviewToolkit.warm_worker", role]
+
+        return subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+            **get_process_group_kwargs(),
+        )
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from src.FactorioPreviewToolkit.factorio_path_provider.base import FactorioPathProvider
 from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.metrics import PROVIDER_POLLS
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
 
 
@@ -42,6 +43,7 @@ class BaseActiveWindowProvider(FactorioPathProvider):
         """Periodically checks for a new active Factorio window and emits updates."""
         with log_section("🪟 Monitoring active windows for Factorio instances..."):
             while not self._stop_flag.is_set():
+                PROVIDER_POLLS.inc(provider="active_window")
                 factorio_path = self.get_factorio_executable_path()
                 if factorio_path and self._current_path != factorio_path:
                     log.info(f"🎯 Detected new Factorio window.")
@@ -6,6 +6,7 @@ import pyperclip
 
 from src.FactorioPreviewToolkit.map_string_provider.base import MapStringProvider
 from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.metrics import PROVIDER_POLLS
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
 from src.FactorioPreviewToolkit.shared.utils import is_valid_map_string
 
@@ -56,6 +57,7 @@ class ClipboardMapStringProvider(MapStringProvider):
         """
         with log_section("📋 Monitoring clipboard for new map exchange strings..."):
             while not self._stop_flag.is_set():
+                PROVIDER_POLLS.inc(provider="clipboard")
                 try:
                     clipboard_text = pyperclip.paste().strip()
                     if clipboard_text != self._last_map_string and is_valid_map_string(
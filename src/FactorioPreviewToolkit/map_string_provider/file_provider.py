@@ -5,6 +5,7 @@ import threading
 
 from src.FactorioPreviewToolkit.map_string_provider.base import MapStringProvider
 from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.metrics import PROVIDER_POLLS
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
 from src.FactorioPreviewToolkit.shared.utils import is_valid_map_string
 
@@ -53,6 +54,7 @@ class FileMapStringProvider(MapStringProvider):
         """
         with log_section(f"📋 Watching file for map exchange strings: {self._filepath}"):
             while not self._stop_flag.is_set():
+                PROVIDER_POLLS.inc(provider="file")
                 try:
                     if self._filepath.exists():
                         text = self._filepath.read_text(encoding="utf-8").strip()
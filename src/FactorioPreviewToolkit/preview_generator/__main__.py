@@ -19,7 +19,11 @@ from src.FactorioPreviewToolkit.preview_generator.preview_generation_setup impor
     run_preview_setup_pipeline,
 )
 from src.FactorioPreviewToolkit.shared.error_popup import show_error_popup
-from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.shared.structured_logger import (
+    log,
+    log_section,
+    set_trace_process_name,
+)
 from src.FactorioPreviewToolkit.shared.utils import is_valid_map_string
 
 
@@ -73,8 +77,9 @@ def main(argv: Sequence[str] | None = None) -> None:
     """
     Runs the full preview generation pipeline from CLI arguments.
     """
+    set_trace_process_name("Preview Generator")
     try:
-        with log_section("🚀 Preview Generator started. Processing map string..."):
+        with log_section("🚀 Preview Generator started. Processing map string...", "stage"):
             arguments = parse_arguments(argv)
             run_preview_setup_pipeline(arguments.factorio_path, arguments.map_string)
             run_full_preview_generation(arguments.factorio_path)
@@ -0,0 +1,134 @@
+"""
+Persistent cache of facts about a Factorio installation.
+
+Starting Factorio only to ask for its version takes seconds, so facts like the version and
+the list of supported planets are stored on disk. Entries are keyed by a fingerprint of the
+executable (path, size, modification time) and of the installed mods, so they are invalidated
+automatically as soon as the binary or the mod set changes.
+"""
+
+import hashlib
+from pathlib import Path
+from threading import Lock
+
+from pydantic import BaseModel
+
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+from src.FactorioPreviewToolkit.shared.utils import (
+    detect_os,
+    read_json_file,
+    write_json_file_atomically,
+)
+
+_MAX_CACHED_INSTALLS = 10
+_cache_lock = Lock()
+
+
+class FactorioInstallInfo(BaseModel):
+    """
+    Cached facts about a single Factorio installation.
+    Fields stay None until they have been detected once.
+    """
+
+    version: tuple[int, int] | None = None
+    planets: list[str] | None = None
+
+
+def get_factorio_read_data_dir(factorio_path: Path) -> Path:
+    """
+    Returns the read-data directory (base game and DLC content) of the given executable.
+    """
+    if detect_os() == "macOS":
+        return factorio_path.parent.parent / "data"
+    return factorio_path.parent.parent.parent / "data"
+
+
+def _describe_directory_listing(directory: Path) -> str:
+    """
+    Lists the names, sizes and modification times of a directory's entries.
+    """
+    if not directory.is_dir():
+        return ""
+    lines = []
+    for entry in sorted(directory.iterdir()):
+        stat = entry.stat()
+        lines.append(f"{entry.name}|{stat.st_size}|{stat.st_mtime_ns}")
+    return "\n".join(lines)
+
+
+def get_mod_set_hash(factorio_path: Path) -> str:
+    """
+    Hashes the installed game content and mods: the read-data folders (base, DLCs)
+    and the mods folder used by the toolkit's Factorio runs, including mod-list.json.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(_describe_directory_listing(get_factorio_read_data_dir(factorio_path)).encode())
+
+    mods_dir = constants.FACTORIO_MODS_DIR
+    hasher.update(_describe_directory_listing(mods_dir).encode())
+    mod_list = mods_dir / "mod-list.json"
+    if mod_list.is_file():
+        hasher.update(mod_list.read_bytes())
+    return hasher.hexdigest()
+
+
+def get_install_fingerprint(factorio_path: Path) -> str:
+    """
+    Returns a fingerprint that changes whenever the executable or the installed mods change.
+    """
+    resolved_path = factorio_path.resolve()
+    stat = resolved_path.stat()
+    key = "|".join(
+        [
+            str(resolved_path),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            get_mod_set_hash(resolved_path),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _read_cache_file() -> dict[str, dict[str, object]]:
+    """
+    Reads all cached installs from disk.
+    """
+    return read_json_file(constants.FACTORIO_INSTALL_CACHE_FILEPATH, "Factorio install cache")
+
+
+def _write_cache_file(data: dict[str, dict[str, object]]) -> None:
+    """
+    Replaces the cached installs on disk.
+    """
+    write_json_file_atomically(constants.FACTORIO_INSTALL_CACHE_FILEPATH, data)
+
+
+def load_install_info(factorio_path: Path) -> FactorioInstallInfo:
+    """
+    Returns the cached facts for the given executable, or an empty entry if none are cached.
+    """
+    fingerprint = get_install_fingerprint(factorio_path)
+    with _cache_lock:
+        entry = _read_cache_file().get(fingerprint)
+    if entry is None:
+        return FactorioInstallInfo()
+    try:
+        return FactorioInstallInfo.model_validate(entry)
+    except Exception as e:
+        log.warning(f"⚠️ Ignoring invalid Factorio install cache entry: {e}")
+        return FactorioInstallInfo()
+
+
+def save_install_info(factorio_path: Path, info: FactorioInstallInfo) -> None:
+    """
+    Stores the facts for the given executable, keeping only the most recently used installs.
+    """
+    fingerprint = get_install_fingerprint(factorio_path)
+    with _cache_lock:
+        data = _read_cache_file()
+        data.pop(fingerprint, None)
+        data[fingerprint] = info.model_dump(mode="json")
+        for stale_fingerprint in list(data)[:-_MAX_CACHED_INSTALLS]:
+            del data[stale_fingerprint]
+        _write_cache_file(data)
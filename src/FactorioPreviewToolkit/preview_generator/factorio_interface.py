@@ -7,16 +7,38 @@ import time
 from pathlib import Path
 from typing import Any
 
+from src.FactorioPreviewToolkit.preview_generator.factorio_install_cache import (
+    load_install_info,
+    save_install_info,
+)
 from src.FactorioPreviewToolkit.shared.shared_constants import constants
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
 from src.FactorioPreviewToolkit.shared.utils import detect_os
 
 
 def get_factorio_version(factorio_path: Path) -> tuple[int, int]:
+    """
+    Returns the (major, minor) Factorio version, using the install cache when possible.
+    Only launches Factorio if the executable or its mods changed since the last detection.
+    """
+    info = load_install_info(factorio_path)
+    if info.version is not None:
+        return info.version
+
+    version = _detect_factorio_version(factorio_path)
+    if version != (0, 0):
+        info = load_install_info(factorio_path)
+        info.version = version
+        save_install_info(factorio_path, info)
+    return version
+
+
+def _detect_factorio_version(factorio_path: Path) -> tuple[int, int]:
     """
     Detects the major and minor Factorio version from CLI output.
     Returns (major, minor) as integers.
     """
+    log.info("🔎 Detecting Factorio version...")
     try:
         result = subprocess.run(
             [str(factorio_path), "--version"], capture_output=True, text=True, check=True
@@ -29,12 +51,46 @@ def get_factorio_version(factorio_path: Path) -> tuple[int, int]:
     return (0, 0)  # Default fallback
 
 
-def wait_for_factorio_lock_to_release(timeout_in_sec: int = 30) -> bool:
+class FactorioSandbox:
+    """
+    A Factorio write-data directory together with the config file that points Factorio to it.
+
+    Every sandbox has its own .lock file, so Factorio instances running in different
+    sandboxes never block each other.
+    """
+
+    def __init__(self, write_data_dir: Path, config_path: Path):
+        self.write_data_dir = write_data_dir
+        self.config_path = config_path
+
+    @property
+    def lock_filepath(self) -> Path:
+        """
+        Returns the path of the lock file Factorio creates inside the write-data directory.
+        """
+        return self.write_data_dir / ".lock"
+
+
+def get_default_sandbox() -> FactorioSandbox:
+    """
+    Returns the shared sandbox used for setup runs and sequential rendering.
+    """
+    return FactorioSandbox(constants.FACTORIO_WRITE_DATA_DIR, constants.FACTORIO_CONFIG_FILEPATH)
+
+
+def get_render_sandbox(index: int) -> FactorioSandbox:
+    """
+    Returns the private sandbox of the parallel render worker with the given index.
+    """
+    sandbox_dir = constants.FACTORIO_SANDBOXES_DIR / f"worker-{index}"
+    return FactorioSandbox(sandbox_dir / "data", sandbox_dir / "factorio_config.ini")
+
+
+def wait_for_factorio_lock_to_release(lock_file: Path, timeout_in_sec: int = 30) -> bool:
     """
     Waits for the Factorio lock file to be released, up to a timeout.
     """
     start_time = time.time()
-    lock_file = constants.FACTORIO_LOCK_FILEPATH
 
     while lock_file.exists():
         log.info(f"📋 Waiting for '{lock_file}' release.")
@@ -59,13 +115,21 @@ def remove_map_preview_planet_arg(args: list[str]) -> None:
 def _build_factorio_command(executable_path: Path, args: list[str], config_path: Path) -> list[str]:
     """
     Builds the full Factorio CLI command with resolved paths and config file.
+    Every run uses the shared mods folder, whichever sandbox holds its write-data.
     """
     # Remove unsupported CLI args if needed
     if get_factorio_version(executable_path)[0] <= 1:
         remove_map_preview_planet_arg(args)
 
     resolved_args = [str(Path(arg).resolve()) if not arg.startswith("--") else arg for arg in args]
-    return [str(executable_path), "--config", str(config_path)] + resolved_args
+    mods_dir = constants.FACTORIO_MODS_DIR.resolve()
+    return [
+        str(executable_path),
+        "--config",
+        str(config_path),
+        "--mod-directory",
+        str(mods_dir),
+    ] + resolved_args
 
 
 def _build_subprocess_kwargs() -> dict[str, Any]:
@@ -91,24 +155,25 @@ def _get_priority_settings() -> dict[str, Any]:
     return {}
 
 
-def update_config_file(config_path: Path) -> None:
+def update_config_file(config_path: Path, write_data_dir: Path) -> None:
     """
     Updates the Factorio config file if the content has to change.
     If the file doesn't exist, it will be created with the default content.
     """
     existing_content = ""
-    default_content = _generate_default_config_content()
+    default_content = _generate_default_config_content(write_data_dir)
     if config_path.exists():
         with open(config_path, "r") as config_file:
             existing_content = config_file.read()
     if existing_content != default_content:
         with log_section(f"📄 Creating/Updating Factorio config at {config_path}..."):
+            config_path.parent.mkdir(parents=True, exist_ok=True)
             with open(config_path, "w") as config_file:
                 config_file.write(default_content)
             log.info("✅ Factorio config created/updated.")
 
 
-def _generate_default_config_content() -> str:
+def _generate_default_config_content(write_data_dir: Path) -> str:
     """
     Generates the default content for the config file.
     """
@@ -121,21 +186,26 @@ def _generate_default_config_content() -> str:
         ; version=12
         [path]
         read-data={read_data}
-        write-data={constants.FACTORIO_WRITE_DATA_DIR}
+        write-data={write_data_dir}
         """
     )
 
 
-def run_factorio_command(factorio_executable_path: Path, args: list[str]) -> None:
+def run_factorio_command(
+    factorio_executable_path: Path, args: list[str], sandbox: FactorioSandbox | None = None
+) -> None:
     """
     Runs Factorio with the given args and config, with low-priority CPU settings.
+    Uses the shared default sandbox unless a private one is given.
     """
-    config_path = constants.FACTORIO_CONFIG_FILEPATH
-    update_config_file(config_path)
+    if sandbox is None:
+        sandbox = get_default_sandbox()
+    config_path = sandbox.config_path
+    update_config_file(config_path, sandbox.write_data_dir)
     log.info(f"⚙️ Using config file: {config_path}")
 
     try:
-        wait_for_factorio_lock_to_release()
+        wait_for_factorio_lock_to_release(sandbox.lock_filepath)
         cmd = _build_factorio_command(factorio_executable_path, args, config_path)
         kwargs = _build_subprocess_kwargs()
         subprocess.run(cmd, **kwargs)
@@ -0,0 +1,190 @@
+"""
+Content-addressed cache for rendered previews and preview setup results.
+
+Preview images are keyed by a hash of the map-gen-settings, the planet, the preview size
+and the Factorio install (executable and installed mod set), so a game update, even a patch
+release, renders the previews again. Any exchange string that results in the same
+map-gen-settings therefore reuses the same images. Every planet is stored as soon as it is
+rendered, so planets finished before a job was cancelled are kept as well.
+
+The setup results (map-gen-settings and planet list) are cached per exchange string and
+Factorio install, so copying the same string again skips the setup run completely.
+
+The total size of cached images is limited by 'preview_cache_size_limit_in_mb'.
+The least recently used images are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from threading import Lock
+
+from src.FactorioPreviewToolkit.preview_generator.factorio_install_cache import (
+    get_install_fingerprint,
+)
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+from src.FactorioPreviewToolkit.shared.utils import clone_file
+
+_MAX_CACHED_SETUPS = 500
+_STALE_TEMP_FILE_AGE_IN_SECONDS = 3600
+_eviction_lock = Lock()
+
+
+def is_preview_cache_enabled() -> bool:
+    """
+    Returns True if a disk budget for the preview cache is configured.
+    """
+    return Config.get().preview_cache_size_limit_in_mb > 0
+
+
+def _store_file_atomically(source: Path, target: Path) -> None:
+    """
+    Copies the source next to the target and renames it into place,
+    so other processes never see a partially written cache entry.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    clone_file(source, temp_path, allow_hardlink=False)
+    os.replace(temp_path, target)
+
+
+class PreviewCache:
+    """
+    Cache of rendered preview images for one map-gen-settings file and preview size.
+    """
+
+    def __init__(self, factorio_path: Path, settings_path: Path, preview_size: int):
+        """
+        Computes the part of the cache key that is shared by all planets of the job.
+        """
+        with settings_path.open("r", encoding="utf-8") as f:
+            canonical_settings = json.dumps(json.load(f), sort_keys=True, separators=(",", ":"))
+        key_material = "|".join(
+            [canonical_settings, str(preview_size), get_install_fingerprint(factorio_path)]
+        )
+        self._base_key = hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+        self._cache_dir = constants.PREVIEW_CACHE_DIR
+
+    def _get_entry_path(self, planet: str) -> Path:
+        """
+        Returns the path of the cached image for the given planet.
+        """
+        key = hashlib.sha256(f"{self._base_key}|{planet}".encode("utf-8")).hexdigest()
+        return self._cache_dir / f"{key}.png"
+
+    def restore(self, planet: str, output: Path) -> bool:
+        """
+        Copies the cached image of the planet to the output path.
+        Returns False on a cache miss.
+        """
+        entry = self._get_entry_path(planet)
+        if not entry.is_file():
+            return False
+        try:
+            _store_file_atomically(entry, output)
+            os.utime(entry)
+        except OSError as e:
+            log.warning(f"⚠️ Failed to restore cached preview for {planet}: {e}")
+            return False
+        log.info(f"⚡ Restored {planet} preview from cache.")
+        return True
+
+    def store(self, planet: str, image_path: Path) -> None:
+        """
+        Adds a freshly rendered image to the cache and evicts old entries if over budget.
+        """
+        try:
+            _store_file_atomically(image_path, self._get_entry_path(planet))
+        except OSError as e:
+            log.warning(f"⚠️ Failed to cache preview for {planet}: {e}")
+            return
+        _evict_least_recently_used_previews()
+
+
+def _evict_least_recently_used_previews() -> None:
+    """
+    Deletes the least recently used images until the cache fits into its disk budget.
+    Leftover temporary files from interrupted writes are removed as well.
+    """
+    budget_in_bytes = Config.get().preview_cache_size_limit_in_mb * 1024 * 1024
+    with _eviction_lock:
+        entries = []
+        for path in constants.PREVIEW_CACHE_DIR.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".tmp":
+                if time.time() - stat.st_mtime > _STALE_TEMP_FILE_AGE_IN_SECONDS:
+                    path.unlink(missing_ok=True)
+            elif path.suffix == ".png":
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= budget_in_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            log.info(f"🗑️ Evicted cached preview: {path.name}")
+
+
+def _get_setup_entry_path(factorio_path: Path, map_string: str) -> Path:
+    """
+    Returns the cache path of the setup results for the exchange string and Factorio install.
+    """
+    key_material = f"{get_install_fingerprint(factorio_path)}|{map_string}"
+    key = hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+    return constants.SETUP_CACHE_DIR / f"{key}.json"
+
+
+def restore_cached_setup(factorio_path: Path, map_string: str) -> bool:
+    """
+    Writes the cached map-gen-settings and planet list to the locations the setup run
+    would produce. Returns False on a cache miss.
+    """
+    entry = _get_setup_entry_path(factorio_path, map_string)
+    try:
+        with entry.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        map_gen_settings = data["map_gen_settings"]
+        planets = data["planets"]
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        log.warning(f"⚠️ Ignoring invalid setup cache entry {entry.name}: {e}")
+        return False
+
+    with constants.MAP_GEN_SETTINGS_FILEPATH.open("w", encoding="utf-8") as f:
+        json.dump(map_gen_settings, f, indent=2)
+    planets_path = constants.PLANET_NAMES_GENERATION_FILEPATH
+    planets_path.parent.mkdir(parents=True, exist_ok=True)
+    with planets_path.open("w", encoding="utf-8") as f:
+        json.dump(planets, f)
+    os.utime(entry)
+    return True
+
+
+def store_setup(factorio_path: Path, map_string: str) -> None:
+    """
+    Stores the results of a completed setup run for the exchange string.
+    """
+    with constants.MAP_GEN_SETTINGS_FILEPATH.open("r", encoding="utf-8") as f:
+        map_gen_settings = json.load(f)
+    with constants.PLANET_NAMES_GENERATION_FILEPATH.open("r", encoding="utf-8") as f:
+        planets = json.load(f)
+
+    entry = _get_setup_entry_path(factorio_path, map_string)
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+    with temp_path.open("w", encoding="utf-8") as f:
+        json.dump({"map_gen_settings": map_gen_settings, "planets": planets}, f)
+    os.replace(temp_path, entry)
+
+    setups = sorted(constants.SETUP_CACHE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old_setup in setups[:-_MAX_CACHED_SETUPS]:
+        old_setup.unlink(missing_ok=True)
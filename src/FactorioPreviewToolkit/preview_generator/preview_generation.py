@@ -1,11 +1,38 @@
 import json
+import os
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from pathlib import Path
+from queue import Queue
 
-from src.FactorioPreviewToolkit.preview_generator.factorio_interface import run_factorio_command
+from src.FactorioPreviewToolkit.preview_generator.factorio_install_cache import (
+    load_install_info,
+    save_install_info,
+)
+from src.FactorioPreviewToolkit.preview_generator.factorio_interface import (
+    FactorioSandbox,
+    get_default_sandbox,
+    get_factorio_version,
+    get_render_sandbox,
+    run_factorio_command,
+)
+from src.FactorioPreviewToolkit.preview_generator.preview_cache import (
+    PreviewCache,
+    is_preview_cache_enabled,
+)
 from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.pipeline_events import (
+    announce_planet_ready,
+    report_stage_duration,
+)
+from src.FactorioPreviewToolkit.shared.run_history import (
+    is_recording_run_history,
+    record_factorio_version,
+    record_seed,
+)
 from src.FactorioPreviewToolkit.shared.shared_constants import constants
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.shared.utils import write_file_atomically
 
 
 def _log_seed_from_map_gen_settings(settings_path: Path) -> int:
@@ -45,6 +72,17 @@ def _load_supported_planets(path: Path) -> list[str]:
         return planets
 
 
+def _remember_supported_planets(factorio_base_path: Path, planets: list[str]) -> None:
+    """
+    Stores the planet list in the install cache, since it only depends on the game and its mods.
+    """
+    info = load_install_info(factorio_base_path)
+    if info.planets != planets:
+        info.planets = planets
+        save_install_info(factorio_base_path, info)
+        log.info("💾 Planet list stored in the Factorio install cache.")
+
+
 def write_planet_names_list_to_output(planets: list[str]) -> None:
     """
     Writes the list of supported planets in both JSON and JS format to the preview output directory.
@@ -54,8 +92,10 @@ def write_planet_names_list_to_output(planets: list[str]) -> None:
     json_payload = {"planets": planets, "time": datetime.now(timezone.utc).isoformat()}
 
     # Write JSON version
-    with constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH.open("w", encoding="utf-8") as f:
-        json.dump(json_payload, f, indent=2)
+    write_file_atomically(
+        constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH,
+        json.dumps(json_payload, indent=2).encode("utf-8"),
+    )
     log.info(f"📋 Planet list written to JSON: {constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH}")
 
     # Write JS version (list + upload time)
@@ -72,37 +112,202 @@ def write_planet_names_list_to_output(planets: list[str]) -> None:
 
 
 def generate_all_planet_previews(
-    factorio_base_path: Path, settings_path: Path, preview_width: int, planet_names: list[str]
+    factorio_base_path: Path,
+    settings_path: Path,
+    preview_width: int,
+    planet_names: list[str],
+    draft_width: int = 0,
 ) -> None:
     """
     Generates preview images for all supported planets.
+    Planets found in the preview cache are restored instead of rendered.
+    If a draft width smaller than the preview width is given, all remaining planets are first
+    rendered at draft size and published, then replaced by the full-size images.
+    """
+    cache = _get_preview_cache(factorio_base_path, settings_path, preview_width)
+    planet_names = _restore_cached_previews(cache, planet_names, is_final=True)
+    if not planet_names:
+        log.info("⚡ All planet previews restored from cache.")
+        return
+
+    if 0 < draft_width < preview_width:
+        with log_section(f"📝 Rendering draft previews at {draft_width}px...", "stage"):
+            draft_cache = _get_preview_cache(factorio_base_path, settings_path, draft_width)
+            _render_planet_previews(
+                factorio_base_path,
+                settings_path,
+                draft_width,
+                _restore_cached_previews(draft_cache, planet_names, is_final=False),
+                draft_cache,
+                is_final=False,
+            )
+            log.info("✅ Draft previews published.")
+
+    _render_planet_previews(
+        factorio_base_path, settings_path, preview_width, planet_names, cache, is_final=True
+    )
+
+
+def _get_preview_cache(
+    factorio_base_path: Path, settings_path: Path, preview_width: int
+) -> PreviewCache | None:
+    """
+    Returns the preview cache for the given preview size, or None if caching is disabled.
     """
+    if not is_preview_cache_enabled():
+        return None
+    return PreviewCache(factorio_base_path, settings_path, preview_width)
+
+
+def _restore_cached_previews(
+    cache: PreviewCache | None, planet_names: list[str], is_final: bool
+) -> list[str]:
+    """
+    Restores all cached planets into the output folder and returns the planets still to render.
+    Restored final images are announced to the uploader right away.
+    """
+    if cache is None:
+        return planet_names
+
+    remaining_planets = []
     for planet in planet_names:
-        with log_section(f"🪐 Generating preview for {planet}..."):
-            try:
-                _generate_preview_image(factorio_base_path, planet, settings_path, preview_width)
-            except Exception:
-                log.error(f"❌ Failed to generate preview for {planet}")
-                raise
+        if not cache.restore(planet, constants.PREVIEWS_OUTPUT_DIR / f"{planet}.png"):
+            remaining_planets.append(planet)
+        elif is_final:
+            announce_planet_ready(planet)
+    return remaining_planets
 
 
-def _generate_preview_image(
-    factorio_base_path: Path, planet: str, settings_path: Path, preview_width: int
+def _render_planet_previews(
+    factorio_base_path: Path,
+    settings_path: Path,
+    preview_width: int,
+    planet_names: list[str],
+    cache: PreviewCache | None,
+    is_final: bool,
 ) -> None:
+    """
+    Renders the given planets, several at once if more than one parallel worker is configured.
+    Final images are announced to the uploader as soon as each of them is written.
+    """
+    if not planet_names:
+        return
+
+    worker_count = min(Config.get().parallel_preview_workers, len(planet_names))
+    if worker_count <= 1:
+        sandbox = get_default_sandbox()
+        for planet in planet_names:
+            _generate_planet_preview(
+                factorio_base_path, planet, settings_path, preview_width, sandbox, cache, is_final
+            )
+        return
+
+    with log_section(
+        f"⚡ Rendering {len(planet_names)} planets with {worker_count} workers...", "stage"
+    ):
+        _generate_planet_previews_in_parallel(
+            factorio_base_path,
+            settings_path,
+            preview_width,
+            planet_names,
+            worker_count,
+            cache,
+            is_final,
+        )
+
+
+def _generate_planet_previews_in_parallel(
+    factorio_base_path: Path,
+    settings_path: Path,
+    preview_width: int,
+    planet_names: list[str],
+    worker_count: int,
+    cache: PreviewCache | None,
+    is_final: bool,
+) -> None:
+    """
+    Renders the planets on a pool of threads, each Factorio instance in its own sandbox.
+    Pending planets are dropped as soon as one of the renders fails.
+    """
+    free_sandboxes: Queue[FactorioSandbox] = Queue()
+    for index in range(worker_count):
+        free_sandboxes.put(get_render_sandbox(index))
+
+    def render(planet: str) -> None:
+        sandbox = free_sandboxes.get()
+        try:
+            _generate_planet_preview(
+                factorio_base_path, planet, settings_path, preview_width, sandbox, cache, is_final
+            )
+        finally:
+            free_sandboxes.put(sandbox)
+
+    with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="Renderer") as pool:
+        futures: list[Future[None]] = [pool.submit(render, planet) for planet in planet_names]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in pending:
+            future.cancel()
+        for future in futures:
+            if future in done:
+                future.result()
+
+
+def _generate_planet_preview(
+    factorio_base_path: Path,
+    planet: str,
+    settings_path: Path,
+    preview_width: int,
+    sandbox: FactorioSandbox,
+    cache: PreviewCache | None,
+    is_final: bool,
+) -> None:
+    """
+    Generates the preview of a single planet, adds it to the cache and logs failures.
+    Announces final images so the uploader can start on them immediately.
+    """
+    with log_section(f"🪐 Generating preview for {planet}..."):
+        try:
+            with report_stage_duration("render" if is_final else "draft_render", planet):
+                output = _generate_preview_image(
+                    factorio_base_path, planet, settings_path, preview_width, sandbox
+                )
+            if cache is not None:
+                cache.store(planet, output)
+            if is_final:
+                announce_planet_ready(planet)
+        except Exception:
+            log.error(f"❌ Failed to generate preview for {planet}")
+            raise
+
+
+def _generate_preview_image(
+    factorio_base_path: Path,
+    planet: str,
+    settings_path: Path,
+    preview_width: int,
+    sandbox: FactorioSandbox,
+) -> Path:
     """
     Generates a single map preview image for the given planet using the Factorio CLI.
+    The image is rendered into a staging folder and then moved into the output folder,
+    so the output folder never contains a partially written image.
     """
+    staging_dir = constants.RENDERED_PREVIEWS_STAGING_DIR
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    staged_output = staging_dir / f"{planet}.png"
     output = constants.PREVIEWS_OUTPUT_DIR / f"{planet}.png"
 
     args = [
-        f"--generate-map-preview={output}",
+        f"--generate-map-preview={staged_output}",
         f"--map-gen-settings={settings_path}",
         f"--map-preview-size={preview_width}",
         f"--map-preview-planet={planet}",
     ]
 
-    run_factorio_command(factorio_base_path, args)
+    run_factorio_command(factorio_base_path, args, sandbox)
+    os.replace(staged_output, output)
     log.info(f"✅ Preview generated at {output}")
+    return output
 
 
 def run_full_preview_generation(factorio_base_path: Path) -> None:
@@ -111,12 +316,22 @@ def run_full_preview_generation(factorio_base_path: Path) -> None:
     """
     with log_section("🌍 Starting map preview generation..."):
         settings_path = Path(constants.MAP_GEN_SETTINGS_FILEPATH)
-        _log_seed_from_map_gen_settings(settings_path)
+        record_seed(_log_seed_from_map_gen_settings(settings_path))
+        if is_recording_run_history():
+            major, minor = get_factorio_version(factorio_base_path)
+            record_factorio_version(f"{major}.{minor}")
 
         planet_names = _load_supported_planets(constants.PLANET_NAMES_GENERATION_FILEPATH)
+        _remember_supported_planets(factorio_base_path, planet_names)
         write_planet_names_list_to_output(planet_names)
 
-        preview_width = Config.get().map_preview_size
-        generate_all_planet_previews(factorio_base_path, settings_path, preview_width, planet_names)
+        config = Config.get()
+        generate_all_planet_previews(
+            factorio_base_path,
+            settings_path,
+            config.map_preview_size,
+            planet_names,
+            config.draft_preview_size,
+        )
 
         log.info("✅ All planet previews generated successfully.")
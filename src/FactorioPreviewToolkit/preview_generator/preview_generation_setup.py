@@ -7,16 +7,44 @@ This module injects Lua code into the control.lua of a dummy save file that:
 - Lists available planets (based on the loaded game/mod environment)
 
 It then runs Factorio in benchmark mode to trigger the script and collect results.
+With 'decode_map_gen_settings_natively' enabled, this benchmark run is skipped if the exchange
+string can be decoded natively in Python and the planet list of the Factorio install is already known.
+
+The pristine dummy save is created only once per Factorio install fingerprint and kept
+in a template store. Each job clones the template and only rewrites control.lua.
 """
 
 import json
+import os
+import shutil
 import textwrap
 import zipfile
 from pathlib import Path
 
-from src.FactorioPreviewToolkit.preview_generator.factorio_interface import run_factorio_command
+from src.FactorioPreviewToolkit.preview_generator.factorio_install_cache import (
+    get_install_fingerprint,
+    load_install_info,
+)
+from src.FactorioPreviewToolkit.preview_generator.factorio_interface import (
+    get_factorio_version,
+    run_factorio_command,
+)
+from src.FactorioPreviewToolkit.preview_generator.preview_cache import (
+    is_preview_cache_enabled,
+    restore_cached_setup,
+    store_setup,
+)
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.map_exchange_string import (
+    decode_map_exchange_string,
+    extract_map_gen_settings,
+)
+from src.FactorioPreviewToolkit.shared.pipeline_events import report_stage_duration
 from src.FactorioPreviewToolkit.shared.shared_constants import constants
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.shared.utils import clone_file
+
+_MAX_SAVE_TEMPLATES = 3
 
 
 def _build_control_lua(
@@ -67,26 +95,92 @@ def _build_control_lua(
     ).strip()
 
 
-def _create_dummy_save(factorio_path: Path) -> None:
+def _create_save_template(factorio_path: Path, template_dir: Path) -> None:
     """
-    Creates a dummy save used to execute Lua code to extract preview-relevant data.
-    Cleans up any leftover .zip from previous crashes.
+    Creates a pristine dummy save with `factorio --create` and stores it extracted in the template dir.
+    The template is built in a temporary folder and moved into place once complete.
     """
-    with log_section("🛠️ Creating dummy save..."):
-        save_folder = constants.DUMMY_SAVE_TO_EXECUTE_LUA_CODE_PATH
-        save_zip = save_folder.with_suffix(".zip")
+    save_name = constants.DUMMY_SAVE_TO_EXECUTE_LUA_CODE_PATH.name
+    build_dir = template_dir.with_name(f"{template_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(build_dir, ignore_errors=True)
+    build_dir.mkdir(parents=True)
+    save_zip = build_dir / f"{save_name}.zip"
 
-        if save_zip.exists():
-            save_zip.unlink()
-            log.info(f"🗑️ Removed leftover dummy save zip: {save_zip}")
-
-        log.info(f"📦 Creating dummy save at: {save_folder}")
+    try:
+        log.info(f"📦 Creating dummy save template at: {template_dir}")
         run_factorio_command(factorio_path, ["--create", str(save_zip)])
 
         log.info("📂 Extracting dummy save zip.")
         with zipfile.ZipFile(save_zip, "r") as zip_ref:
-            zip_ref.extractall(save_folder.parent)
+            zip_ref.extractall(build_dir)
         save_zip.unlink()
+
+        try:
+            build_dir.rename(template_dir)
+        except OSError:
+            if not template_dir.exists():
+                raise
+            log.info("♻️ Another process created the same template in the meantime.")
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def _prune_save_templates(keep: Path) -> None:
+    """
+    Deletes the oldest templates so that only the most recently used ones are kept.
+    """
+    templates = sorted(
+        (path for path in constants.SAVE_TEMPLATES_DIR.iterdir() if path.suffix != ".tmp"),
+        key=lambda path: path.stat().st_mtime,
+    )
+    for template in templates[:-_MAX_SAVE_TEMPLATES]:
+        if template != keep:
+            shutil.rmtree(template, ignore_errors=True)
+            log.info(f"🗑️ Removed old dummy save template: {template}")
+
+
+def _get_save_template(factorio_path: Path) -> Path:
+    """
+    Returns the extracted pristine save for the given Factorio install, creating it if needed.
+    """
+    template_dir = constants.SAVE_TEMPLATES_DIR / get_install_fingerprint(factorio_path)[:16]
+    if template_dir.exists():
+        log.info(f"♻️ Reusing dummy save template: {template_dir}")
+        template_dir.touch()
+    else:
+        _create_save_template(factorio_path, template_dir)
+        _prune_save_templates(keep=template_dir)
+    return template_dir / constants.DUMMY_SAVE_TO_EXECUTE_LUA_CODE_PATH.name
+
+
+def _clone_save_template(template_save: Path, save_folder: Path) -> None:
+    """
+    Clones the template save into the working save folder.
+    Files are shared with the template via reflinks or hardlinks where possible,
+    except control.lua, which gets its own copy because it is modified afterwards.
+    """
+    shutil.rmtree(save_folder, ignore_errors=True)
+    methods: set[str] = set()
+    for source in template_save.rglob("*"):
+        target = save_folder / source.relative_to(template_save)
+        if source.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        allow_hardlink = source.name != constants.CONTROL_LUA_FILEPATH.name
+        methods.add(clone_file(source, target, allow_hardlink=allow_hardlink))
+    log.info(f"📂 Cloned dummy save template ({', '.join(sorted(methods))}).")
+
+
+def _create_dummy_save(factorio_path: Path) -> None:
+    """
+    Creates a dummy save used to execute Lua code to extract preview-relevant data.
+    Only launches Factorio if no template exists yet for this Factorio install.
+    """
+    with log_section("🛠️ Creating dummy save..."):
+        save_folder = constants.DUMMY_SAVE_TO_EXECUTE_LUA_CODE_PATH
+        template_save = _get_save_template(factorio_path)
+        _clone_save_template(template_save, save_folder)
         log.info("✅ Dummy save created.")
 
 
@@ -151,13 +245,68 @@ def _run_preview_setup_save(factorio_path: Path) -> None:
         log.info("✅ Lua script executed and output files generated.")
 
 
+def _run_native_preview_setup(factorio_path: Path, map_string: str) -> bool:
+    """
+    Decodes the exchange string in Python and writes the setup results without launching Factorio.
+    Returns False if native decoding of map-gen-settings is disabled, the string's version has no
+    known layout or the planet list is not cached yet.
+    Raises if the string is corrupted, so corrupted strings never launch Factorio.
+    """
+    with log_section("🧬 Decoding map exchange string natively..."):
+        data = decode_map_exchange_string(map_string)
+        log.info(f"✅ Map exchange string exported by Factorio {data.version_string}.")
+
+        installed_version = get_factorio_version(factorio_path)
+        if installed_version != (0, 0) and data.version[:2] > installed_version:
+            log.warning(
+                f"⚠️ Map string is from Factorio {data.version_string}, but the selected "
+                f"Factorio is {installed_version[0]}.{installed_version[1]}."
+            )
+
+        if not Config.get().decode_map_gen_settings_natively:
+            return False
+
+        map_gen_settings = extract_map_gen_settings(data)
+        planets = load_install_info(factorio_path).planets
+        if map_gen_settings is None or planets is None:
+            log.info("↩️ Map-gen-settings cannot be decoded natively. Falling back to Factorio.")
+            return False
+
+        with constants.MAP_GEN_SETTINGS_FILEPATH.open("w", encoding="utf-8") as f:
+            json.dump(map_gen_settings, f, indent=2)
+        planets_path = constants.PLANET_NAMES_GENERATION_FILEPATH
+        planets_path.parent.mkdir(parents=True, exist_ok=True)
+        with planets_path.open("w", encoding="utf-8") as f:
+            json.dump(planets, f)
+        log.info(f"✅ map-gen-settings decoded to {constants.MAP_GEN_SETTINGS_FILEPATH}")
+        return True
+
+
+def run_factorio_preview_setup(factorio_path: Path, map_string: str) -> None:
+    """
+    Writes the setup results by running the preview setup script in a dummy save with Factorio.
+    """
+    _create_dummy_save(factorio_path)
+    _inject_preview_setup_script(map_string)
+    _run_preview_setup_save(factorio_path)
+    _extract_map_gen_settings_from_json()
+
+
 def run_preview_setup_pipeline(factorio_path: Path, map_string: str) -> None:
     """
     Full pipeline: prepares dummy save, injects Lua setup script, runs Factorio, and extracts result.
     """
-    with log_section("🔄 Running preview setup pipeline..."):
-        _create_dummy_save(factorio_path)
-        _inject_preview_setup_script(map_string)
-        _run_preview_setup_save(factorio_path)
-        _extract_map_gen_settings_from_json()
+    with (
+        log_section("🔄 Running preview setup pipeline...", "stage"),
+        report_stage_duration("setup"),
+    ):
+        cache_enabled = is_preview_cache_enabled()
+        if cache_enabled and restore_cached_setup(factorio_path, map_string):
+            log.info("⚡ Preview setup restored from cache.")
+            return
+
+        if not _run_native_preview_setup(factorio_path, map_string):
+            run_factorio_preview_setup(factorio_path, map_string)
+        if cache_enabled:
+            store_setup(factorio_path, map_string)
         log.info("✅ Preview setup complete.")
@@ -0,0 +1,199 @@
+"""
+Queries the run history (logs/run_history.sqlite3) that the toolkit records with record_run_history.
+
+Run with: python -m src.FactorioPreviewToolkit.run_history <query> [options]
+
+Queries:
+    jobs               the most recent jobs with their status, duration and details
+    slowest-planets    average and worst duration of a stage per planet, slowest first
+    latency-by-size    duration of successful jobs per preview size
+    trend              daily job duration and stage duration per preview size, to spot regressions
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from collections.abc import Sequence
+from datetime import datetime
+
+from src.FactorioPreviewToolkit.shared.run_history import open_run_history
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+
+
+def _format_seconds(value: float | None) -> str:
+    """
+    Formats a duration in seconds, or a dash if it is unknown.
+    """
+    return f"{value:.2f}s" if value is not None else "-"
+
+
+def show_recent_jobs(connection: sqlite3.Connection, limit: int) -> None:
+    """
+    Logs the most recent jobs, newest first.
+    """
+    rows = connection.execute(
+        """
+        SELECT started_at, status, finished_at - started_at, preview_size, seed, factorio_version,
+               map_string_hash,
+               (SELECT SUM(output_size_in_bytes) FROM planet_outputs
+                WHERE planet_outputs.job_id = jobs.job_id)
+        FROM jobs ORDER BY started_at DESC LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+    with log_section(f"📜 Last {len(rows)} jobs:"):
+        log.info(
+            f"{'started':<19} {'status':<10} {'duration':>9} {'size':>6} {'seed':>11} "
+            f"{'factorio':<8} {'output':>9}  map string"
+        )
+        for started_at, status, duration, size, seed, version, map_hash, output_size in rows:
+            output = f"{output_size / 1024:.0f} KB" if output_size is not None else "-"
+            log.info(
+                f"{datetime.fromtimestamp(started_at):%Y-%m-%d %H:%M:%S} {status:<10} "
+                f"{_format_seconds(duration):>9} {size:>6} {seed if seed is not None else '-':>11} "
+                f"{version or '-':<8} {output:>9}  {map_hash[:12]}"
+            )
+
+
+def show_slowest_planets(
+    connection: sqlite3.Connection, stage: str, preview_size: int | None, limit: int
+) -> None:
+    """
+    Logs the average and worst duration of a stage per planet, slowest first.
+    """
+    rows = connection.execute(
+        """
+        SELECT planet, COUNT(*), AVG(duration_in_sec), MAX(duration_in_sec)
+        FROM stage_durations JOIN jobs USING (job_id)
+        WHERE stage = ? AND planet != '' AND (? IS NULL OR preview_size = ?)
+        GROUP BY planet ORDER BY AVG(duration_in_sec) DESC LIMIT ?
+        """,
+        (stage, preview_size, preview_size, limit),
+    ).fetchall()
+    size_info = f" at {preview_size}px" if preview_size is not None else ""
+    with log_section(f"🐢 Slowest planets ({stage}{size_info}):"):
+        log.info(f"{'planet':<20} {'count':>6} {'average':>9} {'worst':>9}")
+        for planet, count, average, worst in rows:
+            log.info(
+                f"{planet:<20} {count:>6} {_format_seconds(average):>9} "
+                f"{_format_seconds(worst):>9}"
+            )
+
+
+def show_latency_by_size(connection: sqlite3.Connection) -> None:
+    """
+    Logs the duration of successful jobs (map string detected to last upload) per preview size.
+    """
+    rows = connection.execute(
+        """
+        SELECT preview_size, COUNT(*), AVG(finished_at - started_at),
+               MIN(finished_at - started_at), MAX(finished_at - started_at)
+        FROM jobs WHERE status = 'succeeded'
+        GROUP BY preview_size ORDER BY preview_size
+        """
+    ).fetchall()
+    with log_section("📏 Job duration by preview size (successful jobs):"):
+        log.info(f"{'size':>6} {'jobs':>6} {'average':>9} {'fastest':>9} {'slowest':>9}")
+        for size, count, average, fastest, slowest in rows:
+            log.info(
+                f"{size:>6} {count:>6} {_format_seconds(average):>9} "
+                f"{_format_seconds(fastest):>9} {_format_seconds(slowest):>9}"
+            )
+
+
+def show_trend(connection: sqlite3.Connection, stage: str, days: int) -> None:
+    """
+    Logs the average job duration and the average per-planet stage duration of successful jobs
+    per day and preview size. The change is relative to the first day with the same preview size.
+    """
+    rows = connection.execute(
+        """
+        WITH job_stage AS (
+            SELECT job_id, AVG(duration_in_sec) AS stage_average
+            FROM stage_durations WHERE stage = ? GROUP BY job_id
+        )
+        SELECT date(started_at, 'unixepoch', 'localtime') AS day, preview_size, COUNT(*),
+               AVG(finished_at - started_at), AVG(stage_average)
+        FROM jobs LEFT JOIN job_stage USING (job_id)
+        WHERE status = 'succeeded' AND started_at >= ?
+        GROUP BY day, preview_size ORDER BY preview_size, day
+        """,
+        (stage, time.time() - days * 24 * 3600),
+    ).fetchall()
+    first_average_by_size: dict[int, float] = {}
+    with log_section(f"📈 Daily trend of the last {days} days ({stage} per planet):"):
+        log.info(
+            f"{'day':<10} {'size':>6} {'jobs':>6} {'job avg':>9} {'change':>8} {stage + ' avg':>14}"
+        )
+        for day, size, count, average, stage_average in rows:
+            first_average = first_average_by_size.setdefault(size, average)
+            change = (average - first_average) / first_average if first_average else 0.0
+            log.info(
+                f"{day:<10} {size:>6} {count:>6} {_format_seconds(average):>9} {change:>+8.1%} "
+                f"{_format_seconds(stage_average):>14}"
+            )
+
+
+def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command-line arguments.
+    """
+    raw_args = argv if argv is not None else sys.argv[1:]
+
+    if "--run-history" in raw_args:
+        run_history_index = raw_args.index("--run-history")
+        raw_args = raw_args[run_history_index + 1 :]
+
+    parser = argparse.ArgumentParser(description="Query the run history of the toolkit")
+    queries = parser.add_subparsers(dest="query", required=True)
+
+    jobs = queries.add_parser("jobs", help="Show the most recent jobs.")
+    jobs.add_argument("--limit", type=int, default=20, help="Number of jobs to show.")
+
+    slowest = queries.add_parser("slowest-planets", help="Show the slowest planets of a stage.")
+    slowest.add_argument(
+        "--stage",
+        default="render",
+        help="Stage to rank: setup, draft_render, render, postprocess or upload.",
+    )
+    slowest.add_argument("--preview-size", type=int, help="Only count jobs of this preview size.")
+    slowest.add_argument("--limit", type=int, default=10, help="Number of planets to show.")
+
+    queries.add_parser("latency-by-size", help="Show the job duration per preview size.")
+
+    trend = queries.add_parser("trend", help="Show the daily job and stage durations.")
+    trend.add_argument("--days", type=int, default=30, help="Number of days to show.")
+    trend.add_argument("--stage", default="render", help="Stage to show next to the job duration.")
+    return parser.parse_args(raw_args)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Runs the requested query on the run history.
+    """
+    arguments = parse_arguments(argv)
+    if not constants.RUN_HISTORY_FILEPATH.exists():
+        log.info(
+            f"⚠️ No run history found at {constants.RUN_HISTORY_FILEPATH}. "
+            f"Enable record_run_history and run some jobs first."
+        )
+        return
+
+    with open_run_history() as connection:
+        match arguments.query:
+            case "jobs":
+                show_recent_jobs(connection, arguments.limit)
+            case "slowest-planets":
+                show_slowest_planets(
+                    connection, arguments.stage, arguments.preview_size, arguments.limit
+                )
+            case "latency-by-size":
+                show_latency_by_size(connection)
+            case "trend":
+                show_trend(connection, arguments.stage, arguments.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ class Config:
 
     _instance: Settings | None = None
     _path = Path(constants.PREVIEW_TOOLKIT_CONFIG_FILEPATH)
+    # Modification time and size of the config file when it was loaded
+    _loaded_file_state: tuple[int, int] | None = None
 
     @classmethod
     def get(cls) -> Settings:
@@ -26,6 +28,29 @@ class Config:
                 raise ValueError("Failed to load settings from config file.")
         return cls._instance
 
+    @classmethod
+    def reload_if_changed(cls) -> bool:
+        """
+        Reloads the config if the file changed since it was loaded (or it was not loaded yet).
+        Returns True if it was reloaded.
+        """
+        if cls._instance is not None and cls._get_file_state() == cls._loaded_file_state:
+            return False
+        cls._instance = None
+        cls.get()
+        return True
+
+    @classmethod
+    def _get_file_state(cls) -> tuple[int, int] | None:
+        """
+        Returns the modification time and size of the config file, or None if it is missing.
+        """
+        try:
+            stat = cls._path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     @classmethod
     def _load(cls) -> None:
         """
@@ -39,6 +64,8 @@ class Config:
                 log.error(f"❌ Config file not found at: {config_path}")
                 raise FileNotFoundError(f"Config file not found at: {config_path}")
 
+            # Taken before reading, so an edit during the read is picked up by the next reload
+            cls._loaded_file_state = cls._get_file_state()
             parser = ConfigParser(interpolation=ExtendedInterpolation())
             parser.read(config_path)
 
@@ -1,3 +1,4 @@
+import os
 import subprocess
 import time
 from pathlib import Path
@@ -7,6 +8,11 @@ from pydantic import BaseModel, model_validator, field_validator
 from pydantic_core.core_schema import FieldValidationInfo, ValidationInfo
 from typing_extensions import Self
 
+from src.FactorioPreviewToolkit.shared.image_encoders import (
+    PreviewImageFormat,
+    get_supported_image_formats,
+    is_image_format_supported,
+)
 from src.FactorioPreviewToolkit.shared.structured_logger import log
 from src.FactorioPreviewToolkit.shared.utils import (
     resolve_relative_to_project_root,
@@ -54,6 +60,15 @@ class Settings(BaseModel):
 
     # === Preview Generation ===
     map_preview_size: int
+    draft_preview_size: int = 0
+    parallel_preview_workers: int = 1
+    preview_cache_size_limit_in_mb: int = 0
+    decode_map_gen_settings_natively: bool = False
+    use_warm_worker_processes: bool = False
+    png_postprocessing_workers: int = 1
+    record_job_traces: bool = False
+    record_run_history: bool = False
+    metrics_port: int = 0
 
     # === Sound Settings ===
     sound_start_filepath: Path
@@ -65,10 +80,18 @@ class Settings(BaseModel):
 
     # === Upload Settings ===
     upload_method: Literal["rclone", "local_sync", "skip"]
+    skip_unchanged_uploads: bool = False
+    upload_concurrency: int = 1
     rclone_remote_service: str = ""
     rclone_remote_upload_dir: Path = Path("not-used")
     rclone_executable: Path = Path("not-used")
+    rclone_use_daemon: bool = False
+    rclone_link_cache_ttl_in_hours: float = 0
     local_sync_target_dir: Path = Path("not-used")
+    local_sync_allow_hardlinks: bool = False
+    tile_base_url: str = ""
+    preview_image_format: PreviewImageFormat = "png"
+    preview_image_quality: int = 80
 
     class Config:
         frozen = True
@@ -80,6 +103,8 @@ class Settings(BaseModel):
         """
         cls._expand_mac_app_path(values)
         cls._resolve_auto_rclone_path(values)
+        cls._resolve_auto_parallel_preview_workers(values)
+        cls._resolve_auto_png_postprocessing_workers(values)
         cls._resolve_paths_relative_to_root(values)
         cls._resolve_rclone_remote_aliases(values)
         return values
@@ -122,6 +147,22 @@ class Settings(BaseModel):
                 Path("third_party") / "rclone" / f"{os_name}" / f"{arch}" / binary_name
             )
 
+    @staticmethod
+    def _resolve_auto_parallel_preview_workers(values: dict[str, Any]) -> None:
+        """
+        Replaces 'auto' in parallel_preview_workers with a worker count derived from the CPU cores.
+        """
+        if values.get("parallel_preview_workers") == "auto":
+            values["parallel_preview_workers"] = max(1, (os.cpu_count() or 1) // 4)
+
+    @staticmethod
+    def _resolve_auto_png_postprocessing_workers(values: dict[str, Any]) -> None:
+        """
+        Replaces 'auto' in png_postprocessing_workers with half the CPU cores.
+        """
+        if values.get("png_postprocessing_workers") == "auto":
+            values["png_postprocessing_workers"] = max(1, (os.cpu_count() or 1) // 2)
+
     @staticmethod
     def _resolve_paths_relative_to_root(values: dict[str, Any]) -> None:
         """
@@ -189,6 +230,81 @@ class Settings(BaseModel):
             raise ValueError(f"'map_preview_size' must be a positive integer. You entered: {v}")
         return v
 
+    @field_validator("draft_preview_size")
+    def draft_preview_size_must_not_be_negative(cls, v: int) -> int:
+        """
+        Ensures the draft preview size is zero (disabled) or positive.
+        """
+        if v < 0:
+            raise ValueError(
+                f"'draft_preview_size' must be 0 or a positive integer. You entered: {v}"
+            )
+        return v
+
+    @field_validator("parallel_preview_workers")
+    def parallel_preview_workers_must_be_positive(cls, v: int) -> int:
+        """
+        Ensures at least one render worker is configured.
+        """
+        if v <= 0:
+            raise ValueError(
+                f"'parallel_preview_workers' must be 'auto' or a positive integer. You entered: {v}"
+            )
+        return v
+
+    @field_validator("png_postprocessing_workers")
+    def png_postprocessing_workers_must_be_positive(cls, v: int) -> int:
+        """
+        Ensures at least one PNG post-processing worker is configured.
+        """
+        if v <= 0:
+            raise ValueError(
+                f"'png_postprocessing_workers' must be 'auto' or a positive integer. You entered: {v}"
+            )
+        return v
+
+    @field_validator("metrics_port")
+    def metrics_port_must_be_valid(cls, v: int) -> int:
+        """
+        Ensures the metrics port is zero (disabled) or a valid TCP port.
+        """
+        if not 0 <= v <= 65535:
+            raise ValueError(
+                f"'metrics_port' must be 0 or a port from 1 to 65535. You entered: {v}"
+            )
+        return v
+
+    @field_validator("preview_cache_size_limit_in_mb")
+    def preview_cache_size_limit_must_not_be_negative(cls, v: int) -> int:
+        """
+        Ensures the preview cache budget is zero (disabled) or positive.
+        """
+        if v < 0:
+            raise ValueError(
+                f"'preview_cache_size_limit_in_mb' must be 0 or a positive integer. You entered: {v}"
+            )
+        return v
+
+    @field_validator("upload_concurrency")
+    def upload_concurrency_must_be_positive(cls, v: int) -> int:
+        """
+        Ensures at least one upload can run at a time.
+        """
+        if v <= 0:
+            raise ValueError(f"'upload_concurrency' must be a positive integer. You entered: {v}")
+        return v
+
+    @field_validator("rclone_link_cache_ttl_in_hours")
+    def rclone_link_cache_ttl_must_not_be_negative(cls, v: float) -> float:
+        """
+        Ensures the share link lifetime is zero (never expire) or positive.
+        """
+        if v < 0:
+            raise ValueError(
+                f"'rclone_link_cache_ttl_in_hours' must be 0 or a positive number. You entered: {v}"
+            )
+        return v
+
     @field_validator("start_sound_volume", "success_sound_volume", "failure_sound_volume")
     def volumes_between_0_and_1(cls, v: float, info: FieldValidationInfo) -> float:
         """
@@ -253,6 +369,34 @@ class Settings(BaseModel):
             raise ValueError("'rclone_remote_service' must be set when using rclone upload.")
         return v
 
+    @field_validator("preview_image_format")
+    def preview_image_format_must_be_supported(cls, v: PreviewImageFormat) -> PreviewImageFormat:
+        """
+        Ensures the installed Pillow build can encode the chosen preview image format.
+        """
+        if not is_image_format_supported(v):
+            raise ValueError(
+                f"'preview_image_format = {v}' is not supported by this build. "
+                f"Supported formats: {', '.join(get_supported_image_formats())}"
+            )
+        return v
+
+    @field_validator("preview_image_quality")
+    def preview_image_quality_between_1_and_100(cls, v: int) -> int:
+        """
+        Ensures the lossy encoding quality is between 1 and 100.
+        """
+        if not (1 <= v <= 100):
+            raise ValueError(f"'preview_image_quality' must be between 1 and 100. You entered: {v}")
+        return v
+
+    @field_validator("tile_base_url")
+    def strip_trailing_slash_from_tile_base_url(cls, v: str) -> str:
+        """
+        Normalizes the tile base URL so tile paths can be appended with a single slash.
+        """
+        return v.strip().rstrip("/")
+
     @field_validator("file_monitor_filepath")
     def check_file_monitor_filepath_if_used(cls, v: Path, info: FieldValidationInfo) -> Path:
         """
@@ -1,13 +1,20 @@
+import os
 import tkinter as tk
 from tkinter import scrolledtext
 
 import pyperclip
 
+# Set to "1" to never open popups, e.g. for unattended batch runs. The error is logged anyway.
+HEADLESS_ENV = "FACTORIO_TOOLKIT_HEADLESS"
+
 
 def show_error_popup(title: str, message: str) -> None:
     """
     Opens a simple Tkinter popup window displaying an error message with a copy-to-clipboard button.
+    Does nothing in headless mode.
     """
+    if os.environ.get(HEADLESS_ENV) == "1":
+        return
 
     def copy_to_clipboard() -> None:
         """
@@ -0,0 +1,125 @@
+import io
+import struct
+import zlib
+from datetime import datetime
+from typing import Any, Literal, get_args
+
+from PIL import ExifTags, Image, features
+
+PreviewImageFormat = Literal["png", "webp_lossless", "webp", "avif"]
+
+PREVIEW_IMAGE_EXTENSIONS: dict[PreviewImageFormat, str] = {
+    "png": ".png",
+    "webp_lossless": ".webp",
+    "webp": ".webp",
+    "avif": ".avif",
+}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_IEND_CHUNK_SIZE = 12
+UPLOAD_TIME_KEYWORD = "upload_time"
+
+
+def is_image_format_supported(image_format: PreviewImageFormat) -> bool:
+    """
+    Returns True if the installed Pillow build can encode the format.
+    """
+    match image_format:
+        case "webp_lossless" | "webp":
+            return bool(features.check("webp"))
+        case "avif":
+            return bool(features.check("avif"))
+        case _:
+            return True
+
+
+def get_supported_image_formats() -> list[PreviewImageFormat]:
+    """
+    Returns all preview image formats the installed Pillow build can encode.
+    """
+    return [
+        image_format
+        for image_format in get_args(PreviewImageFormat)
+        if is_image_format_supported(image_format)
+    ]
+
+
+def quantize_image(image: Image.Image) -> Image.Image:
+    """
+    Quantizes the image to a 256-color palette, unless it is paletted already.
+    """
+    if image.mode == "P":
+        return image
+    return image.convert("P", palette=Image.Palette.ADAPTIVE, colors=256)
+
+
+def splice_png_text_chunk(png_bytes: bytes, keyword: str, text: str) -> bytes:
+    """
+    Inserts a tEXt chunk right before the IEND chunk of an encoded PNG.
+    The image data is left untouched, so no decode or re-encode is needed.
+    """
+    if not png_bytes.startswith(_PNG_SIGNATURE):
+        raise ValueError("❌ Not a PNG byte stream.")
+    iend_start = len(png_bytes) - _IEND_CHUNK_SIZE
+    if png_bytes[iend_start + 4 : iend_start + 8] != b"IEND":
+        raise ValueError("❌ PNG byte stream does not end with an IEND chunk.")
+    if not 1 <= len(keyword) <= 79:
+        raise ValueError(f"❌ PNG text keyword must be 1-79 characters long: {keyword!r}")
+
+    chunk_data = keyword.encode("latin-1") + b"\0" + text.encode("latin-1")
+    chunk_type = b"tEXt"
+    chunk = (
+        struct.pack(">I", len(chunk_data))
+        + chunk_type
+        + chunk_data
+        + struct.pack(">I", zlib.crc32(chunk_type + chunk_data))
+    )
+    return png_bytes[:iend_start] + chunk + png_bytes[iend_start:]
+
+
+def _build_exif(upload_time: str) -> bytes:
+    """
+    Builds an EXIF block that carries the upload time (ISO 8601) as its DateTime.
+    """
+    exif = Image.Exif()
+    exif_time = datetime.fromisoformat(upload_time).strftime("%Y:%m:%d %H:%M:%S")
+    exif[ExifTags.Base.DateTime] = exif_time
+    return exif.tobytes()
+
+
+def encode_preview_image(
+    image: Image.Image,
+    image_format: PreviewImageFormat,
+    quality: int,
+    upload_time: str | None = None,
+) -> bytes:
+    """
+    Encodes a decoded preview image into the given format in a single encode.
+    PNG is quantized to 256 colors and compressed losslessly at maximum level. Lossy WebP and
+    AVIF use the quality (1-100); lossless WebP ignores it.
+    If an upload time is given, it is stored in the image metadata: as a tEXt chunk spliced into
+    the encoded PNG, or as EXIF DateTime for WebP and AVIF.
+    """
+    buffer = io.BytesIO()
+    match image_format:
+        case "png":
+            quantize_image(image).save(buffer, format="PNG", optimize=True, compress_level=9)
+            if upload_time is None:
+                return buffer.getvalue()
+            return splice_png_text_chunk(buffer.getvalue(), UPLOAD_TIME_KEYWORD, upload_time)
+        case "webp_lossless":
+            pillow_format = "WEBP"
+            save_options: dict[str, Any] = {"lossless": True}
+        case "webp":
+            pillow_format = "WEBP"
+            save_options = {"quality": quality}
+        case "avif":
+            pillow_format = "AVIF"
+            save_options = {"quality": quality}
+        case other:
+            raise ValueError(f"❌ Unsupported preview image format: {other}")
+
+    if upload_time is not None:
+        save_options["exif"] = _build_exif(upload_time)
+    image.save(buffer, format=pillow_format, **save_options)
+    return buffer.getvalue()
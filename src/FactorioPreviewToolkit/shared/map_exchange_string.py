@@ -0,0 +1,331 @@
+"""
+Pure-Python decoding of Factorio map exchange strings (>>>eN...<<<).
+
+An exchange string is base64-encoded, zlib-compressed binary data:
+- the Factorio version that exported it (4 little-endian uint16: major, minor, patch, build)
+- the serialized map-gen-settings and map settings
+- a CRC32 checksum of all preceding bytes (little-endian uint32)
+
+Decoding the container and checking its checksum is enough to reject truncated or corrupted strings
+without launching Factorio. The binary settings layout changes between Factorio versions, so
+map-gen-settings are only emitted for versions with a registered layout reader (2.0). The reader
+checks every value it reads; if anything does not fit its layout, it gives up and the caller lets
+Factorio decode the string itself.
+"""
+
+import base64
+import binascii
+import math
+import re
+import struct
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+# Exchange strings are a few kilobytes. Anything far beyond that is not a real map string.
+_MAX_DECOMPRESSED_SIZE = 1024 * 1024
+_VERSION_HEADER = struct.Struct("<4H")
+_CHECKSUM = struct.Struct("<I")
+
+_UINT8 = struct.Struct("<B")
+_INT16 = struct.Struct("<h")
+_UINT32 = struct.Struct("<I")
+_INT32 = struct.Struct("<i")
+_FLOAT = struct.Struct("<f")
+
+# Bounds for values a real exchange string cannot exceed. A reader that hits one is misaligned.
+_MAX_ENTRY_COUNT = 4096
+_MAX_STRING_LENGTH = 4096
+_MAX_SETTING_VALUE = 1.0e6
+_MAX_MAP_SIZE = 2_000_000
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_\-.:]+$")
+
+# Space-optimized integers that do not fit in one byte are prefixed with this marker
+_SPACE_OPTIMIZED_MARKER = 0xFF
+# Map positions stored as a 16-bit difference to the previous one, unless prefixed with this marker
+_POSITION_DIFF_MARKER = 0x7FFF
+# Map positions are fixed-point numbers in 1/256 of a tile
+_POSITION_SCALE = 256
+
+
+class MapExchangeStringError(ValueError):
+    """
+    Raised when a map exchange string cannot be decoded.
+    """
+
+
+class _BinaryReader:
+    """
+    Reads the primitive types of Factorio's binary serialization from a buffer.
+    Raises MapExchangeStringError on truncated data or implausible values.
+    """
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+        self._last_position = (0, 0)
+
+    @property
+    def remaining(self) -> int:
+        """
+        Returns the number of unread bytes.
+        """
+        return len(self._data) - self._offset
+
+    def _unpack(self, fmt: struct.Struct) -> Any:
+        """
+        Reads one value of a fixed-size type.
+        """
+        if self.remaining < fmt.size:
+            raise MapExchangeStringError("Map settings end unexpectedly.")
+        value = fmt.unpack_from(self._data, self._offset)[0]
+        self._offset += fmt.size
+        return value
+
+    def read_uint8(self) -> int:
+        """
+        Reads an unsigned byte.
+        """
+        return int(self._unpack(_UINT8))
+
+    def read_uint32(self) -> int:
+        """
+        Reads an unsigned 32-bit integer.
+        """
+        return int(self._unpack(_UINT32))
+
+    def read_bool(self) -> bool:
+        """
+        Reads a boolean stored in one byte.
+        """
+        value = self.read_uint8()
+        if value > 1:
+            raise MapExchangeStringError(f"Invalid boolean value {value} in map settings.")
+        return value == 1
+
+    def read_float(self, minimum: float = 0.0, maximum: float = _MAX_SETTING_VALUE) -> float:
+        """
+        Reads a 32-bit float, rounded the way Factorio prints it, and checks its range.
+        """
+        value = float(self._unpack(_FLOAT))
+        if not math.isfinite(value) or not minimum <= value <= maximum:
+            raise MapExchangeStringError(f"Implausible value {value} in map settings.")
+        return float(f"{value:.7g}")
+
+    def read_space_optimized_uint(self) -> int:
+        """
+        Reads an integer stored in one byte, or in four more bytes after a marker byte.
+        """
+        value = self.read_uint8()
+        return self.read_uint32() if value == _SPACE_OPTIMIZED_MARKER else value
+
+    def read_count(self) -> int:
+        """
+        Reads the number of entries of a collection.
+        """
+        count = self.read_space_optimized_uint()
+        if count > _MAX_ENTRY_COUNT:
+            raise MapExchangeStringError(f"Implausible entry count {count} in map settings.")
+        return count
+
+    def read_string(self) -> str:
+        """
+        Reads a length-prefixed UTF-8 string of printable characters.
+        """
+        length = self.read_space_optimized_uint()
+        if length > min(_MAX_STRING_LENGTH, self.remaining):
+            raise MapExchangeStringError("Implausible string length in map settings.")
+        raw = self._data[self._offset : self._offset + length]
+        self._offset += length
+        try:
+            value = raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise MapExchangeStringError("Invalid string in map settings.") from e
+        if not value.isprintable():
+            raise MapExchangeStringError("Invalid string in map settings.")
+        return value
+
+    def read_name(self) -> str:
+        """
+        Reads the name of a prototype, control or property.
+        """
+        value = self.read_string()
+        if not _NAME_PATTERN.match(value):
+            raise MapExchangeStringError(f"Invalid name {value!r} in map settings.")
+        return value
+
+    def read_position(self) -> dict[str, float]:
+        """
+        Reads a map position, stored as the difference to the previously read position
+        if it fits in 16 bits per axis.
+        """
+        dx = int(self._unpack(_INT16))
+        if dx == _POSITION_DIFF_MARKER:
+            x, y = int(self._unpack(_INT32)), int(self._unpack(_INT32))
+        else:
+            dy = int(self._unpack(_INT16))
+            x, y = self._last_position[0] + dx, self._last_position[1] + dy
+        self._last_position = (x, y)
+        return {"x": x / _POSITION_SCALE, "y": y / _POSITION_SCALE}
+
+
+def _read_frequency_size_richness(reader: _BinaryReader) -> dict[str, float]:
+    """
+    Reads the settings of an autoplace control.
+    """
+    return {
+        "frequency": reader.read_float(),
+        "size": reader.read_float(),
+        "richness": reader.read_float(),
+    }
+
+
+def _read_map_gen_settings_2_0(payload: bytes) -> dict[str, Any]:
+    """
+    Reads the map-gen-settings of a Factorio 2.0 exchange string.
+    """
+    reader = _BinaryReader(payload)
+    reader.read_uint8()  # Unused byte after the version header
+
+    autoplace_controls = {
+        reader.read_name(): _read_frequency_size_richness(reader)
+        for _ in range(reader.read_count())
+    }
+    autoplace_settings: dict[str, Any] = {}
+    for _ in range(reader.read_count()):
+        category = reader.read_name()
+        treat_missing_as_default = reader.read_bool()
+        autoplace_settings[category] = {
+            "treat_missing_as_default": treat_missing_as_default,
+            "settings": {
+                reader.read_name(): _read_frequency_size_richness(reader)
+                for _ in range(reader.read_count())
+            },
+        }
+    default_enable_all_autoplace_controls = reader.read_bool()
+    seed = reader.read_uint32()
+    width = reader.read_uint32()
+    height = reader.read_uint32()
+    if width > _MAX_MAP_SIZE or height > _MAX_MAP_SIZE:
+        raise MapExchangeStringError(f"Implausible map size {width}x{height}.")
+    # area_to_generate_at_start: not part of the map-gen-settings Factorio exports
+    reader.read_position()
+    reader.read_position()
+    starting_area = reader.read_float()
+    peaceful_mode = reader.read_bool()
+    no_enemies_mode = reader.read_bool()
+    starting_points = [reader.read_position() for _ in range(reader.read_count())]
+    property_expression_names = {
+        reader.read_name(): reader.read_string() for _ in range(reader.read_count())
+    }
+    cliff_settings = {
+        "name": reader.read_name(),
+        "control": reader.read_name(),
+        "cliff_elevation_0": reader.read_float(-_MAX_SETTING_VALUE),
+        "cliff_elevation_interval": reader.read_float(),
+        "cliff_smoothing": reader.read_float(),
+        "richness": reader.read_float(),
+    }
+    if reader.remaining <= _CHECKSUM.size:
+        # The map settings follow, so the map-gen-settings cannot end at the end of the data
+        raise MapExchangeStringError("Map settings are missing.")
+
+    return {
+        "autoplace_controls": autoplace_controls,
+        "autoplace_settings": autoplace_settings,
+        "default_enable_all_autoplace_controls": default_enable_all_autoplace_controls,
+        "seed": seed,
+        "width": width,
+        "height": height,
+        "starting_area": starting_area,
+        "peaceful_mode": peaceful_mode,
+        "no_enemies_mode": no_enemies_mode,
+        "starting_points": starting_points,
+        "property_expression_names": property_expression_names,
+        "cliff_settings": cliff_settings,
+    }
+
+
+# Readers that turn the binary map-gen-settings of a (major, minor) version into the
+# same dictionary Factorio writes with helpers.table_to_json(parse_map_exchange_string()).
+_MAP_GEN_SETTINGS_READERS: dict[tuple[int, int], Callable[[bytes], dict[str, Any]]] = {
+    (2, 0): _read_map_gen_settings_2_0,
+}
+
+
+class MapExchangeData:
+    """
+    The decoded binary content of a map exchange string.
+    """
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.version: tuple[int, int, int, int] = _VERSION_HEADER.unpack_from(raw)
+
+    @property
+    def version_string(self) -> str:
+        """
+        Returns the exporting Factorio version as 'major.minor.patch'.
+        """
+        major, minor, patch, _ = self.version
+        return f"{major}.{minor}.{patch}"
+
+    @property
+    def payload(self) -> bytes:
+        """
+        Returns the serialized settings between the version header and the checksum.
+        """
+        return self.raw[_VERSION_HEADER.size : -_CHECKSUM.size]
+
+    def has_valid_checksum(self) -> bool:
+        """
+        Checks the trailing CRC32 against the data in front of it.
+        """
+        expected: int = _CHECKSUM.unpack_from(self.raw, len(self.raw) - _CHECKSUM.size)[0]
+        return zlib.crc32(self.raw[: -_CHECKSUM.size]) == expected
+
+
+def decode_map_exchange_string(map_string: str) -> MapExchangeData:
+    """
+    Decodes the base64 and zlib layers of an exchange string.
+    Raises MapExchangeStringError if the string is truncated, corrupted or implausibly large.
+    """
+    body = re.sub(r"\s+", "", map_string)
+    if not (body.startswith(">>>") and body.endswith("<<<")):
+        raise MapExchangeStringError("Map exchange string must be wrapped in >>> and <<<.")
+
+    try:
+        compressed = base64.b64decode(body[3:-3], validate=True)
+    except binascii.Error as e:
+        raise MapExchangeStringError(f"Map exchange string is not valid base64: {e}") from e
+
+    decompressor = zlib.decompressobj()
+    try:
+        raw = decompressor.decompress(compressed, _MAX_DECOMPRESSED_SIZE)
+    except zlib.error as e:
+        raise MapExchangeStringError(f"Map exchange string is corrupted: {e}") from e
+    if decompressor.unconsumed_tail:
+        raise MapExchangeStringError("Map exchange string is implausibly large.")
+    if not decompressor.eof:
+        raise MapExchangeStringError("Map exchange string is truncated.")
+    if len(raw) < _VERSION_HEADER.size + _CHECKSUM.size:
+        raise MapExchangeStringError("Map exchange string is too short.")
+
+    data = MapExchangeData(raw)
+    if not data.has_valid_checksum():
+        raise MapExchangeStringError("Map exchange string checksum does not match.")
+    return data
+
+
+def extract_map_gen_settings(data: MapExchangeData) -> dict[str, Any] | None:
+    """
+    Returns the map-gen-settings of the decoded string, or None if its version has no
+    registered layout reader or its settings do not fit the reader's layout.
+    """
+    reader = _MAP_GEN_SETTINGS_READERS.get(data.version[:2])
+    if reader is None:
+        return None
+    try:
+        return reader(data.payload)
+    except MapExchangeStringError:
+        return None
@@ -0,0 +1,352 @@
+"""
+Prometheus-style metrics of a toolkit session.
+
+The controller keeps counters, gauges and histograms in memory. If enabled, a small HTTP server
+on the loopback interface serves them in the Prometheus text format at
+http://127.0.0.1:<metrics_port>/metrics, so Prometheus (or any scraper) can graph a whole session.
+The metrics the toolkit records are defined at the bottom of this module.
+"""
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    """
+    Formats a sample value: whole numbers without a fraction, infinity as +Inf.
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    """
+    Escapes backslashes, quotes and line breaks in a label value.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Formats a label set as {name="value",...}. Labels with empty values are left out.
+    """
+    pairs = [
+        f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values) if value
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(ABC):
+    """
+    Base class of the metric types: name, help text, label names and registration.
+    """
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        _registry.register(self)
+
+    def _get_label_values(self, labels: dict[str, str]) -> LabelValues:
+        """
+        Returns the label values in the order of the label names.
+        """
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"❌ Metric {self.name} expects the labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> list[str]:
+        """
+        Returns the lines of this metric in the Prometheus text format.
+        """
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self._render_samples(),
+        ]
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        """
+        Returns the sample lines of the metric.
+        """
+        ...
+
+
+class Counter(_Metric):
+    """
+    A value that only goes up, e.g. the number of finished jobs.
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[LabelValues, float] = {} if label_names else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Increases the counter of the given label values.
+        """
+        if amount < 0:
+            raise ValueError(f"❌ Counter {self.name} can only increase.")
+        key = self._get_label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """
+    A value that can go up and down, e.g. the number of waiting events.
+    The value can also be read from a function whenever the metrics are collected.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        """
+        Sets the gauge to the value.
+        """
+        with self._lock:
+            self._value = value
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        """
+        Reads the value from the function on every collection (None goes back to the set value).
+        """
+        with self._lock:
+            self._function = function
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            function = self._function
+            value = self._value
+        if function is not None:
+            value = function()
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """
+    Counts observations (e.g. durations) in cumulative buckets, together with their sum and count.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, label_names)
+        self._upper_bounds = sorted(buckets) + [math.inf]
+        # Per label set: observations per bucket (not cumulative), then sum and count
+        self._bucket_counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Records an observation for the given label values.
+        """
+        key = self._get_label_values(labels)
+        bucket_index = next(
+            index for index, bound in enumerate(self._upper_bounds) if value <= bound
+        )
+        with self._lock:
+            if key not in self._bucket_counts:
+                self._bucket_counts[key] = [0] * len(self._upper_bounds)
+                self._sums[key] = 0.0
+            self._bucket_counts[key][bucket_index] += 1
+            self._sums[key] += value
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            series = [
+                (key, list(counts), self._sums[key]) for key, counts in self._bucket_counts.items()
+            ]
+        label_names = self.label_names + ("le",)
+        lines: list[str] = []
+        for key, counts, total in series:
+            cumulative_count = 0
+            for bound, count in zip(self._upper_bounds, counts):
+                cumulative_count += count
+                labels = _format_labels(label_names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative_count}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative_count}")
+        return lines
+
+
+class _MetricsRegistry:
+    """
+    All metrics of this process, in the order they were created.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        """
+        Adds a metric. Metric names must be unique.
+        """
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"❌ Metric {metric.name} is already registered.")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """
+        Returns all metrics in the Prometheus text format.
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        return "".join(line + "\n" for metric in metrics for line in metric.render())
+
+
+_registry = _MetricsRegistry()
+
+
+def render_metrics() -> str:
+    """
+    Returns all metrics of this process in the Prometheus text format.
+    """
+    return _registry.render()
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the metrics at /metrics.
+    """
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", _CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        # Scrapes happen every few seconds; keep them out of the log
+        pass
+
+
+class MetricsServer:
+    """
+    Serves the metrics over HTTP on the loopback interface, from a background thread.
+    """
+
+    def __init__(self, port: int):
+        self._port = port
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Starts serving. If the port cannot be used, logs a warning and runs without metrics.
+        """
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", self._port), _MetricsRequestHandler)
+        except OSError as e:
+            log.warning(f"⚠️ Could not serve metrics on port {self._port}: {e}")
+            return
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="MetricsServer", daemon=True
+        )
+        self._thread.start()
+        log.info(f"📈 Serving metrics at http://127.0.0.1:{self._port}/metrics")
+
+    def stop(self) -> None:
+        """
+        Stops serving and closes the port.
+        """
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+
+
+# === Toolkit metrics ===
+
+_DURATION_BUCKETS_IN_SEC = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+_MEMORY_BUCKETS_IN_BYTES = tuple(2**exponent for exponent in range(27, 36))  # 128 MB to 32 GB
+
+JOBS_STARTED = Counter("factorio_preview_jobs_started_total", "Jobs started.")
+JOBS_FINISHED = Counter(
+    "factorio_preview_jobs_finished_total",
+    "Jobs finished, by outcome (succeeded, failed, cancelled).",
+    ["outcome"],
+)
+JOB_DURATION = Histogram(
+    "factorio_preview_job_duration_seconds",
+    "Time from detecting the map string to the end of the job, by outcome.",
+    _DURATION_BUCKETS_IN_SEC,
+    ["outcome"],
+)
+STAGE_DURATION = Histogram(
+    "factorio_preview_stage_duration_seconds",
+    "Duration of completed job stages (setup, draft_render, render, postprocess, upload), "
+    "per planet where it applies.",
+    _DURATION_BUCKETS_IN_SEC,
+    ["stage", "planet"],
+)
+FACTORIO_CPU_TIME = Counter(
+    "factorio_preview_factorio_cpu_seconds_total",
+    "CPU time used by the Factorio processes of the preview generator (sampled).",
+)
+FACTORIO_PEAK_RSS = Histogram(
+    "factorio_preview_factorio_peak_rss_bytes",
+    "Peak resident memory of the largest Factorio process of each job (sampled).",
+    _MEMORY_BUCKETS_IN_BYTES,
+)
+EVENT_QUEUE_DEPTH = Gauge(
+    "factorio_preview_event_queue_depth",
+    "Map string and Factorio path events waiting for the controller.",
+)
+PROVIDER_POLLS = Counter(
+    "factorio_preview_provider_polls_total",
+    "Polls of the map string and Factorio path providers, by provider.",
+    ["provider"],
+)
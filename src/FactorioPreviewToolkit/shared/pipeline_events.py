@@ -0,0 +1,82 @@
+"""
+Line-based events exchanged between the preview generator, the controller and the uploader.
+
+The generator prints a marker line to stdout whenever the final image of a planet is ready.
+The controller picks these lines out of the generator output and forwards the planet names
+to the uploader's stdin, so uploading a planet overlaps with rendering the next one.
+
+If the controller serves metrics, it asks the generator and the uploader to report the duration
+of their stages the same way (through an environment variable, which worker processes inherit).
+Stage durations are also recorded in the run history, if the job has one.
+"""
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from src.FactorioPreviewToolkit.shared.run_history import (
+    is_recording_run_history,
+    record_stage_duration,
+)
+
+# Set to "1" to make subprocesses report stage durations
+REPORT_STAGE_DURATIONS_ENV = "FACTORIO_TOOLKIT_REPORT_STAGE_DURATIONS"
+
+_PLANET_READY_MARKER = "##planet-preview-ready## "
+_STAGE_DURATION_MARKER = "##stage-duration## "
+
+
+def announce_planet_ready(planet: str) -> None:
+    """
+    Tells the controller that the final preview image of the planet has been written.
+    """
+    print(f"{_PLANET_READY_MARKER}{planet}", flush=True)
+
+
+def parse_planet_ready(line: str) -> str | None:
+    """
+    Returns the planet name if the output line is a planet-ready event, otherwise None.
+    """
+    marker_index = line.find(_PLANET_READY_MARKER)
+    if marker_index < 0:
+        return None
+    return line[marker_index + len(_PLANET_READY_MARKER) :].strip() or None
+
+
+@contextmanager
+def report_stage_duration(stage: str, planet: str = "") -> Iterator[None]:
+    """
+    Tells the controller how long the enclosed stage took and records it in the run history,
+    if the stage completes and reporting or the run history is enabled.
+    """
+    report_to_controller = os.environ.get(REPORT_STAGE_DURATIONS_ENV) == "1"
+    if not report_to_controller and not is_recording_run_history():
+        yield
+        return
+    started_at = time.perf_counter()
+    yield
+    duration_in_sec = time.perf_counter() - started_at
+    if report_to_controller:
+        print(
+            f"{_STAGE_DURATION_MARKER}{stage} {duration_in_sec:.6f} {planet}".rstrip(), flush=True
+        )
+    record_stage_duration(stage, duration_in_sec, planet)
+
+
+def parse_stage_duration(line: str) -> tuple[str, float, str] | None:
+    """
+    Returns (stage, duration in seconds, planet) if the output line is a stage-duration event,
+    otherwise None. The planet is empty for stages that are not about a single planet.
+    """
+    marker_index = line.find(_STAGE_DURATION_MARKER)
+    if marker_index < 0:
+        return None
+    fields = line[marker_index + len(_STAGE_DURATION_MARKER) :].split(maxsplit=2)
+    if len(fields) < 2:
+        return None
+    try:
+        duration_in_sec = float(fields[1])
+    except ValueError:
+        return None
+    return fields[0], duration_in_sec, fields[2].strip() if len(fields) > 2 else ""
@@ -0,0 +1,176 @@
+import atexit
+import base64
+import json
+import os
+import secrets
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, cast
+
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+_RC_URL_ENV = "FACTORIO_TOOLKIT_RCLONE_RC_URL"
+_RC_USER_ENV = "FACTORIO_TOOLKIT_RCLONE_RC_USER"
+_RC_PASS_ENV = "FACTORIO_TOOLKIT_RCLONE_RC_PASS"
+
+
+class RcloneDaemonError(RuntimeError):
+    """
+    Raised when the rclone daemon cannot be reached or a remote-control call fails.
+    """
+
+
+def _find_free_local_port() -> int:
+    """
+    Asks the OS for a free TCP port on the loopback interface.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return cast(int, probe.getsockname()[1])
+
+
+class RcloneDaemon:
+    """
+    Runs `rclone rcd` and talks to its remote-control HTTP API.
+
+    One daemon serves a whole toolkit session, so connections and authentication to the remote
+    are reused between uploads, and several calls can be in flight at once. The daemon only
+    listens on the loopback interface and requires a random user and password.
+    Subprocesses find a running daemon through environment variables (see get_client_env).
+    """
+
+    def __init__(
+        self, rclone_executable: Path | None, url: str = "", user: str = "", password: str = ""
+    ):
+        """
+        Initializes the daemon handle. Without a URL, the daemon has to be started first.
+        """
+        self._rclone_executable = rclone_executable
+        self._url = url
+        self._user = user
+        self._password = password
+        self._process: subprocess.Popen[bytes] | None = None
+
+    @classmethod
+    def from_environment(cls) -> "RcloneDaemon | None":
+        """
+        Returns a handle to the daemon announced in the environment, if there is one.
+        """
+        url = os.environ.get(_RC_URL_ENV)
+        if not url:
+            return None
+        return cls(None, url, os.environ.get(_RC_USER_ENV, ""), os.environ.get(_RC_PASS_ENV, ""))
+
+    def get_client_env(self) -> dict[str, str]:
+        """
+        Returns the environment variables that let subprocesses use this daemon.
+        """
+        return {_RC_URL_ENV: self._url, _RC_USER_ENV: self._user, _RC_PASS_ENV: self._password}
+
+    def start(self, timeout_in_sec: float = 15) -> None:
+        """
+        Starts the daemon and waits until it answers. The daemon is stopped at interpreter exit
+        at the latest.
+        """
+        assert self._rclone_executable is not None, "Only an owned daemon can be started."
+        port = _find_free_local_port()
+        self._url = f"http://127.0.0.1:{port}/"
+        self._user = "toolkit"
+        self._password = secrets.token_urlsafe(24)
+
+        # Credentials are passed via environment, so they do not show up in process listings
+        self._process = subprocess.Popen(
+            [
+                str(self._rclone_executable),
+                "rcd",
+                f"--rc-addr=127.0.0.1:{port}",
+                "--log-level=ERROR",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            env={**os.environ, "RCLONE_RC_USER": self._user, "RCLONE_RC_PASS": self._password},
+        )
+
+        atexit.register(self.stop)
+
+        deadline = time.monotonic() + timeout_in_sec
+        while not self.is_healthy():
+            if self._process.poll() is not None:
+                raise RcloneDaemonError(
+                    f"❌ rclone rcd exited with code {self._process.returncode} during startup."
+                )
+            if time.monotonic() > deadline:
+                self.stop()
+                raise RcloneDaemonError("❌ rclone rcd did not become ready in time.")
+            time.sleep(0.1)
+        log.info(f"✅ rclone daemon listening on {self._url}")
+
+    def stop(self) -> None:
+        """
+        Stops the daemon if this handle started it.
+        """
+        if self._process is None:
+            return
+        atexit.unregister(self.stop)
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def is_healthy(self) -> bool:
+        """
+        Returns True if the daemon answers a no-op call.
+        """
+        if not self._url:
+            return False
+        try:
+            self.call("rc/noop", {}, timeout_in_sec=2)
+            return True
+        except RcloneDaemonError:
+            return False
+
+    def ensure_running(self) -> None:
+        """
+        Starts the daemon if it has not been started yet, and restarts it if it died or
+        stopped answering.
+        """
+        if self._process is None:
+            self.start()
+            return
+        if self._process.poll() is None and self.is_healthy():
+            return
+        log.warning("⚠️ rclone daemon is not responding. Restarting it...")
+        self.stop()
+        self.start()
+
+    def call(
+        self, method: str, params: dict[str, Any], timeout_in_sec: float = 600
+    ) -> dict[str, Any]:
+        """
+        Calls a remote-control method (e.g. 'operations/copyfile') and returns its JSON result.
+        """
+        credentials = base64.b64encode(f"{self._user}:{self._password}".encode()).decode()
+        request = urllib.request.Request(
+            self._url + method,
+            data=json.dumps(params).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": f"Basic {credentials}"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout_in_sec) as response:
+                return cast(dict[str, Any], json.loads(response.read() or b"{}"))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise RcloneDaemonError(f"❌ rclone '{method}' failed: {message}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise RcloneDaemonError(f"❌ rclone daemon unreachable for '{method}': {e}") from e
@@ -0,0 +1,172 @@
+"""
+Run history: one row per job in an SQLite database (logs/run_history.sqlite3).
+
+The controller adds the job when it starts and records its status when it ends. The generator,
+the uploader and the post-processing workers add what only they know (seed, Factorio version,
+stage durations, output sizes); they find the job through an environment variable.
+The database runs in WAL mode, so these processes write at the same time without blocking each
+other or a reader. Every write is a short transaction of its own.
+
+Query it with: python -m src.FactorioPreviewToolkit.run_history
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any
+
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+# Job that subprocesses record to
+RUN_HISTORY_JOB_ENV = "FACTORIO_TOOLKIT_RUN_HISTORY_JOB"
+
+_BUSY_TIMEOUT_IN_SEC = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    map_string_hash TEXT NOT NULL,
+    preview_size INTEGER NOT NULL,
+    seed INTEGER,
+    factorio_version TEXT,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stage_durations (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    planet TEXT NOT NULL,
+    duration_in_sec REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stage_durations_by_job ON stage_durations (job_id);
+CREATE TABLE IF NOT EXISTS planet_outputs (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id) ON DELETE CASCADE,
+    planet TEXT NOT NULL,
+    output_size_in_bytes INTEGER NOT NULL,
+    PRIMARY KEY (job_id, planet)
+);
+"""
+
+
+@contextmanager
+def open_run_history(path: Path | None = None) -> Iterator[sqlite3.Connection]:
+    """
+    Opens the run history database in WAL mode, creating it if needed.
+    The connection commits when the block completes and is closed afterwards.
+    """
+    database_path = path or constants.RUN_HISTORY_FILEPATH
+    database_path.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(database_path, timeout=_BUSY_TIMEOUT_IN_SEC)) as connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(_SCHEMA)
+        with connection:
+            yield connection
+
+
+def _write(statement: str, parameters: tuple[Any, ...]) -> None:
+    """
+    Runs a single write. Failures are logged, as the history must never break a job.
+    """
+    try:
+        with open_run_history() as connection:
+            connection.execute(statement, parameters)
+    except sqlite3.Error as e:
+        log.warning(f"⚠️ Failed to write the run history: {e}")
+
+
+def _get_job_id() -> str | None:
+    """
+    Returns the job this process records to, if any.
+    """
+    return os.environ.get(RUN_HISTORY_JOB_ENV) or None
+
+
+def is_recording_run_history() -> bool:
+    """
+    Returns True if this process records to a job of the run history.
+    """
+    return _get_job_id() is not None
+
+
+def start_job(map_string: str, preview_size: int, started_at: float) -> str:
+    """
+    Adds a running job and returns its ID.
+    """
+    job_id = uuid.uuid4().hex
+    map_string_hash = hashlib.sha256(map_string.encode("utf-8")).hexdigest()
+    _write(
+        "INSERT INTO jobs (job_id, started_at, map_string_hash, preview_size, status) "
+        "VALUES (?, ?, ?, ?, 'running')",
+        (job_id, started_at, map_string_hash, preview_size),
+    )
+    return job_id
+
+
+def get_job_env(job_id: str) -> dict[str, str]:
+    """
+    Returns the environment variables that make subprocesses record to the job.
+    """
+    return {RUN_HISTORY_JOB_ENV: job_id}
+
+
+def finish_job(job_id: str, status: str) -> None:
+    """
+    Records the end and the final status (succeeded, failed, cancelled) of a job.
+    """
+    _write(
+        "UPDATE jobs SET finished_at = ?, status = ? WHERE job_id = ?",
+        (time.time(), status, job_id),
+    )
+
+
+def record_seed(seed: int) -> None:
+    """
+    Records the map seed of the current job.
+    """
+    job_id = _get_job_id()
+    if job_id is not None:
+        _write("UPDATE jobs SET seed = ? WHERE job_id = ?", (seed, job_id))
+
+
+def record_factorio_version(version: str) -> None:
+    """
+    Records the Factorio version that renders the current job.
+    """
+    job_id = _get_job_id()
+    if job_id is not None:
+        _write("UPDATE jobs SET factorio_version = ? WHERE job_id = ?", (version, job_id))
+
+
+def record_stage_duration(stage: str, duration_in_sec: float, planet: str = "") -> None:
+    """
+    Records the duration of a completed stage of the current job.
+    """
+    job_id = _get_job_id()
+    if job_id is not None:
+        _write(
+            "INSERT INTO stage_durations (job_id, stage, planet, duration_in_sec) "
+            "VALUES (?, ?, ?, ?)",
+            (job_id, stage, planet, duration_in_sec),
+        )
+
+
+def record_output_size(planet: str, size_in_bytes: int) -> None:
+    """
+    Records the size of the uploaded preview of a planet of the current job.
+    """
+    job_id = _get_job_id()
+    if job_id is not None:
+        _write(
+            "INSERT OR REPLACE INTO planet_outputs (job_id, planet, output_size_in_bytes) "
+            "VALUES (?, ?, ?)",
+            (job_id, planet, size_in_bytes),
+        )
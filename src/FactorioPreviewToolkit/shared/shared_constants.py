@@ -1,5 +1,18 @@
+import os
+from pathlib import Path
+
 from src.FactorioPreviewToolkit.shared.utils import get_project_root
 
+# Points the toolkit (and every subprocess it starts) to another config file, e.g. for benchmarks.
+CONFIG_FILE_ENV = "FACTORIO_TOOLKIT_CONFIG_FILE"
+# Point a process to other folders for its working files and its generated previews,
+# e.g. so the parallel workers of a batch never share them.
+TEMP_DIR_ENV = "FACTORIO_TOOLKIT_TEMP_DIR"
+PREVIEWS_DIR_ENV = "FACTORIO_TOOLKIT_PREVIEWS_DIR"
+# Points a process to the mods folder of another working folder, so the Factorio runs of every
+# worker use the mods installed for the toolkit.
+MODS_DIR_ENV = "FACTORIO_TOOLKIT_MODS_DIR"
+
 
 class _Constants:
     """
@@ -9,22 +22,41 @@ class _Constants:
 
     # === Project & Config ===
     BASE_PROJECT_DIR = get_project_root()
-    PREVIEW_TOOLKIT_CONFIG_FILEPATH = BASE_PROJECT_DIR / "config.ini"
+    PREVIEW_TOOLKIT_CONFIG_FILEPATH = Path(
+        os.environ.get(CONFIG_FILE_ENV) or BASE_PROJECT_DIR / "config.ini"
+    )
 
     # === Logging & Assets ===
     LOGS_DIR = BASE_PROJECT_DIR / "logs"
+    JOB_TRACES_DIR = LOGS_DIR / "traces"
+    RUN_HISTORY_FILEPATH = LOGS_DIR / "run_history.sqlite3"
     BASE_ASSETS_DIR = BASE_PROJECT_DIR / "assets"
 
     # === Output Folder for Generated Previews ===
-    PREVIEWS_OUTPUT_DIR = BASE_PROJECT_DIR / "previews"
+    PREVIEWS_OUTPUT_DIR = Path(os.environ.get(PREVIEWS_DIR_ENV) or BASE_PROJECT_DIR / "previews")
     PREVIEW_LINKS_FILEPATH = PREVIEWS_OUTPUT_DIR / "remote_viewer_config.txt"
 
     # === Temporary / Working Directories ===
-    BASE_TEMP_DIR = BASE_PROJECT_DIR / "temp_files"
+    BASE_TEMP_DIR = Path(os.environ.get(TEMP_DIR_ENV) or BASE_PROJECT_DIR / "temp_files")
     FACTORIO_WRITE_DATA_DIR = BASE_TEMP_DIR / "data"
+    # Shared by every Factorio run (setup, render sandboxes, batch workers) via --mod-directory
+    FACTORIO_MODS_DIR = Path(os.environ.get(MODS_DIR_ENV) or FACTORIO_WRITE_DATA_DIR / "mods")
     SCRIPT_OUTPUT_DIR = FACTORIO_WRITE_DATA_DIR / "script-output"
     MAP_GEN_SETTINGS_FILEPATH = BASE_TEMP_DIR / "map-gen-settings.json"
 
+    # === Parallel Rendering ===
+    FACTORIO_SANDBOXES_DIR = BASE_TEMP_DIR / "sandboxes"
+    RENDERED_PREVIEWS_STAGING_DIR = BASE_TEMP_DIR / "rendered-previews"
+
+    # === Persistent Caches ===
+    CACHE_DIR = BASE_TEMP_DIR / "cache"
+    FACTORIO_INSTALL_CACHE_FILEPATH = CACHE_DIR / "factorio_installs.json"
+    SAVE_TEMPLATES_DIR = CACHE_DIR / "save-templates"
+    PREVIEW_CACHE_DIR = CACHE_DIR / "previews"
+    SETUP_CACHE_DIR = CACHE_DIR / "setups"
+    UPLOAD_MANIFEST_FILEPATH = CACHE_DIR / "upload_manifest.json"
+    RCLONE_LINK_CACHE_FILEPATH = CACHE_DIR / "rclone_links.json"
+
     # === Dummy Save for Settings Generation ===
     DUMMY_SAVE_TO_EXECUTE_LUA_CODE_PATH = BASE_TEMP_DIR / "dummy-save-to-create-map-gen-settings"
     CONTROL_LUA_FILEPATH = DUMMY_SAVE_TO_EXECUTE_LUA_CODE_PATH / "control.lua"
@@ -1,10 +1,17 @@
+import json
 import logging
+import os
 import sys
 import threading
+import time
 from collections.abc import Iterator
 from contextlib import contextmanager
 from io import TextIOWrapper
-from typing import TextIO
+from pathlib import Path
+from typing import Any, TextIO
+
+# Trace file (JSON lines of Chrome trace events) that spans of subprocesses are appended to
+TRACE_FILE_ENV = "FACTORIO_TOOLKIT_TRACE_FILE"
 
 
 class NestingState(threading.local):
@@ -19,6 +26,154 @@ class NestingState(threading.local):
 _nesting = NestingState()
 
 
+class _TraceState:
+    """
+    Process-wide tracing state: the active trace file and the metadata already written to it.
+    """
+
+    lock = threading.Lock()
+    trace_file: Path | None = None
+    process_name: str | None = None
+    described: set[tuple[Path, int | None]] = set()
+
+
+_trace = _TraceState()
+
+
+def set_trace_file(path: Path | None) -> None:
+    """
+    Sets the trace file that spans of this process are recorded to (None stops recording).
+    Takes precedence over the trace file passed in through the environment.
+    """
+    with _trace.lock:
+        _trace.trace_file = path
+
+
+def get_trace_file() -> Path | None:
+    """
+    Returns the trace file spans are currently recorded to, if any.
+    """
+    if _trace.trace_file is not None:
+        return _trace.trace_file
+    env_path = os.environ.get(TRACE_FILE_ENV)
+    return Path(env_path) if env_path else None
+
+
+def set_trace_process_name(name: str) -> None:
+    """
+    Sets the name this process is shown with in trace viewers.
+    """
+    _trace.process_name = name
+
+
+def _to_trace_time(timestamp: float) -> int:
+    """
+    Converts a time.time() timestamp to trace time (microseconds). Wall-clock time is used,
+    so the spans of all processes share one time line.
+    """
+    return int(timestamp * 1_000_000)
+
+
+def _describe_process_and_thread(trace_file: Path, pid: int, tid: int) -> list[dict[str, Any]]:
+    """
+    Returns the metadata events that name this process and thread, unless they were already
+    written to the trace file. Must be called with the trace lock held.
+    """
+    events: list[dict[str, Any]] = []
+    if _trace.process_name and (trace_file, None) not in _trace.described:
+        _trace.described.add((trace_file, None))
+        events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": _trace.process_name},
+            }
+        )
+    if (trace_file, tid) not in _trace.described:
+        _trace.described.add((trace_file, tid))
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": threading.current_thread().name},
+            }
+        )
+    return events
+
+
+def _record_trace_event(trace_file: Path, event: dict[str, Any]) -> None:
+    """
+    Appends an event to the trace file. Each write is a single append of whole lines,
+    so several processes can record to the same file.
+    """
+    pid = os.getpid()
+    tid = threading.get_native_id()
+    with _trace.lock:
+        events = _describe_process_and_thread(trace_file, pid, tid)
+        events.append({**event, "pid": pid, "tid": tid})
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode("utf-8")
+        try:
+            fd = os.open(trace_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except OSError:
+            # Tracing must never break the traced work
+            pass
+
+
+@contextmanager
+def trace_span(
+    name: str, category: str = "section", started_at: float | None = None
+) -> Iterator[None]:
+    """
+    Records the enclosed block as a span (start, duration, process and thread) to the active
+    trace file. Does nothing if no trace file was active when the span started.
+    A start time (time.time()) can be given for spans that began before the block.
+    """
+    trace_file = get_trace_file()
+    if trace_file is None:
+        yield
+        return
+
+    start = started_at if started_at is not None else time.time()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        event: dict[str, Any] = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": _to_trace_time(start),
+            "dur": _to_trace_time(time.time()) - _to_trace_time(start),
+        }
+        if failed:
+            event["args"] = {"failed": True}
+        _record_trace_event(trace_file, event)
+
+
+def trace_instant(name: str, category: str = "event", timestamp: float | None = None) -> None:
+    """
+    Records a point in time (e.g. a detected map string) to the active trace file.
+    """
+    trace_file = get_trace_file()
+    if trace_file is None:
+        return
+    event_time = timestamp if timestamp is not None else time.time()
+    _record_trace_event(
+        trace_file,
+        {"name": name, "cat": category, "ph": "i", "s": "p", "ts": _to_trace_time(event_time)},
+    )
+
+
 def get_logging_indent() -> str:
     """
     Returns the current indentation string based on nesting level.
@@ -28,15 +183,17 @@ def get_logging_indent() -> str:
 
 
 @contextmanager
-def log_section(title: str) -> Iterator[None]:
+def log_section(title: str, category: str = "section") -> Iterator[None]:
     """
     Context manager for logging a section with increased indentation.
     Restores indentation level after the block ends.
+    The section is also recorded as a trace span if tracing is active.
     """
     log.info(title)
     _nesting.level += 1
     try:
-        yield
+        with trace_span(title, category):
+            yield
     finally:
         _nesting.level = max(0, _nesting.level - 1)
 
@@ -6,20 +6,57 @@ the terminal and a timestamped log file. This ensures all output
 (including print(), logging, and tracebacks) is visible in the console
 and saved to a unique file per run.
 
+Writes only enqueue the text. A background thread writes it out in batches and flushes
+both outputs after a short delay, when many writes have piled up, or right away for
+error output. The queue is bounded: when it is full, writers wait briefly (backpressure)
+and drop their text if it is still full, so a flood of output never stalls the toolkit.
+Once closing starts, nothing is queued anymore: later writes wait for the writer thread to
+finish and then go directly to the outputs. The writer thread closes the log file itself.
+
 Also includes optional automatic cleanup to limit the number of logs.
 """
 
+import atexit
 import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from io import TextIOWrapper
 from pathlib import Path
 from typing import TextIO, cast
 
+_MAX_QUEUED_WRITES = 10_000
+_MAX_WAIT_WHEN_FULL_IN_SEC = 0.5
+_FLUSH_INTERVAL_IN_SEC = 0.05
+_FLUSH_SIZE_IN_WRITES = 1_000
+_CLOSE_TIMEOUT_IN_SEC = 5
+_ERROR_MARKERS = (" ERROR:", " CRITICAL:", "Traceback (most recent call last)")
+
+
+def _is_error_output(message: str) -> bool:
+    """
+    Returns True if the text looks like an error-level log record or a traceback.
+    """
+    for marker in _ERROR_MARKERS:
+        if marker in message:
+            return True
+    return False
+
+
+class _DrainRequest:
+    """
+    Queue item that asks the writer thread to write out everything before it and report back.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
 
 class TeeStream:
     """
     A stream that writes to both the original terminal (stdout or stderr)
-    and a specified log file. Ensures immediate, unbuffered output to both.
+    and a specified log file, batched on a background writer thread.
     """
 
     def __init__(self, log_file: Path, original: TextIO):
@@ -31,19 +68,156 @@ class TeeStream:
         self.log = log_file.open("w", encoding="utf-8")
         self.encoding = self.original.encoding
 
+        self.dropped_count = 0
+        self.backpressure_count = 0
+        self._counter_lock = threading.Lock()
+        # Guards queueing against closing, so nothing is queued after the stop marker
+        self._state_lock = threading.Lock()
+        # Keeps direct writes during closing from interleaving with the writer thread
+        self._output_lock = threading.Lock()
+        self._queue: deque[str | _DrainRequest | None] = deque()
+        self._wake_writer = threading.Event()
+        self._closing = False
+        self._writer = threading.Thread(target=self._run_writer, name="LogWriter", daemon=True)
+        self._writer.start()
+
     def write(self, message: str) -> int:
-        self.original.write(message)
-        self.original.flush()
-        self.log.write(message)
-        self.log.flush()
+        """
+        Enqueues the text for the writer thread. Error output is flushed right away.
+        Once closing started, writes the text directly instead.
+        """
+        if not self._closing:
+            if len(self._queue) >= _MAX_QUEUED_WRITES and not self._wait_for_space():
+                return len(message)
+
+            with self._state_lock:
+                queued = not self._closing
+                if queued:
+                    self._queue.append(message)
+            if queued:
+                if len(self._queue) >= _FLUSH_SIZE_IN_WRITES or _is_error_output(message):
+                    self._wake_writer.set()
+                return len(message)
+
+        self._write_through(message)
         return len(message)
 
     def flush(self) -> None:
-        self.original.flush()
-        self.log.flush()
+        """
+        Does nothing: the writer thread flushes on its own. Logging handlers call this after
+        every record, so waiting here would undo the batching. Use drain() to wait for output.
+        """
+
+    def drain(self, timeout_in_sec: float = 5) -> None:
+        """
+        Waits until everything written so far has reached the terminal and the log file.
+        """
+        request = _DrainRequest()
+        with self._state_lock:
+            if self._closing:
+                return
+            self._queue.append(request)
+        self._wake_writer.set()
+        request.done.wait(timeout_in_sec)
 
     def close(self) -> None:
-        self.log.close()
+        """
+        Stops queueing, then waits for the writer thread to write out all queued text and
+        close the log file. Later writes go directly to the terminal.
+        """
+        with self._state_lock:
+            if self._closing:
+                return
+            self._closing = True
+            self._queue.append(None)
+        self._wake_writer.set()
+        self._writer.join(timeout=_CLOSE_TIMEOUT_IN_SEC)
+
+    def _write_through(self, message: str) -> None:
+        """
+        Writes text that arrived after closing started, once the writer thread has written out
+        everything queued before it.
+        """
+        if threading.current_thread() is not self._writer:
+            self._writer.join(timeout=_CLOSE_TIMEOUT_IN_SEC)
+        self._write_out([message])
+
+    def _wait_for_space(self) -> bool:
+        """
+        Wakes the writer and waits briefly for it to catch up. Counts the write as dropped
+        and returns False if the queue is still full afterwards.
+        """
+        with self._counter_lock:
+            self.backpressure_count += 1
+        self._wake_writer.set()
+        deadline = time.monotonic() + _MAX_WAIT_WHEN_FULL_IN_SEC
+        while len(self._queue) >= _MAX_QUEUED_WRITES:
+            if time.monotonic() >= deadline:
+                with self._counter_lock:
+                    self.dropped_count += 1
+                return False
+            time.sleep(0.005)
+        return True
+
+    def _write_out(self, messages: list[str]) -> None:
+        """
+        Writes a batch to both outputs and flushes them.
+        """
+        text = "".join(messages)
+        with self._output_lock:
+            self.original.write(text)
+            self.original.flush()
+            if not self.log.closed:
+                self.log.write(text)
+                self.log.flush()
+
+    def _close_log(self) -> None:
+        """
+        Reports dropped and delayed writes, then closes the log file. Runs on the writer thread
+        once it has written out everything, so the file is never closed while it writes.
+        """
+        if self.dropped_count or self.backpressure_count:
+            self._write_out(
+                [
+                    f"⚠️ Log writer: {self.dropped_count} writes dropped, "
+                    f"{self.backpressure_count} writes had to wait for a full queue.\n"
+                ]
+            )
+        with self._output_lock:
+            self.log.close()
+
+    def _run_writer(self) -> None:
+        """
+        Writes out the queued text every flush interval, or earlier when woken for error
+        output, a long queue, a drain request or shutdown.
+        """
+        while True:
+            self._wake_writer.wait(_FLUSH_INTERVAL_IN_SEC)
+            self._wake_writer.clear()
+
+            pending: list[str] = []
+            drain_requests: list[_DrainRequest] = []
+            stop = False
+            while self._queue:
+                item = self._queue.popleft()
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, _DrainRequest):
+                    drain_requests.append(item)
+                else:
+                    pending.append(item)
+
+            if pending:
+                self._write_out(pending)
+            for request in drain_requests:
+                request.done.set()
+            if stop:
+                self._close_log()
+                return
+
+
+_active_tee: TeeStream | None = None
 
 
 def enable_tee_logging(log_dir: Path, keep_last_n: int = 10) -> Path:
@@ -51,7 +225,10 @@ def enable_tee_logging(log_dir: Path, keep_last_n: int = 10) -> Path:
     Enables tee logging by replacing sys.stdout and sys.stderr with a TeeStream.
     A timestamped log file will be created in the given directory, and older
     logs will be deleted to keep only the latest N.
+    All queued output is written out at interpreter exit at the latest.
     """
+    global _active_tee
+
     log_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     log_path = log_dir / f"run_{timestamp}.log"
@@ -68,5 +245,15 @@ def enable_tee_logging(log_dir: Path, keep_last_n: int = 10) -> Path:
     tee = TeeStream(log_path, sys.__stdout__)
     sys.stdout = cast(TextIO, tee)
     sys.stderr = cast(TextIO, tee)
+    _active_tee = tee
+    atexit.register(tee.close)
 
     return log_path
+
+
+def flush_tee_logging() -> None:
+    """
+    Waits until all output written so far has reached the terminal and the log file.
+    """
+    if _active_tee is not None:
+        _active_tee.drain()
@@ -1,15 +1,35 @@
+import json
+import os
 import platform
 import re
+import shutil
 import sys
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
+
+from src.FactorioPreviewToolkit.shared.map_exchange_string import (
+    MapExchangeStringError,
+    decode_map_exchange_string,
+)
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+# ioctl request number of FICLONE on Linux (copy-on-write clone of a whole file)
+_FICLONE = 0x40049409
 
 
 def is_valid_map_string(s: str) -> bool:
     """
     Checks if the string matches the map exchange format: >>>eN...<<<
+    and that its content can actually be decoded with a matching checksum, so corrupted strings are rejected
+    before any Factorio process is launched.
     """
-    return bool(re.match(r"^>>>eN[\sA-Za-z0-9+/=]+<<<$", s.strip()))
+    if not re.match(r"^>>>eN[\sA-Za-z0-9+/=]+<<<$", s.strip()):
+        return False
+    try:
+        decode_map_exchange_string(s)
+    except MapExchangeStringError:
+        return False
+    return True
 
 
 def sanitize_map_string(raw: str) -> str | None:
@@ -78,3 +98,82 @@ def get_supported_architecture() -> Literal["intel_amd64", "arm64", "unsupported
     if arch_raw in ("arm64", "aarch64"):
         return "arm64"
     return "unsupported"
+
+
+def _try_reflink(source: Path, target: Path) -> bool:
+    """
+    Tries to create a copy-on-write clone of the source file (Linux FICLONE).
+    Returns False if the platform or filesystem does not support it.
+    """
+    if sys.platform != "linux":
+        return False
+    import fcntl
+
+    try:
+        with source.open("rb") as src, target.open("wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        shutil.copystat(source, target)
+        return True
+    except OSError:
+        target.unlink(missing_ok=True)
+        return False
+
+
+def clone_file(
+    source: Path, target: Path, allow_hardlink: bool = True
+) -> Literal["reflink", "hardlink", "copy"]:
+    """
+    Copies a file as cheaply as possible: reflink first, then a hardlink (if allowed),
+    then a regular copy. Hardlinks share the data with the source, so they must only be
+    used if neither file is ever modified in place. Returns the method that was used.
+    """
+    target.unlink(missing_ok=True)
+    if _try_reflink(source, target):
+        return "reflink"
+    if allow_hardlink:
+        try:
+            os.link(source, target)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(source, target)
+    return "copy"
+
+
+def write_file_atomically(path: Path, data: bytes) -> None:
+    """
+    Writes the data to a temporary file next to the target and moves it into place,
+    so readers never see a partially written file. Other hardlinks to the old file keep
+    their content, since the new data lives in a new file.
+    """
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def read_json_file(path: Path, description: str) -> dict[str, Any]:
+    """
+    Reads a JSON object from a cache or manifest file. A missing or corrupt file counts as empty;
+    a corrupt one is logged with its description.
+    """
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning(f"⚠️ Ignoring unreadable {description}: {e}")
+    return {}
+
+
+def write_json_file_atomically(path: Path, data: dict[str, Any]) -> None:
+    """
+    Writes a JSON object with write_file_atomically, creating the parent folder if needed.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_file_atomically(path, json.dumps(data, indent=2).encode("utf-8"))
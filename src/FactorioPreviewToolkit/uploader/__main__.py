@@ -1,17 +1,57 @@
+"""
+Main entry point for uploading the generated previews.
+
+In streaming mode, planet names are read line by line from stdin, and each planet is
+uploaded as soon as its name arrives.
+"""
+
+import argparse
+import sys
+from typing import Sequence
+
 from src.FactorioPreviewToolkit.shared.error_popup import show_error_popup
-from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.shared.structured_logger import (
+    log,
+    log_section,
+    set_trace_process_name,
+)
 from src.FactorioPreviewToolkit.uploader.factory import get_uploader
 
 
-def main() -> None:
+def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command-line arguments.
+    """
+    raw_args = argv if argv is not None else sys.argv[1:]
+
+    if "--uploader-mode" in raw_args:
+        uploader_index = raw_args.index("--uploader-mode")
+        raw_args = raw_args[uploader_index + 1 :]
+
+    parser = argparse.ArgumentParser(description="Factorio map preview uploader")
+    parser.add_argument("factorio_path", nargs="?")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Read ready planet names from stdin and upload each one as soon as it arrives.",
+    )
+    return parser.parse_args(raw_args)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
     """
     Entry point for running the uploader standalone. Selects the uploader and starts the upload.
     Handles errors and ensures clean logging exit.
     """
+    set_trace_process_name("Uploader")
     try:
-        with log_section("🚀 Uploader started."):
+        with log_section("🚀 Uploader started.", "stage"):
+            arguments = parse_arguments(argv)
             uploader = get_uploader()
-            uploader.upload_all()
+            if arguments.streaming:
+                uploader.upload_streaming(sys.stdin)
+            else:
+                uploader.upload_all()
             log.info("✅ Uploader finished successfully.")
     except Exception as e:
         log.exception("❌ Uploader failed with an exception.")
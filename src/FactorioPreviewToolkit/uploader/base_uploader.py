@@ -1,20 +1,41 @@
+import hashlib
 import json
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import cast
-
-from PIL import PngImagePlugin, Image
-from PIL.Image import ADAPTIVE
+from threading import Lock
+from typing import Any, cast
 
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.pipeline_events import report_stage_duration
+from src.FactorioPreviewToolkit.shared.run_history import record_output_size
 from src.FactorioPreviewToolkit.shared.shared_constants import constants
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.shared.utils import write_file_atomically
+from src.FactorioPreviewToolkit.uploader.png_postprocessing import (
+    PostprocessedPreview,
+    PostprocessingOptions,
+    postprocess_preview_pngs,
+)
+from src.FactorioPreviewToolkit.uploader.tile_pyramid import (
+    get_tile_path_template,
+    get_tile_pyramid_dir,
+    load_tile_manifest,
+)
+from src.FactorioPreviewToolkit.uploader.upload_manifest import UploadManifest
 
 
-def _write_viewer_config_js(planet_image_links: dict[str, str], planet_names_link: str) -> None:
+def _write_viewer_config_js(
+    planet_image_links: dict[str, str],
+    planet_names_link: str,
+    planet_tile_sources: dict[str, dict[str, Any]] | None = None,
+) -> None:
     """
     Writes a JavaScript file that defines the viewerConfig object.
-    This includes preview image URLs and a reference to the planet names JS file.
+    This includes preview image URLs and a reference to the planet names JS file,
+    plus the tile pyramids of the planets if there are any.
     """
     from src.FactorioPreviewToolkit.shared.shared_constants import constants
 
@@ -27,6 +48,11 @@ def _write_viewer_config_js(planet_image_links: dict[str, str], planet_names_lin
                 for planet, url in planet_image_links.items():
                     f.write(f'    {planet}: "{url}",\n')
                 f.write("  },\n")
+                if planet_tile_sources:
+                    f.write("  planetTileSources: {\n")
+                    for planet, tile_source in planet_tile_sources.items():
+                        f.write(f"    {planet}: {json.dumps(tile_source)},\n")
+                    f.write("  },\n")
                 f.write(f'  planetNamesSource: "{planet_names_link}"\n')
                 f.write("};\n")
             log.info(f"✅ viewerConfig.js written to: {output_path}")
@@ -52,71 +78,251 @@ def _load_planet_names() -> list[str]:
             raise
 
 
-def _inject_upload_timestamp_into_planet_names_file() -> None:
+def _are_tile_pyramids_enabled() -> bool:
     """
-    Adds or updates an '' field in the planet names JSON file.
+    Returns True if tile pyramids should be built and uploaded.
     """
-    path = constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH
-    with path.open("r+", encoding="utf-8") as f:
-        data = json.load(f)
-        data["time"] = datetime.now(timezone.utc).isoformat()
-        f.seek(0)
-        json.dump(data, f, indent=2)
-        f.truncate()
+    return bool(Config.get().tile_base_url)
+
+
+def _get_postprocessing_options(stamp_upload_time: bool) -> PostprocessingOptions:
+    """
+    Returns the post-processing options of the configured upload format.
+    """
+    config = Config.get()
+    return PostprocessingOptions(
+        image_format=config.preview_image_format,
+        quality=config.preview_image_quality,
+        build_tiles=_are_tile_pyramids_enabled(),
+        stamp_upload_time=stamp_upload_time,
+    )
 
 
-def _add_upload_timestamp_to_png(path: Path) -> None:
+def _get_preview_image_path(planet: str) -> Path:
     """
-    Adds or updates a timestamp in the metadata of a PNG file.
+    Returns the path of the rendered preview image of a planet.
     """
-    image = Image.open(path)
-    metadata = PngImagePlugin.PngInfo()
-    metadata.add_text("", datetime.now(timezone.utc).isoformat())
+    return constants.PREVIEWS_OUTPUT_DIR / f"{planet}.png"
 
-    image.save(path, "PNG", pnginfo=metadata)
 
+# Download link and tile source (None without tile pyramids) of an uploaded planet
+_PlanetLinks = tuple[str, dict[str, Any] | None]
 
-def _optimize_png(path: Path) -> None:
+
+class _UploadBatch:
     """
-    Re-encodes a PNG image with maximum lossless compression.
+    Uploads of one run on a bounded thread pool. Results are collected in planet list order,
+    since the viewer shows tabs in config order, no matter in which order the uploads finish.
+    Optionally rewrites the viewer config with all links so far whenever an upload finishes.
     """
-    with Image.open(path) as img:
-        if img.mode != "P":
-            img = img.convert("P", palette=ADAPTIVE, colors=256)
-        img.save(path, optimize=True, compress_level=9)
+
+    def __init__(self, pool: ThreadPoolExecutor, planet_names: list[str], write_progress: bool):
+        self._pool = pool
+        self._planet_names = planet_names
+        self._write_progress = write_progress
+        self._lock = Lock()
+        self._planet_names_upload: Future[str] | None = None
+        self._planet_uploads: dict[str, Future[_PlanetLinks]] = {}
+
+    def submit_planet_names_file(self, upload: Callable[[], str]) -> None:
+        """
+        Starts the upload of the planet names file.
+        """
+        with self._lock:
+            future = self._pool.submit(upload)
+            self._planet_names_upload = future
+        if self._write_progress:
+            future.add_done_callback(self._write_finished_links)
+
+    def submit_planet(self, planet: str, upload: Callable[[], _PlanetLinks]) -> None:
+        """
+        Starts the upload of a planet preview.
+        """
+        with self._lock:
+            future = self._pool.submit(upload)
+            self._planet_uploads[planet] = future
+        if self._write_progress:
+            future.add_done_callback(self._write_finished_links)
+
+    def _get_ordered_planets(self) -> list[str]:
+        """
+        Returns the submitted planets in planet list order. Planets missing from the list are
+        kept at the end.
+        """
+        listed = [planet for planet in self._planet_names if planet in self._planet_uploads]
+        return listed + [planet for planet in self._planet_uploads if planet not in listed]
+
+    def _write_finished_links(self, _: Future[Any]) -> None:
+        """
+        Writes the viewer config with the links of all successful uploads so far,
+        once the planet names file is uploaded.
+        """
+        with self._lock:
+            planet_names_upload = self._planet_names_upload
+            if planet_names_upload is None or not planet_names_upload.done():
+                return
+            if planet_names_upload.exception() is not None:
+                return
+            links: dict[str, str] = {}
+            tile_sources: dict[str, dict[str, Any]] = {}
+            for planet in self._get_ordered_planets():
+                future = self._planet_uploads[planet]
+                if future.done() and future.exception() is None:
+                    link, tile_source = future.result()
+                    links[planet] = link
+                    if tile_source is not None:
+                        tile_sources[planet] = tile_source
+            _write_viewer_config_js(links, planet_names_upload.result(), tile_sources)
+
+    def collect(self) -> tuple[str, dict[str, str], dict[str, dict[str, Any]]]:
+        """
+        Waits for all uploads and returns the planet names link, the download links and
+        the tile sources. If any upload failed, all failures are logged and an error is raised.
+        """
+        failures: list[tuple[str, BaseException]] = []
+        planet_names_link = ""
+        if self._planet_names_upload is not None:
+            try:
+                planet_names_link = self._planet_names_upload.result()
+            except Exception as e:
+                failures.append((constants.PLANET_NAMES_REMOTE_FILENAME, e))
+
+        links: dict[str, str] = {}
+        tile_sources: dict[str, dict[str, Any]] = {}
+        for planet in self._get_ordered_planets():
+            try:
+                link, tile_source = self._planet_uploads[planet].result()
+            except Exception as e:
+                failures.append((planet, e))
+                continue
+            links[planet] = link
+            if tile_source is not None:
+                tile_sources[planet] = tile_source
+
+        if failures:
+            for name, error in failures:
+                log.error(f"❌ Upload of {name} failed: {error}")
+            failed_names = ", ".join(name for name, _ in failures)
+            raise RuntimeError(f"{len(failures)} upload(s) failed: {failed_names}") from failures[
+                0
+            ][1]
+        return planet_names_link, links, tile_sources
+
+
+def _get_planet_names_content_hash() -> str:
+    """
+    Hashes the planet names file without its upload timestamp.
+    """
+    with constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    data.pop("time", None)
+    canonical_data = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical_data.encode("utf-8")).hexdigest()
+
+
+def _inject_upload_timestamp_into_planet_names_file() -> None:
+    """
+    Adds or updates an '' field in the planet names JSON file.
+    """
+    path = constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["time"] = datetime.now(timezone.utc).isoformat()
+    write_file_atomically(path, json.dumps(data, indent=2).encode("utf-8"))
 
 
 class BaseUploader(ABC):
     """
     Abstract uploader class. Uploads the planet names file and all planet preview images.
     Subclasses must implement upload_single().
+    If enabled, files that are unchanged since their last upload are skipped and keep their link.
+    Uploads run on a thread pool of 'upload_concurrency' threads.
     """
 
+    # Whether files get the upload time stamped into them, so remote services see them as changed
+    stamps_upload_time = True
+
+    def __init__(self) -> None:
+        """
+        Loads the upload manifest of this uploader's destination, if skipping is enabled.
+        """
+        self._upload_manifest: UploadManifest | None = None
+        if Config.get().skip_unchanged_uploads:
+            self._upload_manifest = UploadManifest(self.get_upload_destination())
+
+    def get_upload_destination(self) -> str:
+        """
+        Identifies where this uploader puts files. Uploads are only reused for the same destination.
+        """
+        return type(self).__name__
+
+    def _upload_unless_unchanged(
+        self, remote_path: str, content_hash: str, upload: Callable[[], str]
+    ) -> str:
+        """
+        Runs the upload and records it, unless the same content was already uploaded to
+        the remote path. In that case, the recorded share URL is returned instead.
+        """
+        manifest = self._upload_manifest
+        if manifest is not None:
+            share_url = manifest.get_share_url(remote_path, content_hash)
+            if share_url is not None:
+                log.info(f"⏩ {remote_path} is unchanged since its last upload. Skipping it.")
+                return share_url
+        share_url = upload()
+        if manifest is not None:
+            manifest.record(remote_path, content_hash, share_url)
+        return share_url
+
     def upload_all(self) -> None:
         """
-        Uploads the planet names file and all preview images listed in it.
-        Saves resulting download links to a JavaScript config file.
+        Uploads the planet names file and all preview images listed in it concurrently.
+        Saves resulting download links to a JavaScript config file once all uploads are done.
         """
-        with log_section("🚀 Uploading preview assets..."):
+        with log_section("🚀 Uploading preview assets...", "stage"):
             planet_names = _load_planet_names()
-            planet_names_link = self._upload_planet_names_file()
-            planet_image_links = self._upload_planet_images(planet_names)
-            _write_viewer_config_js(planet_image_links, planet_names_link)
+            with self._create_upload_pool() as pool:
+                batch = _UploadBatch(pool, planet_names, write_progress=False)
+                batch.submit_planet_names_file(self._upload_planet_names_file)
+                ready_previews = postprocess_preview_pngs(
+                    map(_get_preview_image_path, planet_names),
+                    Config.get().png_postprocessing_workers,
+                    _get_postprocessing_options(self.stamps_upload_time),
+                )
+                for preview in ready_previews:
+                    batch.submit_planet(preview.path.stem, self._get_planet_upload(preview))
+            planet_names_link, planet_image_links, planet_tile_sources = batch.collect()
+            _write_viewer_config_js(planet_image_links, planet_names_link, planet_tile_sources)
             log.info("✅ All assets uploaded successfully.")
 
+    def _create_upload_pool(self) -> ThreadPoolExecutor:
+        """
+        Creates the bounded thread pool that runs the uploads.
+        """
+        return ThreadPoolExecutor(
+            max_workers=Config.get().upload_concurrency, thread_name_prefix="Upload"
+        )
+
     def _upload_planet_names_file(self) -> str:
         """
         Uploads the planet names JS file and returns its public URL.
         """
         with log_section("📤 Uploading planet names file..."):
             try:
-                # Add a timestamp to ensure the file appears changed to Dropbox,
-                # even if its actual content hasn't changed. This helps preserve
-                # a stable shareable link when using rclone.
-                _inject_upload_timestamp_into_planet_names_file()
-                url = self.upload_single(
-                    constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH,
-                    constants.PLANET_NAMES_REMOTE_FILENAME,
+
+                def upload() -> str:
+                    # Add a timestamp to ensure the file appears changed to Dropbox,
+                    # even if its actual content hasn't changed. This helps preserve
+                    # a stable shareable link when using rclone.
+                    if self.stamps_upload_time:
+                        _inject_upload_timestamp_into_planet_names_file()
+                    return self.upload_single(
+                        constants.PLANET_NAMES_REMOTE_VIEWER_FILEPATH,
+                        constants.PLANET_NAMES_REMOTE_FILENAME,
+                    )
+
+                url = self._upload_unless_unchanged(
+                    constants.PLANET_NAMES_REMOTE_FILENAME, _get_planet_names_content_hash(), upload
                 )
                 log.info("✅ Planet names uploaded.")
                 return url
@@ -124,24 +330,91 @@ class BaseUploader(ABC):
                 log.error("❌ Failed to upload planet names.")
                 raise
 
-    def _upload_planet_images(self, planet_names: list[str]) -> dict[str, str]:
+    def upload_streaming(self, ready_planets: Iterable[str]) -> None:
         """
-        Uploads all preview images and returns a dict of download links.
+        Uploads each planet preview as soon as its name arrives, while later planets are still
+        being rendered. The viewer config is rewritten after every finished upload, so links
+        become available incrementally. Ends when the stream of planet names ends.
+        """
+        with log_section("🚀 Uploading preview assets as they are rendered...", "stage"):
+            batch: _UploadBatch | None = None
+            announced_planets = (line.strip() for line in ready_planets if line.strip())
+            with self._create_upload_pool() as pool:
+                ready_previews = postprocess_preview_pngs(
+                    map(_get_preview_image_path, announced_planets),
+                    Config.get().png_postprocessing_workers,
+                    _get_postprocessing_options(self.stamps_upload_time),
+                )
+                for preview in ready_previews:
+                    if batch is None:
+                        batch = _UploadBatch(pool, _load_planet_names(), write_progress=True)
+                        batch.submit_planet_names_file(self._upload_planet_names_file)
+                    batch.submit_planet(preview.path.stem, self._get_planet_upload(preview))
+
+            if batch is None:
+                log.info("⚠️ No planet previews were announced. Nothing uploaded.")
+                return
+            planet_names_link, planet_image_links, planet_tile_sources = batch.collect()
+            _write_viewer_config_js(planet_image_links, planet_names_link, planet_tile_sources)
+            log.info("✅ All assets uploaded successfully.")
+
+    def _get_planet_upload(self, preview: PostprocessedPreview) -> Callable[[], _PlanetLinks]:
+        """
+        Returns a task that uploads a planet preview and its tile pyramid, if enabled.
         """
-        links: dict[str, str] = {}
-        for planet in planet_names:
-            with log_section(f"🌍 Uploading {planet} preview..."):
-                image_path = constants.PREVIEWS_OUTPUT_DIR / f"{planet}.png"
-                try:
-                    _optimize_png(image_path)
-                    _add_upload_timestamp_to_png(image_path)
-                    url = self.upload_single(image_path, f"{planet}.png")
-                    links[planet] = url
-                    log.info(f"✅ {planet} uploaded.")
-                except Exception:
-                    log.error(f"❌ Failed to upload {planet}.png")
-                    raise
-        return links
+
+        def upload() -> _PlanetLinks:
+            link = self._upload_planet_image(preview)
+            if not _are_tile_pyramids_enabled():
+                return link, None
+            return link, self._upload_planet_tiles(preview)
+
+        return upload
+
+    def _upload_planet_image(self, preview: PostprocessedPreview) -> str:
+        """
+        Uploads a single post-processed planet preview and returns its download link.
+        """
+        image_path = preview.path
+        planet = image_path.stem
+        with log_section(f"🌍 Uploading {planet} preview..."):
+            try:
+                with report_stage_duration("upload", planet):
+                    url = self._upload_unless_unchanged(
+                        image_path.name,
+                        preview.content_hash,
+                        lambda: self.upload_single(image_path, image_path.name),
+                    )
+                record_output_size(planet, image_path.stat().st_size)
+                log.info(f"✅ {planet} uploaded.")
+                return url
+            except Exception:
+                log.error(f"❌ Failed to upload {image_path.name}")
+                raise
+
+    def _upload_planet_tiles(self, preview: PostprocessedPreview) -> dict[str, Any]:
+        """
+        Uploads the tile pyramid of a planet preview and returns its tile source for the viewer.
+        """
+        planet = preview.path.stem
+        tile_dir = get_tile_pyramid_dir(preview.path)
+
+        def upload() -> str:
+            self.upload_tile_set(tile_dir, tile_dir.name)
+            return ""
+
+        with log_section(f"🧩 Uploading {planet} tiles..."):
+            try:
+                self._upload_unless_unchanged(f"{tile_dir.name}/", preview.content_hash, upload)
+                log.info(f"✅ {planet} tiles uploaded.")
+            except Exception:
+                log.error(f"❌ Failed to upload {tile_dir.name}")
+                raise
+        tile_dir_url = f"{Config.get().tile_base_url}/{tile_dir.name}"
+        return {
+            "url": get_tile_path_template(tile_dir_url, preview.content_hash),
+            **load_tile_manifest(tile_dir),
+        }
 
     @abstractmethod
     def upload_single(self, local_path: Path, remote_filename: str) -> str:
@@ -149,3 +422,11 @@ class BaseUploader(ABC):
         Uploads a single file and returns a public URL.
         """
         ...
+
+    @abstractmethod
+    def upload_tile_set(self, local_dir: Path, remote_dirname: str) -> None:
+        """
+        Uploads a folder of tiles, replacing the remote folder of the same name.
+        Tiles are addressed by path below tile_base_url, so no links are returned.
+        """
+        ...
@@ -0,0 +1,147 @@
+"""
+Benchmarks the preview image formats on the current previews.
+
+Encodes every preview in the output folder in every format the installed Pillow build supports,
+and reports encode time, decode time and file size per planet plus a total per format.
+
+Run with: python -m src.FactorioPreviewToolkit --image-format-benchmark [--quality 80]
+(or start the standalone executable with --image-format-benchmark)
+"""
+
+import argparse
+import io
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+from PIL import Image
+from pydantic import BaseModel
+
+from src.FactorioPreviewToolkit.shared.image_encoders import (
+    PreviewImageFormat,
+    encode_preview_image,
+    get_supported_image_formats,
+)
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+
+
+class FormatMeasurement(BaseModel):
+    """
+    Encode/decode timings and size of one preview in one format.
+    """
+
+    planet: str
+    image_format: PreviewImageFormat
+    encode_seconds: float
+    decode_seconds: float
+    size_in_bytes: int
+
+
+def _measure_format(
+    planet: str, image: Image.Image, image_format: PreviewImageFormat, quality: int
+) -> FormatMeasurement:
+    """
+    Encodes the image in the format and decodes the result again, timing both.
+    """
+    started_at = time.perf_counter()
+    encoded_bytes = encode_preview_image(image, image_format, quality)
+    encoded_at = time.perf_counter()
+    with Image.open(io.BytesIO(encoded_bytes)) as decoded:
+        decoded.load()
+    decoded_at = time.perf_counter()
+
+    return FormatMeasurement(
+        planet=planet,
+        image_format=image_format,
+        encode_seconds=encoded_at - started_at,
+        decode_seconds=decoded_at - encoded_at,
+        size_in_bytes=len(encoded_bytes),
+    )
+
+
+def _log_measurement(
+    label: str, image_format: str, encode: float, decode: float, size: int
+) -> None:
+    """
+    Logs one row of the benchmark table.
+    """
+    log.info(
+        f"{label:<12} {image_format:<14} {encode:>9.2f}s {decode:>9.3f}s {size / 1024:>10.0f} KB"
+    )
+
+
+def run_image_format_benchmark(image_paths: list[Path], quality: int) -> list[FormatMeasurement]:
+    """
+    Measures every supported format on every image and logs a table with the results.
+    """
+    image_formats = get_supported_image_formats()
+    measurements: list[FormatMeasurement] = []
+
+    with log_section(f"📊 Benchmarking {', '.join(image_formats)} (quality {quality})..."):
+        log.info(f"{'planet':<12} {'format':<14} {'encode':>10} {'decode':>10} {'size':>13}")
+        for image_path in image_paths:
+            with Image.open(image_path) as image:
+                image.load()
+                for image_format in image_formats:
+                    measurement = _measure_format(image_path.stem, image, image_format, quality)
+                    measurements.append(measurement)
+                    _log_measurement(
+                        measurement.planet,
+                        image_format,
+                        measurement.encode_seconds,
+                        measurement.decode_seconds,
+                        measurement.size_in_bytes,
+                    )
+
+        for image_format in image_formats:
+            per_format = [m for m in measurements if m.image_format == image_format]
+            _log_measurement(
+                "TOTAL",
+                image_format,
+                sum(m.encode_seconds for m in per_format),
+                sum(m.decode_seconds for m in per_format),
+                sum(m.size_in_bytes for m in per_format),
+            )
+
+    return measurements
+
+
+def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command-line arguments.
+    """
+    raw_args = argv if argv is not None else sys.argv[1:]
+
+    if "--image-format-benchmark" in raw_args:
+        benchmark_index = raw_args.index("--image-format-benchmark")
+        raw_args = raw_args[benchmark_index + 1 :]
+
+    parser = argparse.ArgumentParser(description="Benchmark preview image formats")
+    parser.add_argument(
+        "--quality", type=int, default=80, help="Quality (1-100) of the lossy formats."
+    )
+    parser.add_argument(
+        "images",
+        nargs="*",
+        type=Path,
+        help="Preview images to benchmark. Defaults to all PNGs in the previews folder.",
+    )
+    return parser.parse_args(raw_args)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Runs the image format benchmark on the given or the current previews.
+    """
+    arguments = parse_arguments(argv)
+    image_paths = arguments.images or sorted(constants.PREVIEWS_OUTPUT_DIR.glob("*.png"))
+    if not image_paths:
+        log.info(f"⚠️ No previews found in {constants.PREVIEWS_OUTPUT_DIR}. Generate some first.")
+        return
+    run_image_format_benchmark(image_paths, arguments.quality)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,135 @@
-import shutil
+import hashlib
+import os
+from collections import Counter
 from pathlib import Path
+from typing import Literal
 
 from src.FactorioPreviewToolkit.shared.config import Config
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.shared.utils import clone_file
 from src.FactorioPreviewToolkit.uploader.base_uploader import BaseUploader
 
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+PublishMethod = Literal["unchanged", "reflink", "hardlink", "copy"]
+
+
+def _hash_file(path: Path) -> str:
+    """
+    Hashes the content of a file in chunks.
+    """
+    hasher = hashlib.blake2b()
+    with path.open("rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _files_are_identical(source: Path, target: Path) -> bool:
+    """
+    Returns True if the target has the same content as the source.
+    Sizes are compared first, so only files of equal size are hashed.
+    """
+    try:
+        target_stat = target.stat()
+    except FileNotFoundError:
+        return False
+    if target_stat.st_size != source.stat().st_size:
+        return False
+    if source.samefile(target):
+        return True
+    return _hash_file(source) == _hash_file(target)
+
+
+def publish_file(source: Path, target: Path) -> PublishMethod:
+    """
+    Puts the source file at the target path so that sync clients only ever see complete,
+    changed files. An identical target is left alone. Otherwise the file is cloned (reflink,
+    or hardlink if enabled) or copied to a hidden temporary file next to the target, which is
+    then renamed into place. Returns how the file was published.
+    """
+    if _files_are_identical(source, target):
+        return "unchanged"
+    temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        method = clone_file(
+            source, temp_path, allow_hardlink=Config.get().local_sync_allow_hardlinks
+        )
+        os.replace(temp_path, target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return method
+
+
+def _remove_stale_files(directory: Path, kept_files: set[Path]) -> int:
+    """
+    Removes files (and then empty folders) below the directory that are not in kept_files.
+    Returns the number of removed files.
+    """
+    removed_count = 0
+    for path in sorted(directory.rglob("*"), reverse=True):
+        if path.is_file() and path.relative_to(directory) not in kept_files:
+            path.unlink()
+            removed_count += 1
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+    return removed_count
+
 
 class LocalSyncUploader(BaseUploader):
     """
-    Uploader that copies preview files to a local sync folder (e.g., OneDrive, Dropbox client folder).
+    Uploader that publishes preview files to a local sync folder (e.g., OneDrive, Dropbox client folder).
+    Unchanged files are not touched, so the sync client does not upload them again.
+    Files are not stamped with the upload time, which would make every file differ from the last one.
     Returns a static shareable URL based on config.
     """
 
+    stamps_upload_time = False
+
+    def get_upload_destination(self) -> str:
+        return f"local_sync:{Config.get().local_sync_target_dir}"
+
     def upload_single(self, local_path: Path, remote_filename: str) -> str:
         """
-        Copies a file to the configured sync folder and returns the static public URL.
+        Publishes a file to the configured sync folder and returns the static public URL.
         """
         target_folder = Config.get().local_sync_target_dir
         destination_path = target_folder / remote_filename
 
-        with log_section(f"📤 Copying {local_path.name} to local sync folder: {target_folder}"):
+        with log_section(f"📤 Publishing {local_path.name} to local sync folder: {target_folder}"):
             try:
-                shutil.copy2(local_path, destination_path)
-                log.info(f"✅ File copied to: {destination_path}")
+                method = publish_file(local_path, destination_path)
+                if method == "unchanged":
+                    log.info(f"⏩ {destination_path} is already up to date.")
+                else:
+                    log.info(f"✅ File published to: {destination_path} ({method})")
             except Exception as e:
                 log.error(f"❌ Failed to copy file: {e}")
                 raise
         log.info(f"🔗 The public URL must be set manually with this upload method.")
         return "The public URL must be set manually with this upload method."
+
+    def upload_tile_set(self, local_dir: Path, remote_dirname: str) -> None:
+        """
+        Mirrors the tile folder into the folder of the same name in the configured sync folder.
+        Only changed tiles are replaced, and tiles of earlier previews are removed.
+        """
+        target_folder = Config.get().local_sync_target_dir
+        destination_path = target_folder / remote_dirname
+
+        with log_section(f"📤 Publishing {local_dir.name} to local sync folder: {target_folder}"):
+            try:
+                tile_files = {
+                    path.relative_to(local_dir) for path in local_dir.rglob("*") if path.is_file()
+                }
+                methods: Counter[str] = Counter()
+                for relative_path in sorted(tile_files):
+                    target_path = destination_path / relative_path
+                    target_path.parent.mkdir(parents=True, exist_ok=True)
+                    methods[publish_file(local_dir / relative_path, target_path)] += 1
+                methods["removed"] = _remove_stale_files(destination_path, tile_files)
+                summary = ", ".join(f"{count} {name}" for name, count in methods.items() if count)
+                log.info(f"✅ Tiles published to: {destination_path} ({summary})")
+            except Exception as e:
+                log.error(f"❌ Failed to copy tiles: {e}")
+                raise
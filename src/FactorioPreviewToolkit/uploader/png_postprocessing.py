@@ -0,0 +1,167 @@
+import hashlib
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from queue import Queue
+from threading import Thread
+
+from PIL import Image
+from pydantic import BaseModel
+
+from src.FactorioPreviewToolkit.shared.pipeline_events import report_stage_duration
+from src.FactorioPreviewToolkit.shared.structured_logger import log, trace_span
+from src.FactorioPreviewToolkit.shared.image_encoders import (
+    PREVIEW_IMAGE_EXTENSIONS,
+    PreviewImageFormat,
+    encode_preview_image,
+    quantize_image,
+)
+from src.FactorioPreviewToolkit.shared.utils import write_file_atomically
+from src.FactorioPreviewToolkit.uploader.tile_pyramid import (
+    build_tile_pyramid,
+    get_tile_pyramid_dir,
+)
+
+
+class PostprocessingOptions(BaseModel):
+    """
+    Describes how preview images are prepared for upload.
+    """
+
+    image_format: PreviewImageFormat = "png"
+    quality: int = 80
+    build_tiles: bool = False
+    stamp_upload_time: bool = True
+
+
+class PostprocessedPreview(BaseModel):
+    """
+    A preview file that is ready to upload, plus the content hash of the pixels it was made from.
+    """
+
+    path: Path
+    content_hash: str
+
+
+def get_content_hash(image: Image.Image, options: PostprocessingOptions) -> str:
+    """
+    Hashes the decoded pixels together with the post-processing options.
+    Metadata like the upload time is not part of the hash, so an identical render of the same
+    map in the same format always hashes the same.
+    """
+    hasher = hashlib.blake2b(digest_size=32)
+    hasher.update(f"{image.mode}|{image.size}|{options.model_dump_json()}".encode("utf-8"))
+    hasher.update(image.tobytes())
+    return hasher.hexdigest()
+
+
+def _load_image(path: Path) -> Image.Image:
+    """
+    Decodes the preview image once. Pillow closes the file after loading a single-frame image.
+    """
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def postprocess_preview_png(path: Path, options: PostprocessingOptions) -> PostprocessedPreview:
+    """
+    Prepares a preview PNG for upload in a single pass: decodes it once, encodes it once into the
+    configured format and stamps the upload time into its metadata (unless disabled). The timestamp
+    makes the file appear changed to the remote service even if the image is identical, which keeps
+    its shareable link stable. Optionally slices the decoded image into a tile pyramid as well.
+    PNG output replaces the file in place; other formats are written next to it.
+    Returns the encoded file, which is ready to upload, and the content hash of the source pixels.
+    """
+    with (
+        trace_span(f"🗜️ Post-processing {path.name}"),
+        report_stage_duration("postprocess", path.stem),
+    ):
+        return _postprocess_preview_png(path, options)
+
+
+def _postprocess_preview_png(path: Path, options: PostprocessingOptions) -> PostprocessedPreview:
+    """
+    Does the work of postprocess_preview_png.
+    """
+    started_at = time.perf_counter()
+    original_size = path.stat().st_size
+    image = _load_image(path)
+    content_hash = get_content_hash(image, options)
+    # Only PNG output is quantized; WebP and AVIF are encoded from the full-color source
+    quantized_image = quantize_image(image) if options.image_format == "png" else None
+    encoded_bytes = encode_preview_image(
+        quantized_image or image,
+        options.image_format,
+        options.quality,
+        upload_time=(datetime.now(timezone.utc).isoformat() if options.stamp_upload_time else None),
+    )
+    encoded_at = time.perf_counter()
+
+    output_path = path.with_suffix(PREVIEW_IMAGE_EXTENSIONS[options.image_format])
+    write_file_atomically(output_path, encoded_bytes)
+    written_at = time.perf_counter()
+
+    tiles_info = ""
+    if options.build_tiles:
+        tile_image = quantized_image or quantize_image(image)
+        tile_count = build_tile_pyramid(tile_image, get_tile_pyramid_dir(path))
+        tiles_info = f", {tile_count} tiles {time.perf_counter() - written_at:.2f}s"
+
+    log.info(
+        f"⏱️ {output_path.name} post-processed in {time.perf_counter() - started_at:.2f}s "
+        f"(decode + encode {encoded_at - started_at:.2f}s, write {written_at - encoded_at:.3f}s"
+        f"{tiles_info}), {original_size // 1024} KB → {len(encoded_bytes) // 1024} KB"
+    )
+    return PostprocessedPreview(path=output_path, content_hash=content_hash)
+
+
+def postprocess_preview_pngs(
+    paths: Iterable[Path], worker_count: int, options: PostprocessingOptions
+) -> Iterator[PostprocessedPreview]:
+    """
+    Post-processes preview PNGs on a pool of worker processes and yields each preview as soon as
+    its file is ready to upload, in order of completion. The input is consumed lazily in the
+    background, so new paths can keep arriving while earlier ones are processed.
+    With a single worker, the files are processed one by one in this process.
+    """
+    if worker_count <= 1:
+        for path in paths:
+            yield postprocess_preview_png(path, options)
+        return
+
+    completed: Queue[Future[PostprocessedPreview] | None] = Queue()
+    submitted_count = 0
+    feeder_errors: list[BaseException] = []
+    pool = ProcessPoolExecutor(max_workers=worker_count)
+
+    def submit_all() -> None:
+        nonlocal submitted_count
+        try:
+            for path in paths:
+                future = pool.submit(postprocess_preview_png, path, options)
+                submitted_count += 1
+                future.add_done_callback(completed.put)
+        except BaseException as e:
+            feeder_errors.append(e)
+        finally:
+            completed.put(None)
+
+    feeder = Thread(target=submit_all, name="PngPostprocessingFeeder", daemon=True)
+    feeder.start()
+    try:
+        yielded_count = 0
+        all_submitted = False
+        while not all_submitted or yielded_count < submitted_count:
+            future = completed.get()
+            if future is None:
+                all_submitted = True
+                if feeder_errors:
+                    raise feeder_errors[0]
+                continue
+            yield future.result()
+            yielded_count += 1
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
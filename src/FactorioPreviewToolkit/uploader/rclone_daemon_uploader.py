@@ -0,0 +1,125 @@
+from pathlib import Path
+
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.rclone_daemon import RcloneDaemon, RcloneDaemonError
+from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
+from src.FactorioPreviewToolkit.uploader.base_uploader import BaseUploader
+from src.FactorioPreviewToolkit.uploader.rclone_link_cache import (
+    get_cached_link,
+    get_link_cache_key,
+    invalidate_link,
+    store_link,
+)
+from src.FactorioPreviewToolkit.uploader.rclone_uploader import (
+    get_rclone_upload_destination,
+    require_configured_remote,
+    to_direct_download_link,
+)
+
+
+class RcloneDaemonUploader(BaseUploader):
+    """
+    Rclone uploader that drives a persistent `rclone rcd` daemon over its HTTP API
+    instead of starting new rclone processes for every file.
+    Uses the daemon of the controller if one is announced, otherwise starts its own.
+    """
+
+    def __init__(self) -> None:
+        """
+        Connects to (or starts) the rclone daemon.
+        """
+        super().__init__()
+        daemon = RcloneDaemon.from_environment()
+        if daemon is None:
+            daemon = RcloneDaemon(Config.get().rclone_executable)
+            daemon.start()
+        self._daemon = daemon
+        self._is_remote_checked = False
+
+    def get_upload_destination(self) -> str:
+        return get_rclone_upload_destination()
+
+    def _get_remote_fs(self) -> str:
+        """
+        Returns the rclone filesystem string of the configured remote, after checking it exists.
+        """
+        remote_name = Config.get().rclone_remote_service
+        if not self._is_remote_checked:
+            remotes = self._daemon.call("config/listremotes", {}).get("remotes", [])
+            require_configured_remote(remote_name, remote_name in remotes)
+            self._is_remote_checked = True
+        return f"{remote_name}:"
+
+    def upload_single(self, local_path: Path, remote_filename: str) -> str:
+        """
+        Uploads a single file through the rclone daemon and returns a shareable link.
+        The link is only created once per remote file and cached afterwards. Like the rclone CLI
+        uploader, the cached link is dropped when the copy creates the file anew, or when the
+        copy fails. Only uploads with a cached link ask the remote whether the file exists.
+        """
+        remote_fs = self._get_remote_fs()
+        remote_path = f"{Config.get().rclone_remote_upload_dir.as_posix()}/{remote_filename}"
+        link_cache_key = get_link_cache_key(Config.get().rclone_remote_service, remote_path)
+        cached_url = get_cached_link(link_cache_key)
+
+        # A file that has to be created anew no longer has its old share link
+        if cached_url is not None and not self._remote_file_exists(remote_fs, remote_path):
+            invalidate_link(link_cache_key)
+            cached_url = None
+
+        with log_section(f"☁️ Uploading {local_path.name} to {remote_fs}{remote_path}..."):
+            try:
+                self._daemon.call(
+                    "operations/copyfile",
+                    {
+                        "srcFs": str(local_path.parent),
+                        "srcRemote": local_path.name,
+                        "dstFs": remote_fs,
+                        "dstRemote": remote_path,
+                    },
+                )
+            except RcloneDaemonError:
+                if cached_url is not None:
+                    invalidate_link(link_cache_key)
+                raise
+            log.info("✅ Upload complete.")
+
+        if cached_url is not None:
+            log.info(f"🔗 Shareable URL (cached): {cached_url}")
+            return cached_url
+
+        with log_section("🌐 Generating shareable link..."):
+            result = self._daemon.call(
+                "operations/publiclink", {"fs": remote_fs, "remote": remote_path}
+            )
+            share_url = to_direct_download_link(str(result["url"]).strip())
+            store_link(link_cache_key, share_url)
+            log.info(f"🔗 Shareable URL: {share_url}")
+            return share_url
+
+    def _remote_file_exists(self, remote_fs: str, remote_path: str) -> bool:
+        """
+        Returns True if the file already exists on the remote.
+        """
+        result = self._daemon.call("operations/stat", {"fs": remote_fs, "remote": remote_path})
+        return result.get("item") is not None
+
+    def upload_tile_set(self, local_dir: Path, remote_dirname: str) -> None:
+        """
+        Syncs a tile folder to the remote through the daemon, removing stale tiles of earlier previews.
+        """
+        remote_fs = self._get_remote_fs()
+        remote_target = (
+            f"{remote_fs}{Config.get().rclone_remote_upload_dir.as_posix()}/{remote_dirname}"
+        )
+
+        with log_section(f"☁️ Syncing {local_dir.name} to {remote_target}..."):
+            self._daemon.call(
+                "sync/sync",
+                {
+                    "srcFs": str(local_dir),
+                    "dstFs": remote_target,
+                    "_config": {"Transfers": 16, "CheckSum": True},
+                },
+            )
+            log.info("✅ Tile sync complete.")
@@ -0,0 +1,92 @@
+"""
+Persistent cache of rclone share links.
+
+Creating a share link costs an API round trip (two for Dropbox), although the link of a remote
+path stays the same while the file is only overwritten. Links are therefore cached by remote name
+and path. A link is dropped when the file is created anew on the remote (e.g. after it was deleted
+there), since the old link died with the old file. Optionally, links expire after
+'rclone_link_cache_ttl_in_hours'.
+"""
+
+import time
+from threading import Lock
+
+from pydantic import BaseModel, ValidationError
+
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+from src.FactorioPreviewToolkit.shared.utils import read_json_file, write_json_file_atomically
+
+_cache_lock = Lock()
+
+
+class CachedShareLink(BaseModel):
+    """
+    A share link and when it was created.
+    """
+
+    url: str
+    created_at: float
+
+
+def _read_cache_file() -> dict[str, object]:
+    """
+    Reads all cached links from disk.
+    """
+    return read_json_file(constants.RCLONE_LINK_CACHE_FILEPATH, "rclone link cache")
+
+
+def _write_cache_file(data: dict[str, object]) -> None:
+    """
+    Replaces the cached links on disk.
+    """
+    write_json_file_atomically(constants.RCLONE_LINK_CACHE_FILEPATH, data)
+
+
+def get_link_cache_key(remote_name: str, remote_path: str) -> str:
+    """
+    Returns the cache key of a file on a remote.
+    """
+    return f"{remote_name}:{remote_path}"
+
+
+def get_cached_link(key: str) -> str | None:
+    """
+    Returns the cached share link of a remote file, unless there is none or it has expired.
+    """
+    with _cache_lock:
+        raw_entry = _read_cache_file().get(key)
+    if raw_entry is None:
+        return None
+    try:
+        entry = CachedShareLink.model_validate(raw_entry)
+    except ValidationError:
+        return None
+
+    ttl_in_hours = Config.get().rclone_link_cache_ttl_in_hours
+    if ttl_in_hours > 0 and time.time() - entry.created_at > ttl_in_hours * 3600:
+        return None
+    return entry.url
+
+
+def store_link(key: str, url: str) -> None:
+    """
+    Caches a freshly created share link.
+    """
+    entry = CachedShareLink(url=url, created_at=time.time())
+    with _cache_lock:
+        data = _read_cache_file()
+        data[key] = entry.model_dump()
+        _write_cache_file(data)
+
+
+def invalidate_link(key: str) -> None:
+    """
+    Drops the cached link of a remote file, e.g. because the file was created anew.
+    """
+    with _cache_lock:
+        data = _read_cache_file()
+        if data.pop(key, None) is not None:
+            log.info(f"♻️ Dropped cached share link of {key}.")
+            _write_cache_file(data)
@@ -4,6 +4,12 @@ from pathlib import Path
 from src.FactorioPreviewToolkit.shared.config import Config
 from src.FactorioPreviewToolkit.shared.structured_logger import log, log_section
 from src.FactorioPreviewToolkit.uploader.base_uploader import BaseUploader
+from src.FactorioPreviewToolkit.uploader.rclone_link_cache import (
+    get_cached_link,
+    get_link_cache_key,
+    invalidate_link,
+    store_link,
+)
 
 
 def _is_rclone_configured(remote_name: str) -> bool:
@@ -32,14 +38,50 @@ def _open_rclone_config() -> None:
         raise
 
 
+def require_configured_remote(remote_name: str, is_configured: bool) -> None:
+    """
+    Opens the rclone config tool and aborts the upload if the remote is missing.
+    """
+    if is_configured:
+        return
+    log.warning(f"⚠️ Rclone remote '{remote_name}' is not configured.")
+    _open_rclone_config()
+    raise RuntimeError(
+        f"Rclone remote '{remote_name}' was not configured. Run 'rclone config' and restart the application"
+    )
+
+
+def get_rclone_upload_destination() -> str:
+    """
+    Identifies the configured rclone remote and folder, e.g. for the upload manifest.
+    """
+    config = Config.get()
+    return f"rclone:{config.rclone_remote_service}:{config.rclone_remote_upload_dir.as_posix()}"
+
+
+def to_direct_download_link(share_url: str) -> str:
+    """
+    Rewrites share links of known providers so they point to the raw file instead of a preview page.
+    """
+    if "dropbox.com" in share_url:
+        share_url = share_url.replace("www.dropbox.com", "dl.dropboxusercontent.com")
+        share_url = share_url.replace("&dl=0", "")
+        share_url = share_url.replace("&dl=1", "")
+    return share_url
+
+
 class RcloneUploader(BaseUploader):
     """
     Rclone-based uploader implementation that copies images to a remote and returns shareable links.
     """
 
+    def get_upload_destination(self) -> str:
+        return get_rclone_upload_destination()
+
     def upload_single(self, local_path: Path, remote_filename: str) -> str:
         """
         Uploads a single file using rclone and returns a shareable link.
+        The link is only created once per remote file and cached afterwards.
         Prompts the user to configure the remote if it's missing.
         """
         config = Config.get()
@@ -48,18 +90,16 @@ class RcloneUploader(BaseUploader):
         remote_folder = config.rclone_remote_upload_dir
         remote_target = f"{remote_name}:{remote_folder}"
         full_remote_path = f"{remote_target}/{remote_filename}"
+        link_cache_key = get_link_cache_key(
+            remote_name, f"{remote_folder.as_posix()}/{remote_filename}"
+        )
 
-        if not _is_rclone_configured(remote_name):
-            log.warning(f"⚠️ Rclone remote '{remote_name}' is not configured.")
-            _open_rclone_config()
-            raise RuntimeError(
-                f"Rclone remote '{remote_name}' was not configured. Run 'rclone config' and restart the application"
-            )
+        require_configured_remote(remote_name, _is_rclone_configured(remote_name))
 
         with log_section(f"☁️ Uploading {local_path.name} to {remote_target}..."):
             try:
                 result = subprocess.run(
-                    [rclone_executable, "copy", str(local_path), remote_target],
+                    [rclone_executable, "copy", "-v", str(local_path), remote_target],
                     check=True,
                     capture_output=True,
                     text=True,
@@ -70,6 +110,10 @@ class RcloneUploader(BaseUploader):
                     if "Forced to upload files to set modification times" not in line:
                         log.info(line)
 
+                # A file that had to be created anew no longer has its old share link
+                if "Copied (new)" in result.stderr:
+                    invalidate_link(link_cache_key)
+
                 log.info("✅ Upload complete.")
             except subprocess.CalledProcessError as e:
                 log.error("❌ Upload failed.")
@@ -77,6 +121,11 @@ class RcloneUploader(BaseUploader):
                 log.error(f"stderr:\n{e.stderr}")
                 raise
 
+        cached_url = get_cached_link(link_cache_key)
+        if cached_url is not None:
+            log.info(f"🔗 Shareable URL (cached): {cached_url}")
+            return cached_url
+
         with log_section("🌐 Generating shareable link..."):
             try:
                 result = subprocess.run(
@@ -85,14 +134,8 @@ class RcloneUploader(BaseUploader):
                     text=True,
                     check=True,
                 )
-                share_url = result.stdout.strip()
-
-                # Handle Dropbox
-                if "dropbox.com" in share_url:
-                    # Force raw preview link
-                    share_url = share_url.replace("www.dropbox.com", "dl.dropboxusercontent.com")
-                    share_url = share_url.replace("&dl=0", "")
-                    share_url = share_url.replace("&dl=1", "")
+                share_url = to_direct_download_link(result.stdout.strip())
+                store_link(link_cache_key, share_url)
 
                 log.info(f"🔗 Shareable URL: {share_url}")
                 return share_url
@@ -101,3 +144,36 @@ class RcloneUploader(BaseUploader):
                 log.error(f"stdout:\n{e.stdout}")
                 log.error(f"stderr:\n{e.stderr}")
                 raise
+
+    def upload_tile_set(self, local_dir: Path, remote_dirname: str) -> None:
+        """
+        Syncs a tile folder to the remote with rclone, removing stale tiles of earlier previews.
+        """
+        config = Config.get()
+        remote_name = config.rclone_remote_service
+        remote_target = f"{remote_name}:{config.rclone_remote_upload_dir}/{remote_dirname}"
+
+        require_configured_remote(remote_name, _is_rclone_configured(remote_name))
+
+        with log_section(f"☁️ Syncing {local_dir.name} to {remote_target}..."):
+            try:
+                subprocess.run(
+                    [
+                        config.rclone_executable,
+                        "sync",
+                        str(local_dir),
+                        remote_target,
+                        "--transfers",
+                        "16",
+                        "--checksum",
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                log.info("✅ Tile sync complete.")
+            except subprocess.CalledProcessError as e:
+                log.error("❌ Tile sync failed.")
+                log.error(f"stdout:\n{e.stdout}")
+                log.error(f"stderr:\n{e.stderr}")
+                raise
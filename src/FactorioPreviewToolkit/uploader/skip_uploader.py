@@ -13,3 +13,6 @@ class SkipUploader(BaseUploader):
     def upload_single(self, local_path: Path, remote_filename: str) -> str:
         log.info(f"⏩ Skipping upload for '{local_path.name}' (upload method is set to 'skip').")
         return f"(skipped upload for {local_path.name})"
+
+    def upload_tile_set(self, local_dir: Path, remote_dirname: str) -> None:
+        log.info(f"⏩ Skipping upload for '{local_dir.name}' (upload method is set to 'skip').")
@@ -0,0 +1,97 @@
+import json
+import math
+import shutil
+from pathlib import Path
+from typing import Any, cast
+
+from PIL import Image
+
+TILE_SIZE = 256
+TILE_MANIFEST_FILENAME = "manifest.json"
+
+
+def get_tile_pyramid_dir(image_path: Path) -> Path:
+    """
+    Returns the folder that holds the tile pyramid of a preview image.
+    """
+    return image_path.with_name(f"{image_path.stem}_tiles")
+
+
+def get_tile_path_template(tile_dir_url: str, content_hash: str) -> str:
+    """
+    Returns the URL template the viewer uses to address single tiles of a pyramid.
+    The tiles of a new map are uploaded to the same paths, so the content hash is added as a
+    version query. Browsers and CDNs then never serve cached tiles of an earlier map.
+    """
+    return f"{tile_dir_url}/{{z}}/{{x}}_{{y}}.png?v={content_hash[:16]}"
+
+
+def _get_max_zoom(width: int, height: int) -> int:
+    """
+    Returns the zoom level of the full resolution image.
+    Zoom level 0 is the level at which the whole image fits into a single tile.
+    """
+    return max(0, math.ceil(math.log2(max(width, height) / TILE_SIZE)))
+
+
+def _write_level_tiles(level_image: Image.Image, level_dir: Path) -> int:
+    """
+    Slices one zoom level into tiles and returns the number of tiles written.
+    """
+    level_dir.mkdir(parents=True)
+    columns = math.ceil(level_image.width / TILE_SIZE)
+    rows = math.ceil(level_image.height / TILE_SIZE)
+    for x in range(columns):
+        for y in range(rows):
+            box = (
+                x * TILE_SIZE,
+                y * TILE_SIZE,
+                min((x + 1) * TILE_SIZE, level_image.width),
+                min((y + 1) * TILE_SIZE, level_image.height),
+            )
+            level_image.crop(box).save(level_dir / f"{x}_{y}.png", compress_level=6)
+    return columns * rows
+
+
+def build_tile_pyramid(image: Image.Image, output_dir: Path) -> int:
+    """
+    Slices a paletted image into a pyramid of 256 px tiles (XYZ layout: {z}/{x}_{y}.png).
+    Every zoom level halves the resolution of the one above, down to a single tile.
+    Lower levels reuse the palette of the image. A manifest describing the pyramid is written
+    next to the tiles. The previous pyramid is replaced in one step once the new one is complete.
+    Returns the number of tiles written.
+    """
+    max_zoom = _get_max_zoom(image.width, image.height)
+    build_dir = output_dir.with_name(f"{output_dir.name}.tmp")
+    shutil.rmtree(build_dir, ignore_errors=True)
+
+    tile_count = _write_level_tiles(image, build_dir / str(max_zoom))
+    level_rgb = image.convert("RGB")
+    for zoom in range(max_zoom - 1, -1, -1):
+        level_rgb = level_rgb.reduce(2)
+        level_image = level_rgb.quantize(palette=image, dither=Image.Dither.NONE)
+        tile_count += _write_level_tiles(level_image, build_dir / str(zoom))
+
+    manifest = {
+        "width": image.width,
+        "height": image.height,
+        "tileSize": TILE_SIZE,
+        "maxZoom": max_zoom,
+    }
+    (build_dir / TILE_MANIFEST_FILENAME).write_text(json.dumps(manifest, indent=2), "utf-8")
+
+    old_dir = output_dir.with_name(f"{output_dir.name}.old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if output_dir.exists():
+        output_dir.rename(old_dir)
+    build_dir.rename(output_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return tile_count
+
+
+def load_tile_manifest(tile_dir: Path) -> dict[str, Any]:
+    """
+    Loads the manifest of a tile pyramid.
+    """
+    manifest_path = tile_dir / TILE_MANIFEST_FILENAME
+    return cast(dict[str, Any], json.loads(manifest_path.read_text("utf-8")))
@@ -0,0 +1,91 @@
+"""
+Local record of what has been uploaded where.
+
+For every uploaded file, the manifest stores the content hash it was made from, its remote path
+and its share URL. Files whose content hash matches the last upload to the same destination are
+not uploaded again; the recorded share URL is reused instead. Entries are grouped by destination
+(uploader and remote target), so switching the remote never reuses links of another one.
+"""
+
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from src.FactorioPreviewToolkit.shared.shared_constants import constants
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+from src.FactorioPreviewToolkit.shared.utils import read_json_file, write_json_file_atomically
+
+_manifest_lock = Lock()
+
+
+class UploadManifestEntry(BaseModel):
+    """
+    The last upload of a single remote file.
+    """
+
+    content_hash: str
+    remote_path: str
+    share_url: str
+    uploaded_at: str
+
+
+def _read_manifest_file() -> dict[str, dict[str, Any]]:
+    """
+    Reads all recorded uploads from disk.
+    """
+    return read_json_file(constants.UPLOAD_MANIFEST_FILEPATH, "upload manifest")
+
+
+def _write_manifest_file(data: dict[str, dict[str, Any]]) -> None:
+    """
+    Replaces the recorded uploads on disk.
+    """
+    write_json_file_atomically(constants.UPLOAD_MANIFEST_FILEPATH, data)
+
+
+class UploadManifest:
+    """
+    The recorded uploads to one destination.
+    """
+
+    def __init__(self, destination: str):
+        """
+        Loads the entries recorded for the given destination.
+        """
+        self._destination = destination
+        self._entries: dict[str, UploadManifestEntry] = {}
+        for remote_path, raw_entry in _read_manifest_file().get(destination, {}).items():
+            try:
+                self._entries[remote_path] = UploadManifestEntry.model_validate(raw_entry)
+            except ValidationError:
+                log.warning(f"⚠️ Ignoring invalid upload manifest entry for '{remote_path}'.")
+
+    def get_share_url(self, remote_path: str, content_hash: str) -> str | None:
+        """
+        Returns the share URL of the last upload if it was made from the same content.
+        """
+        entry = self._entries.get(remote_path)
+        if entry is None or entry.content_hash != content_hash:
+            return None
+        return entry.share_url
+
+    def record(self, remote_path: str, content_hash: str, share_url: str) -> None:
+        """
+        Records a finished upload and saves the manifest. Safe to call from several threads.
+        The file is re-read first, so entries of other destinations are preserved.
+        """
+        entry = UploadManifestEntry(
+            content_hash=content_hash,
+            remote_path=remote_path,
+            share_url=share_url,
+            uploaded_at=datetime.now(timezone.utc).isoformat(),
+        )
+        with _manifest_lock:
+            self._entries[remote_path] = entry
+            data = _read_manifest_file()
+            data[self._destination] = {
+                path: recorded.model_dump() for path, recorded in self._entries.items()
+            }
+            _write_manifest_file(data)
@@ -0,0 +1,81 @@
+"""
+Pre-warmed worker process for the preview generator and the uploader.
+
+The controller starts this process before it is needed. It imports the heavy modules and
+loads and validates the config right away, then waits on stdin for a single job line.
+If config.ini was edited while it waited, it is loaded again before the job runs:
+
+    {"argv": [...], "env": {...}}
+
+The job runs in this process, which exits afterwards. Cancelling a job therefore still just
+kills a process, exactly like a freshly spawned one, while the startup cost is paid in advance.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Callable, Sequence
+
+from src.FactorioPreviewToolkit.shared.config import Config
+from src.FactorioPreviewToolkit.shared.structured_logger import log
+
+
+def _preload(role: str) -> Callable[[Sequence[str]], None]:
+    """
+    Imports the entry point of the given role (and with it all its dependencies),
+    validates the config and returns the entry point.
+    """
+    entry_point: Callable[[Sequence[str]], None]
+    if role == "generator":
+        from src.FactorioPreviewToolkit.preview_generator.__main__ import main as generator_main
+
+        entry_point = generator_main
+    elif role == "uploader":
+        from src.FactorioPreviewToolkit.uploader.__main__ import main as uploader_main
+
+        entry_point = uploader_main
+    else:
+        raise ValueError(f"❌ Unknown warm worker role: {role!r}")
+
+    Config.get()
+    return entry_point
+
+
+def parse_arguments(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """
+    Parses the command-line arguments.
+    """
+    raw_args = argv if argv is not None else sys.argv[1:]
+
+    if "--warm-worker-mode" in raw_args:
+        worker_index = raw_args.index("--warm-worker-mode")
+        raw_args = raw_args[worker_index + 1 :]
+
+    parser = argparse.ArgumentParser(description="Pre-warmed Factorio preview toolkit worker")
+    parser.add_argument("role", choices=["generator", "uploader"])
+    return parser.parse_args(raw_args)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Warms up, waits for a job on stdin and runs it.
+    Exits quietly if stdin is closed before a job arrives.
+    """
+    role = parse_arguments(argv).role
+    entry_point = _preload(role)
+
+    job_line = sys.stdin.readline()
+    if not job_line.strip():
+        return
+
+    job = json.loads(job_line)
+    os.environ.update(job.get("env", {}))
+    log.info(f"🔥 Warm {role} worker received a job.")
+    if Config.reload_if_changed():
+        log.info("⚙️ Config file changed since warm-up and was reloaded.")
+    entry_point(job["argv"])
+
+
+if __name__ == "__main__":
+    main()
@@ -48,8 +48,9 @@ loadPlanetNamesFromScript(viewerConfig.planetNamesSource)
       )
     );
 
-    setupTabs(filteredSources, tabButtonsContainer, mapImage);
+    initTileLayer(mapContainer);
     initKeyboardControls(mapImage, mapContainer, zoomDisplay);
+    setupTabs(filteredSources, tabButtonsContainer, mapImage, viewerConfig.planetTileSources || {});
 
     resetBtn.addEventListener("click", () => {
       resetMapView(mapImage, mapContainer, zoomDisplay);
@@ -3,8 +3,10 @@ const statePerPlanet = {};
 let currentPlanet = null;
 let zoomStepIndex = 0;
 let scale = 1, offsetX = 0, offsetY = 0;
+let planetTileSources = {};
 
-function setupTabs(previewSources, tabContainer, mapImage) {
+function setupTabs(previewSources, tabContainer, mapImage, tileSources = {}) {
+  planetTileSources = tileSources;
   Object.entries(previewSources).forEach(([planet, url], index) => {
     const tab = document.createElement("div");
     tab.className = "tab";
@@ -28,11 +30,11 @@ function setupTabs(previewSources, tabContainer, mapImage) {
       };
 
       mapImage.onload = () => {
-        mapImage.style.display = "block";
+        mapImage.style.display = tileLayer.source ? "none" : "block";
         fallback.style.display = "none";
       };
 
-      mapImage.src = url;
+      showPlanetPreview(planet, previewSources, mapImage);
     }
 
     tab.addEventListener("click", () => switchPlanet(planet, previewSources, mapImage));
@@ -50,14 +52,37 @@ function switchPlanet(planet, previewSources, mapImage) {
   if (newTab) newTab.classList.add("active");
 
   currentPlanet = planet;
-  mapImage.src = previewSources[planet];
   mapImage.onerror = () => console.error("Failed to load map image:", mapImage.src);
+  showPlanetPreview(planet, previewSources, mapImage);
+}
+
+/**
+ * Shows the tile pyramid of a planet if there is one, otherwise its full preview image.
+ * For tile pyramids, a load event is dispatched on the map image so the view is set up the same way.
+ */
+function showPlanetPreview(planet, previewSources, mapImage) {
+  const tileSource = planetTileSources[planet];
+  if (tileSource) {
+    mapImage.removeAttribute("src");
+    mapImage.style.display = "none";
+    showTileSource(tileSource);
+    mapImage.dispatchEvent(new Event("load"));
+  } else {
+    hideTileLayer();
+    mapImage.src = previewSources[planet];
+  }
+}
+
+function getMapSize(mapImage) {
+  if (tileLayer.source) {
+    return { width: tileLayer.source.width, height: tileLayer.source.height };
+  }
+  return { width: mapImage.naturalWidth, height: mapImage.naturalHeight };
 }
 
 function handleImageLoad(mapImage, container, zoomDisplay) {
   const rect = container.getBoundingClientRect();
-  const imgW = mapImage.naturalWidth;
-  const imgH = mapImage.naturalHeight;
+  const { width: imgW, height: imgH } = getMapSize(mapImage);
 
   if (statePerPlanet[currentPlanet]) {
     ({ zoomStepIndex, offsetX, offsetY } = statePerPlanet[currentPlanet]);
@@ -92,8 +117,7 @@ function handleWheelZoom(e, mapImage, container, zoomDisplay) {
 
 function resetMapView(mapImage, container, zoomDisplay) {
   const rect = container.getBoundingClientRect();
-  const imgW = mapImage.naturalWidth;
-  const imgH = mapImage.naturalHeight;
+  const { width: imgW, height: imgH } = getMapSize(mapImage);
 
   zoomStepIndex = 0;
   scale = getScaleFromStep(zoomStepIndex);
@@ -110,6 +134,7 @@ function getScaleFromStep(step) {
 
 function updateTransform(target) {
   target.style.transform = `translate(${offsetX}px, ${offsetY}px) scale(${scale})`;
+  updateTileLayer();
 }
 
 function updateZoomLabel(label) {
@@ -0,0 +1,105 @@
+const tileLayer = {
+  container: null,
+  element: null,
+  source: null,
+  tiles: new Map(),
+};
+
+function initTileLayer(container) {
+  tileLayer.container = container;
+  tileLayer.element = document.createElement("div");
+  tileLayer.element.className = "tile-layer";
+  tileLayer.element.style.display = "none";
+  container.appendChild(tileLayer.element);
+}
+
+/**
+ * Shows a tile pyramid ({ url, width, height, tileSize, maxZoom }) instead of the map image.
+ */
+function showTileSource(source) {
+  clearTiles();
+  tileLayer.source = source;
+  tileLayer.element.style.width = `${source.width}px`;
+  tileLayer.element.style.height = `${source.height}px`;
+  tileLayer.element.style.display = "block";
+}
+
+function hideTileLayer() {
+  clearTiles();
+  tileLayer.source = null;
+  tileLayer.element.style.display = "none";
+}
+
+function clearTiles() {
+  tileLayer.tiles.forEach(tile => tile.remove());
+  tileLayer.tiles.clear();
+}
+
+/**
+ * Picks the zoom level whose resolution is closest to (but not below) the current scale.
+ */
+function getTileZoom(source, currentScale) {
+  const levelsBelowFull = Math.floor(Math.log2(1 / currentScale));
+  return Math.min(source.maxZoom, Math.max(0, source.maxZoom - levelsBelowFull));
+}
+
+/**
+ * Loads the tiles visible at the current zoom and offset, and drops all others.
+ * The single tile of zoom level 0 is always kept as a blurry background while tiles load.
+ */
+function updateTileLayer() {
+  const source = tileLayer.source;
+  if (!source) return;
+
+  tileLayer.element.style.transform = `translate(${offsetX}px, ${offsetY}px) scale(${scale})`;
+
+  const rect = tileLayer.container.getBoundingClientRect();
+  const zoom = getTileZoom(source, scale);
+  const levelFactor = Math.pow(2, source.maxZoom - zoom);
+  const tileSpan = source.tileSize * levelFactor;
+
+  const left = Math.max(0, -offsetX / scale);
+  const top = Math.max(0, -offsetY / scale);
+  const right = Math.min(source.width, (rect.width - offsetX) / scale);
+  const bottom = Math.min(source.height, (rect.height - offsetY) / scale);
+
+  const wanted = new Set(["0/0/0"]);
+  for (let x = Math.floor(left / tileSpan); x * tileSpan < right; x++) {
+    for (let y = Math.floor(top / tileSpan); y * tileSpan < bottom; y++) {
+      wanted.add(`${zoom}/${x}/${y}`);
+    }
+  }
+
+  tileLayer.tiles.forEach((tile, key) => {
+    if (!wanted.has(key)) {
+      tile.remove();
+      tileLayer.tiles.delete(key);
+    }
+  });
+  wanted.forEach(key => {
+    if (!tileLayer.tiles.has(key)) {
+      tileLayer.tiles.set(key, createTile(source, key));
+    }
+  });
+}
+
+function createTile(source, key) {
+  const [zoom, x, y] = key.split("/").map(Number);
+  const levelFactor = Math.pow(2, source.maxZoom - zoom);
+  const tileSpan = source.tileSize * levelFactor;
+
+  const tile = document.createElement("img");
+  tile.className = "tile";
+  tile.draggable = false;
+  tile.style.left = `${x * tileSpan}px`;
+  tile.style.top = `${y * tileSpan}px`;
+  tile.style.zIndex = String(zoom);
+  tile.onload = () => {
+    tile.style.width = `${tile.naturalWidth * levelFactor}px`;
+    tile.style.height = `${tile.naturalHeight * levelFactor}px`;
+    tile.style.visibility = "visible";
+  };
+  tile.src = source.url.replace("{z}", zoom).replace("{x}", x).replace("{y}", y);
+  tileLayer.element.appendChild(tile);
+  return tile;
+}